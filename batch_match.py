@@ -0,0 +1,99 @@
+"""
+Match one resume against several job descriptions and print a fit matrix.
+
+The resume is converted and extracted once (extraction cached per resume hash);
+each JD then costs one PDF conversion and one cheap JD-relevance call.
+
+Usage:
+    python batch_match.py resume.pdf jd1.pdf jd2.pdf [--output fit_matrix.json]
+"""
+
+import argparse
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from llm import get_llm
+from tools.analyzer import ResumeJDAnalyzer, parse_final_score
+from tools.resume_extractor import JDRelevancePass, ResumeExtractor
+
+
+def build_fit_matrix(resume_pdf: str, jd_pdfs: List[str], llm=None, max_workers: int = 4) -> Dict:
+    """Score one resume against every JD, doing the resume-side work only once"""
+    llm = llm or get_llm()
+    converter = ResumeJDAnalyzer(llm, resume_pdf, None)
+
+    # Resume side: once
+    resume_text = converter._pdf_to_markdown(resume_pdf)
+    if resume_text.startswith("Error"):
+        return {"resume": resume_pdf, "error": resume_text, "rows": []}
+
+    extraction = ResumeExtractor(llm).extract(resume_text)
+    if "error" in extraction:
+        return {"resume": resume_pdf, "error": extraction["error"], "rows": []}
+
+    # JD side: per JD, in parallel (LLM-bound)
+    relevance_pass = JDRelevancePass(llm)
+
+    def score_jd(jd_pdf: str) -> Dict:
+        jd_text = converter._pdf_to_markdown(jd_pdf)
+        if jd_text.startswith("Error"):
+            return {"jd": jd_pdf, "error": jd_text, "final_score": 0.0}
+
+        relevance = relevance_pass.run(extraction, jd_text)
+        if "error" in relevance:
+            return {"jd": jd_pdf, "error": relevance["error"], "final_score": 0.0}
+
+        assessment = relevance.get("overall_assessment", {})
+        return {
+            "jd": jd_pdf,
+            "extraction_tier": converter.conversion_reports.get(jd_pdf, {}).get("tier"),
+            "fit": assessment.get("fit", "Unknown"),
+            "final_score": parse_final_score(assessment.get("final_score")),
+            "recommendation": assessment.get("recommendation", ""),
+            "matching_skills": relevance.get("matching_skills", []),
+            "missing_elements": relevance.get("missing_elements", []),
+            "context_split": {
+                "technical_context": relevance.get("technical_context", {}),
+                "behavioral_context": extraction.get("behavioral_context", {}),
+                "situational_context": extraction.get("situational_context", {}),
+            },
+        }
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        rows = list(pool.map(score_jd, jd_pdfs))
+
+    rows.sort(key=lambda row: row["final_score"], reverse=True)
+    resume_tier = converter.conversion_reports.get(resume_pdf, {}).get("tier")
+    return {"resume": resume_pdf, "resume_extraction_tier": resume_tier, "rows": rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("resume")
+    parser.add_argument("jds", nargs="+")
+    parser.add_argument("--output", help="Write the full fit matrix to this JSON file")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    matrix = build_fit_matrix(args.resume, args.jds, max_workers=args.workers)
+    if "error" in matrix:
+        print(f"❌ {matrix['error']}")
+        return
+
+    print(f"\n📊 Fit matrix for {matrix['resume']}\n")
+    print(f"{'score':>6}  {'fit':<10}{'missing':>8}  jd")
+    for row in matrix["rows"]:
+        if "error" in row:
+            print(f"{'-':>6}  {'error':<10}{'':>8}  {row['jd']} ({row['error']})")
+        else:
+            print(f"{row['final_score']:>6.1f}  {row['fit']:<10}{len(row['missing_elements']):>8}  {row['jd']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(matrix, f, ensure_ascii=False, indent=2)
+        print(f"\n✅ Saved fit matrix to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
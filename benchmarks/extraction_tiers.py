@@ -0,0 +1,41 @@
+"""
+Benchmark the plain-text and layout-markdown extraction tiers on the bundled PDFs.
+
+Usage (from the repo root):
+    python -m benchmarks.extraction_tiers --runs 5
+"""
+
+import argparse
+import glob
+import statistics
+
+from tools.pdf_converter import convert_pdf, needs_layout, open_pdf
+
+
+def time_tier(pdf_path: str, tier: str, runs: int) -> dict:
+    reports = [convert_pdf(pdf_path, tier=tier) for _ in range(runs)]
+    return {
+        "median": statistics.median(r["wall_time"] for r in reports),
+        "chars": len(reports[-1]["markdown"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdfs", nargs="*", default=sorted(glob.glob("resources/*.pdf")))
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"\n{'document':<28}{'text (s)':>10}{'layout (s)':>12}{'speedup':>9}  auto tier")
+    for pdf_path in args.pdfs:
+        text = time_tier(pdf_path, "text", args.runs)
+        layout = time_tier(pdf_path, "layout", args.runs)
+        with open_pdf(pdf_path) as doc:
+            reason = needs_layout(doc)
+        auto = f"layout ({reason})" if reason else "text"
+        speedup = layout["median"] / text["median"] if text["median"] else float("inf")
+        print(f"{pdf_path:<28}{text['median']:>10.3f}{layout['median']:>12.3f}{speedup:>8.1f}x  {auto}")
+
+
+if __name__ == "__main__":
+    main()
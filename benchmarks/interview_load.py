@@ -0,0 +1,355 @@
+"""
+Load-test the interview engine: K simulated candidates go through phase 1 and the full turn loop at once.
+
+Each candidate runs the same engine entry points as main.py (build_phase_one_graph +
+create_initial_state, append_analysis, then build_interview_conversational_graph) with answers
+scripted from a transcript file and every LLM call served by a FakeLLM with configurable latency
+and error rate. Reports throughput, per-turn latency percentiles, CPU / RSS and the LLM
+concurrency actually reached.
+
+Streamlit drives the same phase-1 graph and turn helpers (call_llm, analyze_response_depth, the
+result store); its page handlers are bound to st.session_state, so the CLI turn graph stands in.
+
+Latency specs: "fixed:0.8", "uniform:0.3:1.5" or "lognormal:0.8:0.5" (median seconds, sigma).
+Transcript: a JSON list of answers or a text file with one answer per line (first one is the intro).
+
+With --llm configured the FakeLLM is bypassed and calls go to the configured LLM_BACKENDS (e.g. a
+local OpenAI-compatible server, or benchmarks/mock_openai_server.py to include the HTTP hop).
+
+Usage (from the repo root):
+    python -m benchmarks.interview_load --candidates 20 --latency lognormal:0.8:0.5 --error-rate 0.02
+    LLM_BACKENDS=openai,gemini python -m benchmarks.interview_load --llm configured --candidates 5
+
+Deterministic offline comparisons: record a cassette once, then replay it (see tools/llm_cassette.py):
+    LLM_CASSETTE_MODE=record LLM_CASSETTE=run.jsonl python -m benchmarks.interview_load --candidates 5
+    LLM_CASSETTE_MODE=replay LLM_CASSETTE=run.jsonl LLM_CASSETTE_LATENCY=zero \
+        python -m benchmarks.interview_load --llm configured --candidates 5
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+
+# Keep synthetic sessions out of the real result store unless told otherwise, and out of the real
+# question banks and resume extraction cache always (later real interviews would reuse them). Set
+# before the tools modules are imported, which read these at import time.
+os.environ.setdefault("RESULTS_DIR", os.path.join(".cache", "loadtest_results"))
+_scratch_dir = tempfile.mkdtemp(prefix="interview_load_")
+atexit.register(shutil.rmtree, _scratch_dir, ignore_errors=True)
+os.environ["QUESTION_BANK_DIR"] = os.path.join(_scratch_dir, "question_banks")
+os.environ["RESUME_CACHE_DIR"] = os.path.join(_scratch_dir, "resume_extractions")
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from graph import build_phase_one_graph, create_initial_state
+from llm import FakeLLM, get_usage_summary, reset_usage, set_llm_factory
+from tools.cancellation import WorkCancelled, get_cancellations
+from tools.conversation_memory import forget_conversation_memory, get_conversation_memory
+from tools.interview_conversational_agent import build_interview_conversational_graph, set_answer_source
+from tools.llm_cassette import cassette_summary
+from tools.local_scorer import get_scoring_paths
+from tools.log import flush_logs, set_log_level
+from tools.results_store import get_result_store
+from tools.token_ledger import get_ledger
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_ANSWERS = [
+    "I'm a final-year CS student who builds AI agents and full-stack apps.",
+    "I would profile first, then batch the requests and cache the embeddings.",
+    "I led a team of four on a hackathon project and split work by component.",
+    "I'd clarify the requirement with stakeholders, ship a minimal version and iterate.",
+    "I'm not sure, but I would start by reading the documentation.",
+]
+
+
+def parse_latency(spec: str, rng: random.Random) -> Callable[[], float]:
+    kind, *params = spec.split(":")
+    values = [float(p) for p in params]
+    if kind == "fixed":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: rng.uniform(values[0], values[1])
+    if kind == "lognormal":
+        return lambda: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def load_transcript(path: str) -> List[str]:
+    if not path:
+        return DEFAULT_ANSWERS
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    try:
+        answers = json.loads(content)
+    except json.JSONDecodeError:
+        answers = [line.strip() for line in content.splitlines() if line.strip()]
+    return answers or DEFAULT_ANSWERS
+
+
+def make_responder(rng: random.Random, followup_rate: float) -> Callable[[str], str]:
+    """Canned replies shaped like each engine prompt expects"""
+    counter = itertools.count(1)
+
+    def question(kind: str) -> Dict:
+        n = next(counter)
+        return {"question": f"Simulated {kind} question #{n} about topic {rng.randint(1, 10**6)}?",
+                "answer": f"Ideal answer #{n}."}
+
+    contexts = {
+        "technical_context": {"skills": ["Python"], "projects": ["Agent gateway"], "relevant_experience": ["AI intern"]},
+        "behavioral_context": {"leadership": ["Hackathon lead"], "teamwork": [], "communication": []},
+        "situational_context": {"problem_solving": ["OCR risk tool"], "challenges": [], "decision_making": []},
+    }
+    assessment = {"fit": "Good", "final_score": "3.5/5", "recommendation": "Interview"}
+
+    lock = threading.Lock()
+
+    def respond(prompt: str) -> str:
+        with lock:  # shared by every session's thread
+            return _respond(prompt)
+
+    def _respond(prompt: str) -> str:
+        if "PART 3" in prompt:
+            return json.dumps({
+                "resume_jd_analysis": {"aligned_experience": [], "overall_assessment": assessment},
+                "context_split": contexts,
+                "questions": {t: [question(t)] for t in ("technical", "behavioral", "situational")},
+            })
+        if '"variants"' in prompt:
+            slots = sorted(set(re.findall(r'"type": "(\w+)",\s*"index": (\d+)', prompt)))
+            return json.dumps({"variants": [
+                {"type": q_type, "index": int(index), "easier": question("easier"), "harder": question("harder")}
+                for q_type, index in slots
+            ]})
+        if '"scores"' in prompt:
+            ids = [int(n) for n in re.findall(r"^\s*\[(\d+)\] Question:", prompt, flags=re.MULTILINE)]
+            return json.dumps({"scores": [{"id": n, "Score": rng.randint(1, 5), "Reasoning": "Simulated evaluation"}
+                                          for n in ids]})
+        if "running notes" in prompt:
+            return "Claims Python and agent work; gave a concrete example for OCR risk; vague on testing."
+        if "STEP 1" in prompt:
+            return json.dumps({"aligned_experience": ["AI agents"], "other_gaps": [], "overall_assessment": assessment})
+        if '"question": "Short' in prompt:
+            return json.dumps(question("interview"))
+        if '"overall_assessment"' in prompt:
+            return json.dumps({**contexts, "matching_skills": [], "missing_elements": [], "overall_assessment": assessment})
+        if '"technical_context"' in prompt:
+            return json.dumps(contexts)
+        if '"preferred"' in prompt:
+            return json.dumps({"required": ["Python", "PyTorch"], "preferred": ["Docker"]})
+        if "needs_followup" in prompt:
+            shallow = rng.random() < followup_rate
+            return json.dumps({"needs_followup": shallow, "reason": "", "depth_score": 2 if shallow else 4})
+        if '"Score"' in prompt:
+            return json.dumps({"Score": rng.randint(1, 5), "Reasoning": "Simulated evaluation"})
+        if "follow-up" in prompt:
+            return "Could you walk me through a concrete example?"
+        return "Thanks for sharing, let's get started."
+
+    return respond
+
+
+def run_candidate(resume_pdf: bytes, jd_pdf: bytes, answers: List[str], offset: int,
+                  think_time: float = 0.0, time_budget: float = 0.0, abandon_after: int = 0) -> Dict:
+    """One simulated candidate: phase 1, then the CLI turn loop answered from the transcript
+    (leaving after `abandon_after` answers when set, as if the tab were closed)"""
+    result = {"phase_one": None, "turns": [], "interview": None, "time_up": False, "abandoned": False,
+              "ok": False, "error": None}
+    try:
+        _run_candidate(resume_pdf, jd_pdf, answers, offset, think_time, time_budget, abandon_after, result)
+    except WorkCancelled:
+        result["abandoned"] = True
+    except Exception as e:  # an engine error that escaped its node ends this session only
+        result["error"] = f"{type(e).__name__}: {str(e)}"
+    return result
+
+
+def _run_candidate(resume_pdf: bytes, jd_pdf: bytes, answers: List[str], offset: int,
+                   think_time: float, time_budget: float, abandon_after: int, result: Dict):
+    started = time.perf_counter()
+    state = build_phase_one_graph().invoke(create_initial_state(resume_pdf, jd_pdf))
+    result["phase_one"] = time.perf_counter() - started
+    if "error" in state or "error" in state.get("resume_jd_analysis", {}) or not state.get("questions"):
+        result["error"] = "phase 1 produced no questions"
+        return
+    get_result_store().append_analysis(state)
+    if time_budget:
+        state["time_budget"] = time_budget
+
+    # Turn latency = time from one answer to the engine asking for the next one
+    script = itertools.cycle(answers[offset % len(answers):] + answers[:offset % len(answers)])
+    last_answer = [None]
+
+    def answer(prompt: str) -> str:
+        now = time.perf_counter()
+        if last_answer[0] is not None:
+            result["turns"].append(now - last_answer[0])
+        time.sleep(think_time)
+        last_answer[0] = time.perf_counter()
+        if abandon_after and len(result["turns"]) + 1 >= abandon_after:
+            # The candidate leaves: the session's pending work is cancelled, as on a closed tab
+            get_cancellations().cancel(state["session_id"], "abandoned")
+            forget_conversation_memory(state["session_id"])
+            get_ledger().forget(state["session_id"])
+        return next(script)
+
+    set_answer_source(answer)
+    interview_started = time.perf_counter()
+    final_state = build_interview_conversational_graph().invoke(state, {"recursion_limit": 200})
+    result["turns"].append(time.perf_counter() - last_answer[0])
+    result["interview"] = time.perf_counter() - interview_started
+    result["time_up"] = bool(final_state.get("time_up"))
+    get_conversation_memory(final_state["session_id"]).flush(timeout=30)
+    forget_conversation_memory(final_state["session_id"])
+    result["ledger"] = get_ledger().session_summary(final_state["session_id"])
+    get_result_store().append_ledger(final_state, result["ledger"])
+    get_ledger().forget(final_state["session_id"])
+    result["ok"] = True
+
+
+def percentiles(values: List[float], digits: int = 3) -> Dict[str, float]:
+    if not values:
+        return {}
+    return dict(zip(("p50", "p95", "p99"), np.percentile(values, [50, 95, 99]).round(digits).tolist()))
+
+
+def run_load(candidates: int, sessions: int, resume_pdf: str, jd_pdf: str, answers: List[str],
+             latency: str, error_rate: float, followup_rate: float, seed: int, verbose: bool = False,
+             think_time: float = 0.0, time_budget: float = 0.0, llm: str = "fake", abandon_rate: float = 0.0) -> Dict:
+    rng = random.Random(seed)
+    # Sessions that leave mid-interview, and after how many answers
+    abandon_after = [rng.randint(1, 4) if rng.random() < abandon_rate else 0 for _ in range(sessions)]
+    if llm == "fake":
+        fake = FakeLLM(make_responder(rng, followup_rate), parse_latency(latency, rng), error_rate, rng)
+        set_llm_factory(lambda: fake)
+
+    with open(resume_pdf, "rb") as f:
+        resume_bytes = f.read()
+    with open(jd_pdf, "rb") as f:
+        jd_bytes = f.read()
+
+    reset_usage()
+    get_scoring_paths().reset()
+    get_cancellations().reset_stats()
+    cpu_before = os.times()
+    started = time.perf_counter()
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    if not verbose:
+        set_log_level("WARNING")  # progress logging becomes a level check per call
+    try:
+        with output:
+            with ThreadPoolExecutor(max_workers=candidates) as pool:
+                results = list(pool.map(lambda i: run_candidate(resume_bytes, jd_bytes, answers, i, think_time, time_budget, abandon_after[i]), range(sessions)))
+            flush_logs()
+    finally:
+        set_llm_factory(None)
+    wall = time.perf_counter() - started
+    cpu_after = os.times()
+    cpu = (cpu_after.user - cpu_before.user) + (cpu_after.system - cpu_before.system)
+
+    usage = get_usage_summary()
+    turns = [t for r in results for t in r["turns"]]
+    completed = sum(1 for r in results if r["ok"])
+    return {
+        "candidates": candidates,
+        "sessions": sessions,
+        "completed": completed,
+        "failures": dict(Counter(r["error"] for r in results if r["error"])),
+        "wall_time": round(wall, 2),
+        "sessions_per_minute": round(completed / wall * 60, 2),
+        "turns_per_second": round(len(turns) / wall, 2),
+        "phase_one": percentiles([r["phase_one"] for r in results if r["phase_one"] is not None]),
+        "turn": percentiles(turns),
+        "turns": len(turns),
+        "interview": percentiles([r["interview"] for r in results if r["interview"] is not None]),
+        "time_boxed_sessions": sum(1 for r in results if r["time_up"]),
+        "abandoned_sessions": sum(1 for r in results if r["abandoned"]),
+        "cancellation": get_cancellations().stats(),
+        "cpu_seconds": round(cpu, 2),
+        "cpu_utilization": round(cpu / wall, 2),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1) if resource else None,
+        "cost_per_session": percentiles([r["ledger"]["cost_usd"] for r in results if r.get("ledger")], 5),
+        "over_budget_sessions": sum(1 for r in results if r.get("ledger", {}).get("status", "ok") != "ok"),
+        "scoring_paths": get_scoring_paths().snapshot(),
+        "llm": llm,
+        "cassette": cassette_summary(),
+        "llm_calls": usage["calls"],
+        "llm_errors": usage["errors"],
+        "llm_peak_concurrency": usage["peak_concurrency"],
+        "llm_mean_concurrency": round(usage["llm_latency"] / wall, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resume", default="resources/cv-ml.pdf")
+    parser.add_argument("--jd", default="resources/JD-ml.pdf")
+    parser.add_argument("--candidates", type=int, default=10, help="Simulated candidates running at once")
+    parser.add_argument("--sessions", type=int, help="Total sessions to run (default: one per candidate)")
+    parser.add_argument("--transcript", help="Scripted answers (JSON list or one answer per line)")
+    parser.add_argument("--latency", default="lognormal:0.8:0.5", help="Fake LLM latency distribution")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of fake LLM calls that fail")
+    parser.add_argument("--followup-rate", type=float, default=0.3, help="Share of answers judged shallow")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Seconds each simulated answer takes")
+    parser.add_argument("--time-budget", type=float, default=0.0,
+                        help="Interview time-box in seconds (default: INTERVIEW_TIME_BUDGET, 0 = none)")
+    parser.add_argument("--abandon-rate", type=float, default=0.0,
+                        help="Share of candidates who leave mid-interview (their pending work is cancelled)")
+    parser.add_argument("--llm", choices=["fake", "configured"], default="fake",
+                        help="Serve calls from the FakeLLM or the configured LLM_BACKENDS")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="Keep the engine's console output")
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    args = parser.parse_args()
+
+    report = run_load(args.candidates, args.sessions or args.candidates, args.resume, args.jd,
+                      load_transcript(args.transcript), args.latency, args.error_rate,
+                      args.followup_rate, args.seed, args.verbose, args.think_time, args.time_budget, args.llm, args.abandon_rate)
+
+    print(f"\n🏋️ {report['completed']}/{report['sessions']} sessions with {report['candidates']} concurrent candidates "
+          f"in {report['wall_time']:.1f}s")
+    print(f"   Throughput:      {report['sessions_per_minute']} sessions/min, {report['turns_per_second']} turns/s")
+    print(f"   Phase 1 (s):     {report['phase_one']}")
+    print(f"   Turn (s):        {report['turn']} over {report['turns']} turns")
+    print(f"   Interview (s):   {report['interview']} ({report['time_boxed_sessions']} sessions cut short by the time-box)")
+    print(f"   CPU:             {report['cpu_seconds']}s ({report['cpu_utilization']} cores busy), "
+          f"peak RSS {report['peak_rss_mb']} MB")
+    print(f"   Cost/session $:  {report['cost_per_session']} ({report['over_budget_sessions']} sessions hit the budget)")
+    print(f"   Scoring:         {report['scoring_paths']['counts']} ({report['scoring_paths']['llm_share']} scored by the LLM)")
+    for error, count in report["failures"].items():
+        print(f"   ❌ {count}x {error}")
+    print(f"   LLM:             {report['llm_calls']} calls, {report['llm_errors']} errors, "
+          f"concurrency peak {report['llm_peak_concurrency']} / mean {report['llm_mean_concurrency']}")
+
+    if report["abandoned_sessions"]:
+        print(f"   Abandoned:       {report['abandoned_sessions']} sessions, work avoided {report['cancellation']}")
+    if report["cassette"]:
+        print(f"   Cassette:        {report['cassette']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Saved load report to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
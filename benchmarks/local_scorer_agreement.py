@@ -0,0 +1,48 @@
+"""
+Check the local first-pass scorer against the LLM scores in the result store.
+
+Every LLM-scored answer is stored with the local scorer's shadow score and confidence. This
+reports, per confidence threshold, the share of answers that would have been scored locally
+and how well those local scores agree with the LLM's. Pick LOCAL_SCORE_CONFIDENCE from it
+before turning on LOCAL_SCORING_ENABLED.
+
+Usage (from the repo root):
+    python -m benchmarks.local_scorer_agreement
+    python -m benchmarks.local_scorer_agreement --results-dir results --thresholds 0.6 0.7 0.8
+"""
+
+import argparse
+import json
+
+from tools.local_scorer import LOCAL_SCORE_CONFIDENCE, agreement
+from tools.results_store import RESULTS_DIR, ResultStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results-dir", default=RESULTS_DIR)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.0, 0.5, 0.6, 0.7, 0.75, 0.8, 0.9])
+    parser.add_argument("--output", help="Write the table to this JSON file")
+    args = parser.parse_args()
+
+    store = ResultStore(args.results_dir)
+    rows = agreement((record["evaluation"] for record in store.iter_records("evaluation")), args.thresholds)
+    if not rows or rows[0]["local_share"] is None:
+        print(f"⚠️ No LLM-scored evaluations with a shadow local score in {args.results_dir}/")
+        return
+
+    print(f"\n🧮 Local scorer vs LLM scores ({args.results_dir}/, current threshold {LOCAL_SCORE_CONFIDENCE})\n")
+    print(f"{'threshold':>10}{'local share':>13}{'answers':>9}{'exact':>8}{'within 1':>10}{'MAE':>7}")
+    for row in rows:
+        print(f"{row['threshold']:>10}{row['local_share']:>13}{row['answers']:>9}"
+              f"{row['exact'] if row['exact'] is not None else '-':>8}"
+              f"{row['within_one'] if row['within_one'] is not None else '-':>10}"
+              f"{row['mae'] if row['mae'] is not None else '-':>7}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Mock OpenAI-compatible chat completions server for the "openai" LLM backend.
+
+Replies with the load harness's canned responses (shaped like each engine prompt expects) after
+a simulated latency, so the HTTP backend, streaming and failover can be exercised without a model.
+
+Usage (from the repo root):
+    python -m benchmarks.mock_openai_server --port 8000 --latency fixed:0.2
+    LLM_BACKENDS=openai OPENAI_BASE_URL=http://localhost:8000/v1 \
+        python -m benchmarks.interview_load --llm configured --candidates 10
+"""
+
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from llm import estimate_tokens
+from benchmarks.interview_load import make_responder, parse_latency
+
+
+def make_handler(respond, latency, error_rate: float, rng: random.Random):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            if not self.path.endswith("/chat/completions"):
+                self.send_error(404)
+                return
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            prompt = "\n".join(message.get("content", "") for message in body.get("messages", []))
+            time.sleep(max(latency(), 0.0))
+            if rng.random() < error_rate:
+                self.send_error(503, "Simulated overload")
+                return
+
+            text = respond(prompt)
+            usage = {"prompt_tokens": estimate_tokens(prompt), "completion_tokens": estimate_tokens(text)}
+            if not body.get("stream"):
+                self._send(200, "application/json", json.dumps({
+                    "model": body.get("model"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                    "usage": usage,
+                }).encode("utf-8"))
+                return
+
+            events = [{"choices": [{"index": 0, "delta": {"content": text[i:i + 40]}}]} for i in range(0, len(text), 40)]
+            events.append({"choices": [], "usage": usage})
+            stream = "".join(f"data: {json.dumps(event)}\n\n" for event in events) + "data: [DONE]\n\n"
+            self._send(200, "text/event-stream", stream.encode("utf-8"))
+
+        def _send(self, status: int, content_type: str, payload: bytes):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", default="fixed:0.2", help="Simulated latency distribution (as in interview_load)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with a 503")
+    parser.add_argument("--followup-rate", type=float, default=0.3, help="Share of answers judged shallow")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    handler = make_handler(make_responder(rng, args.followup_rate), parse_latency(args.latency, rng), args.error_rate, rng)
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"🧪 Mock OpenAI-compatible server on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Compare phase-1 latency and token usage between the step-by-step graph and the fused single-call mode.
+
+Usage (from the repo root):
+    python -m benchmarks.phase_one_modes --runs 3
+"""
+
+import argparse
+import statistics
+import time
+
+from graph import build_phase_one_graph, create_initial_state
+from llm import get_context_cache, get_usage_summary, reset_usage
+
+
+def run_mode(mode: str, resume_pdf: str, jd_pdf: str, runs: int) -> dict:
+    graph = build_phase_one_graph(mode)
+    timings, summaries, fallbacks = [], [], 0
+
+    for _ in range(runs):
+        reset_usage()
+        started = time.perf_counter()
+        state = graph.invoke(create_initial_state(resume_pdf, jd_pdf))
+        timings.append(time.perf_counter() - started)
+        summaries.append(get_usage_summary())
+        if state.get("fused_error"):
+            fallbacks += 1
+
+    return {
+        "mode": mode,
+        "median_latency": statistics.median(timings),
+        "calls": statistics.mean(s["calls"] for s in summaries),
+        "input_tokens": statistics.mean(s["input_tokens"] for s in summaries),
+        "output_tokens": statistics.mean(s["output_tokens"] for s in summaries),
+        "fallbacks": fallbacks,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resume", default="resources/cv-ml.pdf")
+    parser.add_argument("--jd", default="resources/JD-ml.pdf")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--modes", nargs="+", default=["graph", "fused"])
+    args = parser.parse_args()
+
+    results = [run_mode(mode, args.resume, args.jd, args.runs) for mode in args.modes]
+
+    print(f"\n{'mode':<8}{'latency (s)':>14}{'calls':>8}{'input tok':>12}{'output tok':>12}{'fallbacks':>11}")
+    for r in results:
+        print(f"{r['mode']:<8}{r['median_latency']:>14.2f}{r['calls']:>8.1f}"
+              f"{r['input_tokens']:>12.0f}{r['output_tokens']:>12.0f}{r['fallbacks']:>11}")
+
+    context_cache = get_context_cache()
+    if context_cache is not None:
+        print(f"\n🗄️ Context cache: {context_cache.summary()}")
+
+
+if __name__ == "__main__":
+    main()
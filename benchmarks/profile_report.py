@@ -0,0 +1,102 @@
+"""
+Merge the per-invocation profiles written under PROFILE_TARGETS into one hot-function report.
+
+Prints wall / CPU time per profiled node, the top-N functions across all merged cProfile
+dumps, and the allocation sites that grew most in the sampled tracemalloc runs.
+
+Usage (from the repo root):
+    PROFILE_TARGETS=all python main.py                  # or the app / load test
+    python -m benchmarks.profile_report --top 25 [--node Analyze] [--sort tottime]
+"""
+
+import argparse
+import glob
+import io
+import json
+import os
+import pstats
+import statistics
+from collections import defaultdict
+
+from tools.profiling import PROFILE_DIR
+
+
+def load_runs(directory: str, node: str = None):
+    runs = []
+    for meta_path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue
+        if node and meta.get("name") != node:
+            continue
+        prof_path = meta_path[:-len(".json")] + ".prof"
+        meta["prof_path"] = prof_path if os.path.exists(prof_path) else None
+        runs.append(meta)
+    return runs
+
+
+def node_table(runs) -> str:
+    by_node = defaultdict(list)
+    for run in runs:
+        by_node[run["name"]].append(run)
+
+    lines = [f"{'node':<20}{'calls':>7}{'wall p50':>11}{'wall max':>11}{'cpu p50':>10}{'peak MB':>10}"]
+    for name, node_runs in sorted(by_node.items(), key=lambda item: -sum(r["wall_time"] for r in item[1])):
+        walls = [r["wall_time"] for r in node_runs]
+        cpus = [r["thread_cpu_time"] for r in node_runs]
+        peaks = [r["peak_traced_bytes"] for r in node_runs if "peak_traced_bytes" in r]
+        peak = f"{max(peaks) / 1e6:.1f}" if peaks else "-"
+        lines.append(f"{name:<20}{len(node_runs):>7}{statistics.median(walls):>11.3f}{max(walls):>11.3f}"
+                     f"{statistics.median(cpus):>10.3f}{peak:>10}")
+    return "\n".join(lines)
+
+
+def hot_functions(runs, top: int, sort: str) -> str:
+    paths = [run["prof_path"] for run in runs if run["prof_path"]]
+    if not paths:
+        return "No cProfile dumps found."
+    buffer = io.StringIO()
+    stats = pstats.Stats(paths[0], stream=buffer)
+    for path in paths[1:]:
+        stats.add(path)
+    stats.files = []  # don't list every merged dump in the header
+    stats.strip_dirs().sort_stats(sort).print_stats(top)
+    return buffer.getvalue()
+
+
+def top_allocations(runs, top: int) -> str:
+    sizes = defaultdict(int)
+    for run in runs:
+        for allocation in run.get("top_allocations", []):
+            sizes[allocation["site"]] += allocation["size_diff"]
+    if not sizes:
+        return "No tracemalloc samples found (see PROFILE_MEMORY_RATE)."
+    ranked = sorted(sizes.items(), key=lambda item: -item[1])[:top]
+    return "\n".join(f"{size / 1e6:>10.2f} MB  {site}" for site, size in ranked)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default=PROFILE_DIR)
+    parser.add_argument("--node", help="Only merge profiles of this node")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--sort", default="cumulative", help="pstats sort key (cumulative, tottime, calls, ...)")
+    args = parser.parse_args()
+
+    runs = load_runs(args.dir, args.node)
+    if not runs:
+        print(f"❌ No profiles found in {args.dir}")
+        return
+
+    print(f"\n⏱️ Profiled invocations ({len(runs)})\n")
+    print(node_table(runs))
+    print(f"\n🔥 Top {args.top} functions by {args.sort}\n")
+    print(hot_functions(runs, args.top, args.sort))
+    print(f"🧠 Top {args.top} allocation sites (sampled)\n")
+    print(top_allocations(runs, args.top))
+
+
+if __name__ == "__main__":
+    main()
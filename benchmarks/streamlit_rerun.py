@@ -0,0 +1,148 @@
+"""
+Measure Streamlit rerun time against interview length.
+
+Loads the app headlessly (streamlit.testing AppTest) with a synthetic interview of N answered
+turns and a fake LLM, then times a plain rerun (what every app-level interaction costs) and an
+answer submit (one chat turn), reporting the median over a few repeats for each N.
+
+Usage (from the repo root):
+    python -m benchmarks.streamlit_rerun --turns 0 10 20 40 80 --repeats 5
+    git show HEAD~1:streamlit_app.py > streamlit_app_before.py
+    python -m benchmarks.streamlit_rerun --app streamlit_app_before.py      # compare with an older version
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import time
+import uuid
+from typing import Dict, List
+
+from streamlit.testing.v1 import AppTest
+
+# Keep synthetic evaluations out of the real result store
+os.environ.setdefault("RESULTS_DIR", os.path.join(".cache", "rerun_results"))
+
+from llm import FakeLLM, set_llm_factory
+
+ANSWER = ("I led the migration of our feature pipeline to Spark, cut the nightly batch from six hours to forty "
+          "minutes by partitioning on customer id, and added data quality checks before the model retrain.")
+
+
+def fake_responder(prompt: str) -> str:
+    if "depth and completeness" in prompt:
+        return json.dumps({"needs_followup": False, "reason": "complete", "depth_score": 4})
+    if "Score" in prompt:
+        return json.dumps({"Score": 4, "Reasoning": "Covers the key points with a concrete example."})
+    return "Could you walk me through a specific example?"
+
+
+def synthetic_session(turns: int) -> Dict:
+    """Session state of an interview `turns` answers in (intro done, technical questions under way)"""
+    questions = {
+        q_type: [{"question": f"{q_type.title()} question {i}: how would you approach this problem?",
+                  "answer": "A structured answer naming the trade-offs and a concrete example."}
+                 for i in range(turns + 10)]
+        for q_type in ("technical", "behavioral", "situational")
+    }
+    chat_history = [{"type": "interviewer", "content": "👋 Hello! Could you tell me a bit about yourself?"},
+                    {"type": "candidate", "content": ANSWER}]
+    evaluations = []
+    for i in range(turns):
+        chat_history.append({"type": "interviewer", "content": questions["technical"][i]["question"]})
+        chat_history.append({"type": "candidate", "content": ANSWER})
+        evaluations.append({"Question": questions["technical"][i]["question"], "User_Answer": ANSWER,
+                            "Score": 4, "Reasoning": "Solid answer."})
+    interview_state = {
+        "session_id": uuid.uuid4().hex,
+        "resume": "Data engineer with seven years of Spark and Python experience. " * 40,
+        "job_description": "Senior Data Engineer\nBuild batch and streaming pipelines. " * 40,
+        "resume_jd_analysis": {"overall_assessment": {"fit": "Strong", "final_score": "4.2/5",
+                                                      "recommendation": "Proceed to interview"}},
+        "questions": questions,
+        "chat_history": [{"question": q["question"], "answer": ANSWER} for q in questions["technical"][:turns]],
+        "evaluation": [],
+        "question_type_order": ["technical", "behavioral", "situational"],
+        "current_question_type": "technical",
+        "current_topic_depth": 0,
+        "follow_up_needed": False,
+        "interview_phase": "technical",
+        "question_indices": {"technical": turns, "behavioral": 0, "situational": 0},
+    }
+    return {
+        "stage": "interview",
+        "interview_started": True,
+        "interview_phase": "technical",
+        "interview_state": interview_state,
+        "analysis_results": interview_state,
+        "analysis_complete": True,
+        "chat_history": chat_history + [{"type": "interviewer", "content": questions["technical"][turns]["question"]}],
+        "current_question": questions["technical"][turns]["question"],
+        "question_count": turns,
+        "total_questions": 3 * (turns + 10),
+        "question_indices": {"technical": turns, "behavioral": 0, "situational": 0},
+        "evaluation_results": evaluations,
+    }
+
+
+def new_app(app: str, turns: int) -> AppTest:
+    at = AppTest.from_file(os.path.abspath(app), default_timeout=120)
+    # Session state is seeded from outside a script run, which streamlit warns about on every access
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+    for key, value in synthetic_session(turns).items():
+        at.session_state[key] = value
+    return at.run()
+
+
+def measure(app: str, turns: int, repeats: int) -> Dict:
+    at = new_app(app, turns)
+    assert not at.exception, at.exception
+    reruns = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        at.run()
+        reruns.append(time.perf_counter() - started)
+
+    submits = []
+    for _ in range(repeats):
+        at = new_app(app, turns)
+        at.text_area[0].input(ANSWER)
+        started = time.perf_counter()
+        next(button for button in at.button if button.label.startswith("Submit")).click().run()
+        submits.append(time.perf_counter() - started)
+        assert not at.exception, at.exception
+    return {
+        "turns": turns,
+        "rerun_ms": round(statistics.median(reruns) * 1000, 1),
+        "submit_ms": round(statistics.median(submits) * 1000, 1),
+        "markdown_elements": len(at.markdown),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default="streamlit_app.py")
+    parser.add_argument("--turns", type=int, nargs="+", default=[0, 10, 20, 40])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", help="Write the measurements to this JSON file")
+    args = parser.parse_args()
+
+    fake = FakeLLM(fake_responder)
+    set_llm_factory(lambda: fake)
+    rows: List[Dict] = []
+    print(f"\n🖥️ Rerun cost of {args.app} (median of {args.repeats})\n")
+    print(f"{'turns':>6}{'rerun ms':>11}{'submit ms':>11}{'markdown':>10}")
+    for turns in args.turns:
+        row = measure(args.app, turns, args.repeats)
+        rows.append(row)
+        print(f"{row['turns']:>6}{row['rerun_ms']:>11}{row['submit_ms']:>11}{row['markdown_elements']:>10}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"app": args.app, "results": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
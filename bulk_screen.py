@@ -0,0 +1,118 @@
+"""
+Screen many resumes against one job description.
+
+A local lexical pre-filter scores every resume against the JD's skills (extracted once, one
+cheap LLM call) through an inverted index; only the top-N and/or above-threshold resumes get
+the full LLM fit analysis. Every resume's pre-filter score is recorded next to its final
+result (and appended to the result store), so pre-filter recall can be audited.
+
+Usage:
+    python bulk_screen.py jd.pdf resume1.pdf resume2.pdf ... [--top-n 20] [--threshold 0.3] [--output screening.json]
+"""
+
+import argparse
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from llm import get_llm
+from tools.analyzer import ResumeJDAnalyzer, parse_final_score
+from tools.log import get_logger
+from tools.prefilter import JDSkillExtractor, ResumeSkillIndex, select_candidates
+from tools.results_store import get_result_store
+
+logger = get_logger("bulk_screen")
+
+
+def screen_resumes(jd_pdf: str, resume_pdfs: List[str], top_n: Optional[int] = None,
+                   threshold: Optional[float] = None, llm=None, max_workers: int = 4) -> Dict:
+    """Pre-filter all resumes locally, then run the LLM fit analysis only on those that pass"""
+    llm = llm or get_llm()
+    analyzer = ResumeJDAnalyzer(llm, None, jd_pdf)
+
+    jd_text = analyzer._pdf_to_markdown(jd_pdf, "job_description")
+    if jd_text.startswith("Error"):
+        return {"jd": jd_pdf, "error": jd_text, "rows": []}
+
+    skills = JDSkillExtractor(llm).extract(jd_text)
+    if "error" in skills:
+        return {"jd": jd_pdf, "error": skills["error"], "rows": []}
+
+    # Local stage: convert and index every resume, no LLM calls
+    index = ResumeSkillIndex()
+    resume_texts, failed = {}, []
+    for resume_pdf in resume_pdfs:
+        resume_text = analyzer._pdf_to_markdown(resume_pdf)
+        if resume_text.startswith("Error"):
+            failed.append({"resume": resume_pdf, "error": resume_text, "passed_prefilter": False, "final_score": None})
+            continue
+        resume_texts[resume_pdf] = resume_text
+        index.add(resume_pdf, resume_text)
+
+    rows = select_candidates(index.score(skills), top_n=top_n, threshold=threshold)
+    passed = [row for row in rows if row["passed_prefilter"]]
+    logger.info("🔎 Pre-filter: %d/%d resumes go on to LLM analysis", len(passed), len(rows))
+
+    # LLM stage: full fit analysis for the shortlist only, in parallel (LLM-bound)
+    def analyze(row: Dict):
+        analysis = analyzer.analyze_texts(resume_texts[row["resume"]], jd_text)
+        if "error" in analysis:
+            row["error"] = analysis["error"]
+            return
+        assessment = analysis.get("overall_assessment", {})
+        row["fit"] = assessment.get("fit", "Unknown")
+        row["final_score"] = parse_final_score(assessment.get("final_score"))
+        row["analysis"] = analysis
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        list(pool.map(analyze, passed))
+
+    # Resumes that failed conversion are recorded too, so the store accounts for the whole run
+    store = get_result_store()
+    for row in rows + failed:
+        row.setdefault("final_score", None)
+        store.append_screening(jd_text, row)
+
+    return {
+        "jd": jd_pdf,
+        "jd_skills": skills,
+        "top_n": top_n,
+        "threshold": threshold,
+        "llm_analyses": len(passed),
+        "rows": rows + failed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("jd")
+    parser.add_argument("resumes", nargs="+")
+    parser.add_argument("--top-n", type=int, help="Send at most this many resumes to the LLM")
+    parser.add_argument("--threshold", type=float, help="Minimum pre-filter score (0-1) to reach the LLM")
+    parser.add_argument("--output", help="Write the full screening result to this JSON file")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    result = screen_resumes(args.jd, args.resumes, top_n=args.top_n, threshold=args.threshold, max_workers=args.workers)
+    if "error" in result:
+        print(f"❌ {result['error']}")
+        return
+
+    print(f"\n📊 Screening for {result['jd']} ({result['llm_analyses']} LLM analyses)\n")
+    print(f"{'rank':>4} {'pre':>6} {'score':>6}  {'fit':<10} resume")
+    for row in result["rows"]:
+        if "error" in row:
+            print(f"{'-':>4} {'-':>6} {'-':>6}  {'error':<10} {row['resume']} ({row['error']})")
+            continue
+        score = f"{row['final_score']:.1f}" if row["final_score"] is not None else "-"
+        print(f"{row['prefilter_rank']:>4} {row['prefilter_score']:>6.2f} {score:>6}  {row.get('fit', 'skipped'):<10} {row['resume']}")
+
+    get_result_store().close()
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n✅ Saved screening result to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
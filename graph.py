@@ -1,17 +1,27 @@
 
 # graph.py
 from langgraph.graph import StateGraph
-from typing import TypedDict, Dict, List, Optional
+from typing import TypedDict, Dict, List, Optional, Union
+import os
+import uuid
 
 from tools.analyzer import analyze_resume_jd_tool
-from tools.context_splitter import context_split_tool
+from tools.context_splitter import context_split_tool, releasing_document_prefix
 from tools.question_generator import generate_questions_tool
+from tools.fused_analyzer import fused_analysis_tool
 from tools.interview_conversational_agent import build_interview_conversational_graph
+from tools.profiling import profiled
+from tools.log import get_logger
+from tools.token_ledger import get_ledger
+from llm import tag_llm_calls
+
+logger = get_logger("graph")
 
 
 class InterviewState(TypedDict):
-    resume_pdf: str  # PDF file path
-    jd_pdf: str  # PDF file path
+    session_id: str
+    resume_pdf: Union[str, bytes]  # PDF file path or in-memory PDF bytes
+    jd_pdf: Union[str, bytes]  # PDF file path or in-memory PDF bytes
     resume: str  # Text content (converted from PDF)
     job_description: str  # Text content (converted from PDF)
     resume_jd_analysis: Dict
@@ -29,6 +39,12 @@ class InterviewState(TypedDict):
     current_question_type: str
     interview_phase: str
     question_indices: Dict[str, int]
+    fused_error: Optional[str]
+    context_cache_handle: Optional[str]
+    document_extraction: Dict[str, Dict]  # per-document conversion report (tier, timings)
+
+# "graph" = one LLM call per step, "fused" = single combined call with graph fallback
+PHASE_ONE_MODE = os.environ.get("PHASE_ONE_MODE", "graph")
 
 
 # ✅ Phase 1: Resume/Job/Question Graph
@@ -36,9 +52,9 @@ def build_initial_analysis_graph():
     graph = StateGraph(InterviewState)
     
     graph.add_node("Start", lambda state: {"next": "Analyze"})
-    graph.add_node("Analyze", analyze_resume_jd_tool)
-    graph.add_node("ContextSplit", context_split_tool)
-    graph.add_node("GenerateQuestions", generate_questions_tool)
+    graph.add_node("Analyze", profiled("Analyze")(tag_llm_calls("Analyze")(analyze_resume_jd_tool)))
+    graph.add_node("ContextSplit", profiled("ContextSplit")(releasing_document_prefix(tag_llm_calls("ContextSplit")(context_split_tool))))
+    graph.add_node("GenerateQuestions", profiled("GenerateQuestions")(tag_llm_calls("GenerateQuestions")(generate_questions_tool)))
 
     graph.add_edge("Start", "Analyze")
     graph.add_edge("Analyze", "ContextSplit")
@@ -50,6 +66,71 @@ def build_initial_analysis_graph():
     return graph.compile()
 
 
+def route_after_fused(state: InterviewState) -> str:
+    """Fall back to the step-by-step chain when the fused call did not produce usable output"""
+    return "fallback" if state.get("fused_error") else "done"
+
+
+# ✅ Phase 1 (fused): one LLM round trip, step-by-step graph kept as fallback
+def build_fused_analysis_graph():
+    graph = StateGraph(InterviewState)
+
+    graph.add_node("FusedAnalyze", profiled("FusedAnalyze")(tag_llm_calls("FusedAnalyze")(fused_analysis_tool)))
+    graph.add_node("Analyze", profiled("Analyze")(tag_llm_calls("Analyze")(analyze_resume_jd_tool)))
+    graph.add_node("ContextSplit", profiled("ContextSplit")(releasing_document_prefix(tag_llm_calls("ContextSplit")(context_split_tool))))
+    graph.add_node("GenerateQuestions", profiled("GenerateQuestions")(tag_llm_calls("GenerateQuestions")(generate_questions_tool)))
+
+    graph.set_entry_point("FusedAnalyze")
+    graph.add_conditional_edges("FusedAnalyze", route_after_fused, {
+        "done": "__end__",
+        "fallback": "Analyze",
+    })
+    graph.add_edge("Analyze", "ContextSplit")
+    graph.add_edge("ContextSplit", "GenerateQuestions")
+    graph.set_finish_point("GenerateQuestions")
+
+    return graph.compile()
+
+
+def build_phase_one_graph(mode: Optional[str] = None):
+    """Pick the phase-1 graph for the given (or configured) mode"""
+    mode = mode or PHASE_ONE_MODE
+    if mode == "fused":
+        return build_fused_analysis_graph()
+    return build_initial_analysis_graph()
+
+
+def create_initial_state(resume_pdf: Union[str, bytes], jd_pdf: Union[str, bytes]) -> dict:
+    """Blank interview state for a resume/JD pair, ready for phase 1"""
+    get_ledger()  # account this session's LLM calls from the first one
+    return {
+        "session_id": uuid.uuid4().hex,
+        "resume_pdf": resume_pdf,
+        "jd_pdf": jd_pdf,
+        "resume": "",
+        "job_description": "",
+        "resume_jd_analysis": {},
+        "context_split": {},
+        "questions": {},
+        "current_question": None,
+        "user_response": None,
+        "chat_history": [],
+        "evaluation": [],
+        "question_index": 0,
+        "question_type_order": ["technical", "behavioral", "situational"],
+        "conversation_context": {},
+        "follow_up_needed": False,
+        "current_topic_depth": 0,
+        "current_question_type": "technical",
+        "interview_phase": "intro",
+        "question_indices": {
+            "technical": 0,
+            "behavioral": 0,
+            "situational": 0
+        }
+    }
+
+
 # ✅ Orchestrate full pipeline: Phase 1 ➝ Phase 2
 def run_full_interview_pipeline(resume: str, job_description: str):
     # Initialize base state
@@ -72,7 +153,7 @@ def run_full_interview_pipeline(resume: str, job_description: str):
     state = initial_graph.invoke(state)
 
     if "error" in state:
-        print("🚨 Error during initial analysis:", state["error"])
+        logger.error("🚨 Error during initial analysis: %s", state["error"])
         return state
     # return state
 
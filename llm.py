@@ -1,13 +1,575 @@
 # llm.py
 from langchain_google_genai import ChatGoogleGenerativeAI
+import asyncio
+import contextvars
+import functools
+import hashlib
+import json
 import os
+import random
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+
+from tools.cancellation import WorkCancelled, get_cancellations
+from tools.log import get_logger
 
 os.environ["GOOGLE_API_KEY"] = "your-api-key"
 
-class GeminiLLM:
-    def __init__(self, model_name="gemini-2.5-flash"):
-        self.model = ChatGoogleGenerativeAI(model=model_name)
+logger = get_logger("llm")
+
+# Process-wide record of every LLM call (tokens + latency), used by benchmarks
+_usage_log = []
+_usage_lock = threading.Lock()
+
+
+# Calls currently in flight and the most seen at once since the last reset
+_concurrency = {"in_flight": 0, "peak": 0}
+
+
+# Tags (session_id, node, ...) attached to every call made in the current context
+_call_tags = contextvars.ContextVar("llm_call_tags", default={})
+# Callbacks receiving each recorded call (e.g. the per-session token ledger)
+_usage_listeners = []
+
+
+@contextmanager
+def llm_call_context(**tags):
+    """Tag LLM calls made inside this block; nested blocks add to / override outer tags"""
+    token = _call_tags.set({**_call_tags.get(), **{k: v for k, v in tags.items() if v is not None}})
+    try:
+        yield
+    finally:
+        _call_tags.reset(token)
+
+
+def tag_llm_calls(node: str):
+    """Decorator for graph nodes: tag the node's LLM calls with its name and the state's session"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(state, *args, **kwargs):
+            session_id = state.get("session_id") if isinstance(state, dict) else None
+            get_cancellations().check(session_id, node=node)  # stop a cancelled session at the next node
+            with llm_call_context(session_id=session_id, node=node):
+                return fn(state, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def add_usage_listener(listener):
+    if listener not in _usage_listeners:
+        _usage_listeners.append(listener)
+
+
+def record_usage(input_tokens: int, output_tokens: int, latency: float, error: bool = False,
+                 reasoning_tokens: int = 0, model: str = None):
+    entry = {
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "reasoning_tokens": reasoning_tokens,
+        "latency": latency,
+        "error": error,
+        "model": model,
+        **_call_tags.get(),
+    }
+    with _usage_lock:
+        _usage_log.append(entry)
+    for listener in _usage_listeners:
+        listener(entry)
+
+
+@contextmanager
+def _track_call(prompt: str = None):
+    # Calls for a cancelled session are refused before they reach the backend
+    session_id = _call_tags.get().get("session_id")
+    get_cancellations().check(session_id, prompt=prompt or "")
+    with _usage_lock:
+        _concurrency["in_flight"] += 1
+        _concurrency["peak"] = max(_concurrency["peak"], _concurrency["in_flight"])
+    try:
+        yield
+    finally:
+        with _usage_lock:
+            _concurrency["in_flight"] -= 1
+        if get_cancellations().is_cancelled(session_id):
+            get_cancellations().record("llm_calls_finished_after_cancel")
+
+
+def get_usage_summary() -> dict:
+    """Aggregate the calls recorded since the last reset"""
+    with _usage_lock:
+        calls = list(_usage_log)
+        peak_concurrency = _concurrency["peak"]
+    return {
+        "calls": len(calls),
+        "errors": sum(1 for c in calls if c["error"]),
+        "input_tokens": sum(c["input_tokens"] for c in calls),
+        "output_tokens": sum(c["output_tokens"] for c in calls),
+        "llm_latency": sum(c["latency"] for c in calls),
+        "peak_concurrency": peak_concurrency,
+    }
+
+
+def reset_usage():
+    with _usage_lock:
+        _usage_log.clear()
+        _concurrency["peak"] = _concurrency["in_flight"]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for budgeting without a tokenizer"""
+    return len(text) // 4
+
+
+# -------------------------------
+# 🔹 Backends
+# -------------------------------
+# Backends in failover order, comma-separated: "gemini", "openai" (any OpenAI-compatible server), "fake"
+LLM_BACKENDS = [name.strip() for name in os.environ.get("LLM_BACKENDS", "gemini").split(",") if name.strip()]
+# Per-call timeout in seconds (0 = client default); a call that errors or times out fails over to the next backend
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", "0"))
+# Gemini client retries before a call counts as failed (lower it when failing over)
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "6"))
+# Seconds a failed backend is skipped (by every session) before it is tried again
+LLM_FAILOVER_COOLDOWN = float(os.environ.get("LLM_FAILOVER_COOLDOWN", "30"))
+
+# OpenAI-compatible chat completions endpoint (vLLM, llama.cpp server, Ollama, LM Studio, a mock, ...)
+OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL", "http://localhost:8000/v1")
+OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
+OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "local-model")
+
+
+class LLMBackend:
+    """Interface every backend offers: `invoke(prompt) -> str`, `stream(prompt)` yielding text chunks,
+    and `ainvoke(prompt)` for asyncio callers. Subclasses implement `invoke` and override the rest
+    when the client can stream or await natively."""
+    model_name = None
+
+    def __init__(self):
+        self.last_usage = {}
+
+    def invoke(self, prompt: str) -> str:
+        raise NotImplementedError
+
+    def stream(self, prompt: str):
+        yield self.invoke(prompt)
+
+    async def ainvoke(self, prompt: str) -> str:
+        return await asyncio.to_thread(self.invoke, prompt)  # runs with this context's call tags
+
+    def _record(self, usage: dict, started: float):
+        self.last_usage = usage or {}
+        record_usage(self.last_usage.get("input_tokens", 0), self.last_usage.get("output_tokens", 0),
+                     time.perf_counter() - started,
+                     reasoning_tokens=self.last_usage.get("output_token_details", {}).get("reasoning", 0),
+                     model=self.model_name)
+
+    def _record_error(self, prompt: str, started: float, error: Exception = None):
+        if isinstance(error, WorkCancelled):
+            return  # refused before reaching the backend
+        record_usage(estimate_tokens(prompt), 0, time.perf_counter() - started, error=True, model=self.model_name)
+
+
+class GeminiLLM(LLMBackend):
+    def __init__(self, model_name="gemini-2.5-flash", cached_content=None, timeout=LLM_TIMEOUT,
+                 max_retries=LLM_MAX_RETRIES):
+        super().__init__()
+        self.model_name = model_name
+        self.model = ChatGoogleGenerativeAI(model=model_name, cached_content=cached_content,
+                                            timeout=timeout or None, max_retries=max_retries)
 
     def invoke(self, prompt: str):
-        response = self.model.invoke(prompt)
+        started = time.perf_counter()
+        try:
+            with _track_call(prompt):
+                response = self.model.invoke(prompt)
+        except Exception as e:
+            self._record_error(prompt, started, e)
+            raise
+        self._record(getattr(response, "usage_metadata", None), started)
         return response.content
+
+    def stream(self, prompt: str):
+        started = time.perf_counter()
+        message = None
+        try:
+            with _track_call(prompt):
+                for chunk in self.model.stream(prompt):
+                    message = chunk if message is None else message + chunk
+                    if chunk.content:
+                        yield chunk.content
+        except Exception as e:
+            self._record_error(prompt, started, e)
+            raise
+        self._record(getattr(message, "usage_metadata", None), started)
+
+    async def ainvoke(self, prompt: str):
+        started = time.perf_counter()
+        try:
+            with _track_call(prompt):
+                response = await self.model.ainvoke(prompt)
+        except Exception as e:
+            self._record_error(prompt, started, e)
+            raise
+        self._record(getattr(response, "usage_metadata", None), started)
+        return response.content
+
+
+class OpenAICompatibleLLM(LLMBackend):
+    """Any server speaking the OpenAI chat completions API, over plain HTTP (no SDK needed)"""
+    def __init__(self, base_url=OPENAI_BASE_URL, model_name=OPENAI_MODEL, api_key=OPENAI_API_KEY, timeout=LLM_TIMEOUT):
+        super().__init__()
+        self.base_url = base_url.rstrip("/")
+        self.model_name = model_name
+        self.api_key = api_key
+        self.timeout = timeout
+
+    def _request(self, prompt: str, stream: bool):
+        body = {"model": self.model_name, "messages": [{"role": "user", "content": prompt}], "stream": stream}
+        if stream:
+            body["stream_options"] = {"include_usage": True}
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        request = urllib.request.Request(f"{self.base_url}/chat/completions", data=json.dumps(body).encode("utf-8"),
+                                         headers=headers)
+        return urllib.request.urlopen(request, timeout=self.timeout or None)
+
+    @staticmethod
+    def _usage(usage: dict, prompt: str, text: str) -> dict:
+        """Server-reported usage, estimated when the server doesn't report it"""
+        usage = usage or {}
+        return {"input_tokens": usage.get("prompt_tokens", estimate_tokens(prompt)),
+                "output_tokens": usage.get("completion_tokens", estimate_tokens(text))}
+
+    def invoke(self, prompt: str):
+        started = time.perf_counter()
+        try:
+            with _track_call(prompt), self._request(prompt, stream=False) as response:
+                payload = json.load(response)
+            text = payload["choices"][0]["message"]["content"] or ""
+        except Exception as e:
+            self._record_error(prompt, started, e)
+            raise
+        self._record(self._usage(payload.get("usage"), prompt, text), started)
+        return text
+
+    def stream(self, prompt: str):
+        started = time.perf_counter()
+        parts, usage = [], None
+        try:
+            with _track_call(prompt), self._request(prompt, stream=True) as response:
+                for raw in response:  # server-sent events, one "data: {...}" line per chunk
+                    line = raw.decode("utf-8").strip()
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    event = json.loads(data)
+                    usage = event.get("usage") or usage
+                    for choice in event.get("choices") or []:
+                        delta = (choice.get("delta") or {}).get("content")
+                        if delta:
+                            parts.append(delta)
+                            yield delta
+        except Exception as e:
+            self._record_error(prompt, started, e)
+            raise
+        self._record(self._usage(usage, prompt, "".join(parts)), started)
+
+
+class FakeLLM(LLMBackend):
+    """Offline stand-in for a real backend (load tests): `responder(prompt)` writes the reply,
+    `latency()` draws the simulated call time in seconds, and `error_rate` of calls raise"""
+    def __init__(self, responder, latency=None, error_rate=0.0, rng=None):
+        super().__init__()
+        self.responder = responder
+        self.latency = latency or (lambda: 0.0)
+        self.error_rate = error_rate
+        self.rng = rng or random.Random()
+
+    def invoke(self, prompt: str):
+        started = time.perf_counter()
+        with _track_call(prompt):
+            time.sleep(max(self.latency(), 0.0))
+            failed = self.rng.random() < self.error_rate
+        if failed:
+            self._record_error(prompt, started)
+            raise RuntimeError("Simulated LLM failure")
+        response = self.responder(prompt)
+        self._record({"input_tokens": estimate_tokens(prompt), "output_tokens": estimate_tokens(response)}, started)
+        return response
+
+
+# Backend name -> zero-argument constructor
+_backends = {
+    "gemini": GeminiLLM,
+    "openai": OpenAICompatibleLLM,
+    "fake": lambda: FakeLLM(lambda prompt: "{}"),
+}
+
+
+def register_backend(name: str, factory):
+    """Make `factory()` available as backend `name` in LLM_BACKENDS"""
+    _backends[name] = factory
+
+
+def create_backend(name: str) -> LLMBackend:
+    if name not in _backends:
+        raise ValueError(f"Unknown LLM backend {name!r} (available: {', '.join(sorted(_backends))})")
+    return _backends[name]()
+
+
+# Backend name -> time.monotonic() until which it is skipped after a failure (shared by all sessions)
+_backend_down_until = {}
+_backend_health_lock = threading.Lock()
+
+
+def backend_health() -> dict:
+    """Seconds each failed-over backend is still skipped for"""
+    now = time.monotonic()
+    with _backend_health_lock:
+        return {name: round(until - now, 1) for name, until in _backend_down_until.items() if until > now}
+
+
+class FailoverLLM(LLMBackend):
+    """Tries the backends in order. One that errors or times out is skipped for LLM_FAILOVER_COOLDOWN
+    seconds, so after an outage only the first call pays for the failed attempt; when every
+    backend is cooling down they are all tried anyway. A stream fails over only before its first chunk."""
+    def __init__(self, names, cooldown: float = LLM_FAILOVER_COOLDOWN):
+        super().__init__()
+        self.names = list(names)
+        if not self.names:
+            raise RuntimeError("no LLM backend available (LLM_BACKENDS is empty)")
+        unknown = [name for name in self.names if name not in _backends]
+        if unknown:
+            raise ValueError(f"Unknown LLM backend(s) {unknown} (available: {', '.join(sorted(_backends))})")
+        self.cooldown = cooldown
+        self.served_by = None
+
+    def _candidates(self):
+        now = time.monotonic()
+        with _backend_health_lock:
+            up = [name for name in self.names if _backend_down_until.get(name, 0) <= now]
+        candidates = up or list(self.names)
+        if not candidates:
+            raise RuntimeError("no LLM backend available")
+        return candidates
+
+    def _failed(self, name: str, error: Exception):
+        with _backend_health_lock:
+            _backend_down_until[name] = time.monotonic() + self.cooldown
+        logger.warning("⚠️ LLM backend %s failed (%s: %s), skipping it for %.0fs",
+                       name, type(error).__name__, str(error)[:120], self.cooldown)
+
+    def _served(self, name: str, backend: LLMBackend):
+        with _backend_health_lock:
+            _backend_down_until.pop(name, None)
+        self.served_by = name
+        self.model_name = backend.model_name
+        self.last_usage = backend.last_usage
+
+    def invoke(self, prompt: str):
+        error = None
+        for name in self._candidates():
+            backend = create_backend(name)
+            try:
+                response = backend.invoke(prompt)
+            except WorkCancelled:
+                raise
+            except Exception as e:
+                self._failed(name, e)
+                error = e
+                continue
+            self._served(name, backend)
+            return response
+        raise error
+
+    def stream(self, prompt: str):
+        error = None
+        for name in self._candidates():
+            backend = create_backend(name)
+            streamed = False
+            try:
+                for chunk in backend.stream(prompt):
+                    streamed = True
+                    yield chunk
+            except WorkCancelled:
+                raise
+            except Exception as e:
+                if streamed:
+                    raise
+                self._failed(name, e)
+                error = e
+                continue
+            self._served(name, backend)
+            return
+        raise error
+
+    async def ainvoke(self, prompt: str):
+        error = None
+        for name in self._candidates():
+            backend = create_backend(name)
+            try:
+                response = await backend.ainvoke(prompt)
+            except WorkCancelled:
+                raise
+            except Exception as e:
+                self._failed(name, e)
+                error = e
+                continue
+            self._served(name, backend)
+            return response
+        raise error
+
+
+# Factory every engine call site builds its LLM through (None = the configured LLM_BACKENDS, or the
+# cassette when replaying; see tools/llm_cassette.py)
+_llm_factory = None
+
+
+def set_llm_factory(factory):
+    """Route all engine LLM construction through `factory()` (e.g. a FakeLLM); None restores LLM_BACKENDS"""
+    global _llm_factory
+    _llm_factory = factory
+
+
+def get_llm():
+    from tools.llm_cassette import LLM_CASSETTE_MODE, RecordingLLM, get_cassette_recorder, get_cassette_replay  # lazy import
+
+    if _llm_factory is not None:
+        llm = _llm_factory()
+    elif LLM_CASSETTE_MODE == "replay":
+        return get_cassette_replay()
+    elif len(LLM_BACKENDS) == 1:
+        llm = create_backend(LLM_BACKENDS[0])
+    else:
+        llm = FailoverLLM(LLM_BACKENDS)
+    if LLM_CASSETTE_MODE == "record":
+        return RecordingLLM(llm, get_cassette_recorder())
+    return llm
+
+
+# -------------------------------
+# 🔹 Context cache for the shared resume+JD prefix
+# -------------------------------
+class LocalContextCache:
+    """In-process stand-in for a provider context cache.
+
+    Keeps each prefix in memory and prepends it on every call, while counting the
+    input tokens a real cache would have served from the cached prefix.
+    """
+    def __init__(self, llm=None):
+        self.llm = llm
+        self._prefixes = {}
+        self._holders = {}
+        self._lock = threading.Lock()
+        self.stats = {"prefixes_created": 0, "prefix_tokens": 0, "cached_calls": 0, "cached_input_tokens": 0}
+
+    def _get_llm(self):
+        # Resolved per call: the cache is process-wide, while the LLM factory, backends and
+        # cassette mode can change after it is created
+        return self.llm if self.llm is not None else get_llm()
+
+    def create(self, prefix: str) -> str:
+        """Register a prefix once and return the handle later calls reference it by"""
+        handle = "local/" + hashlib.sha256(prefix.encode("utf-8")).hexdigest()[:16]
+        with self._lock:
+            if handle not in self._prefixes:
+                self._prefixes[handle] = prefix
+                self.stats["prefixes_created"] += 1
+                self.stats["prefix_tokens"] += estimate_tokens(prefix)
+            # Concurrent sessions over the same documents share a handle; count holders
+            self._holders[handle] = self._holders.get(handle, 0) + 1
+        return handle
+
+    def invoke(self, handle: str, prompt: str) -> str:
+        prefix = self._prefixes[handle]
+        response = self._get_llm().invoke(prefix + prompt)
+        with self._lock:
+            self.stats["cached_calls"] += 1
+            self.stats["cached_input_tokens"] += estimate_tokens(prefix)
+        return response
+
+    def release(self, handle: str):
+        with self._lock:
+            self._holders[handle] = self._holders.get(handle, 1) - 1
+            if self._holders[handle] <= 0:
+                self._holders.pop(handle)
+                self._prefixes.pop(handle, None)
+
+    def summary(self) -> dict:
+        """Stats plus input tokens saved (tokens served from cache minus tokens paid to create it)"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats["input_tokens_saved"] = max(stats["cached_input_tokens"] - stats["prefix_tokens"], 0)
+        return stats
+
+
+class GeminiContextCache(LocalContextCache):
+    """Explicit Gemini context cache; falls back to the local stand-in when a prefix can't be cached
+    (e.g. below the model's minimum cacheable size)"""
+    def __init__(self, model_name="gemini-2.5-flash", ttl_seconds=600):
+        super().__init__()
+        from google import genai  # lazy import
+        self.client = genai.Client()
+        self.model_name = model_name
+        self.ttl_seconds = ttl_seconds
+        self._models = {}
+
+    def create(self, prefix: str) -> str:
+        from google.genai import types
+        try:
+            cache = self.client.caches.create(
+                model=self.model_name,
+                config=types.CreateCachedContentConfig(contents=[prefix], ttl=f"{self.ttl_seconds}s"),
+            )
+        except Exception as e:
+            logger.warning("⚠️ Context cache creation failed, using local prefix: %s", e)
+            return super().create(prefix)
+
+        with self._lock:
+            self._models[cache.name] = GeminiLLM(self.model_name, cached_content=cache.name)
+            self.stats["prefixes_created"] += 1
+            self.stats["prefix_tokens"] += estimate_tokens(prefix)
+        return cache.name
+
+    def invoke(self, handle: str, prompt: str) -> str:
+        model = self._models.get(handle)
+        if model is None:
+            return super().invoke(handle, prompt)
+
+        response = model.invoke(prompt)
+        cached_tokens = model.last_usage.get("input_token_details", {}).get("cache_read", 0)
+        with self._lock:
+            self.stats["cached_calls"] += 1
+            self.stats["cached_input_tokens"] += cached_tokens
+        return response
+
+    def release(self, handle: str):
+        if self._models.pop(handle, None) is None:
+            return super().release(handle)
+        try:
+            self.client.caches.delete(name=handle)
+        except Exception as e:
+            logger.warning("⚠️ Could not delete context cache %s: %s", handle, e)
+
+
+# "local" (default), "gemini" for explicit provider caching, or "off"
+CONTEXT_CACHE_MODE = os.environ.get("CONTEXT_CACHE", "local")
+_context_cache = None
+
+
+def get_context_cache():
+    """Process-wide context cache for the configured mode (None when disabled)"""
+    global _context_cache
+    if CONTEXT_CACHE_MODE == "off":
+        return None
+    if _context_cache is None:
+        if CONTEXT_CACHE_MODE == "gemini":
+            _context_cache = GeminiContextCache(ttl_seconds=int(os.environ.get("CONTEXT_CACHE_TTL", "600")))
+        else:
+            _context_cache = LocalContextCache()
+    return _context_cache
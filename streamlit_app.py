@@ -1,19 +1,34 @@
 import streamlit as st
 import os
 import json
-import tempfile
 from typing import Dict, List, Optional
 import traceback
+import uuid
 
 # Import your existing modules
-from graph import build_initial_analysis_graph
+from tools.analysis_jobs import AnalysisJob, get_analysis_jobs
+from tools.batch_scoring import BATCHED_SCORING, is_pending, pending_evaluation, score_pending
+from tools.cancellation import CancellationToken, WorkCancelled, get_cancellations
+from tools.difficulty_ladder import evaluation_score, serve_question
+from tools.conversation_memory import forget_conversation_memory, get_conversation_memory, memory_context
 from tools.interview_conversational_agent import (
     call_llm, 
     get_next_question, 
     analyze_response_depth,
+    session_budget_status,
+    skipped_depth_analysis,
     InterviewConversationState
 )
-from llm import GeminiLLM
+from llm import llm_call_context
+from tools.interview_pacing import (
+    allow_optional_work, fits_another_question, mark_question_asked, pacing_status, record_answer_time,
+    remaining_questions, start_clock,
+)
+from tools.results_store import get_result_store
+from tools.token_ledger import get_ledger
+from tools.local_scorer import first_pass
+from tools.analytics import get_analytics
+from tools.analyzer import parse_final_score
 
 # Page config
 st.set_page_config(
@@ -24,6 +39,13 @@ st.set_page_config(
 )
 
 
+# The progress sidebar refreshes on this timer, so chat turns don't rerun the whole page
+SIDEBAR_REFRESH_SECONDS = float(os.environ.get("SIDEBAR_REFRESH_SECONDS", "2"))
+# How often a running background analysis is polled for new per-node results
+ANALYSIS_POLL_SECONDS = float(os.environ.get("ANALYSIS_POLL_SECONDS", "1"))
+# Open tabs check in on this timer; one silent for SESSION_ABANDON_SECONDS has its work cancelled
+SESSION_HEARTBEAT_SECONDS = float(os.environ.get("SESSION_HEARTBEAT_SECONDS", "30"))
+
 # Custom CSS for better UI
 st.markdown("""
 <style>
@@ -86,59 +108,55 @@ def initialize_session_state():
         'jd_text': '',
         'total_questions': 0,
         'current_question_type': 'technical',
-        'question_indices': {'technical': 0, 'behavioral': 0, 'situational': 0}
+        'question_indices': {'technical': 0, 'behavioral': 0, 'situational': 0},
+        'ledger_summary': None,  # this session's LLM usage, recorded once and then dropped from the ledger
+        'analysis_job': None,  # background phase-1 run (tools/analysis_jobs.py)
+        'analysis_job_attached': False,
+        'analysis_error': None,
+        'cancel_token': None  # cancels this tab's background work on reset / abandonment
     }
     
     for key, value in defaults.items():
         if key not in st.session_state:
             st.session_state[key] = value
 
-def save_uploaded_file(uploaded_file) -> str:
-    """Save uploaded file and return path"""
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-            tmp_file.write(uploaded_file.getvalue())
-            return tmp_file.name
-    except Exception as e:
-        st.error(f"Error saving file: {str(e)}")
-        return None
+def session_cancel_token() -> CancellationToken:
+    """This tab's cancellation token (also its heartbeat to the abandoned-session reaper)"""
+    token = st.session_state.cancel_token
+    if token is None or token.cancelled:
+        token = CancellationToken("browser session")
+        get_cancellations().watch(token)
+        st.session_state.cancel_token = token
+    token.touch()
+    return token
 
-def run_analysis(resume_path: str, jd_path: str) -> Dict:
-    """Run the initial analysis workflow"""
-    try:
-        initial_graph = build_initial_analysis_graph()
-        
-        initial_state = {
-            "resume_pdf": resume_path,
-            "jd_pdf": jd_path,
-            "resume": "",
-            "job_description": "",
-            "resume_jd_analysis": {},
-            "context_split": {},
-            "questions": {},
-            "current_question": None,
-            "user_response": None,
-            "chat_history": [],
-            "evaluation": [],
-            "question_index": 0,
-            "question_type_order": ["technical", "behavioral", "situational"],
-            "conversation_context": {},
-            "follow_up_needed": False,
-            "current_topic_depth": 0,
-            "current_question_type": "technical",
-            "interview_phase": "intro",
-            "question_indices": {
-                "technical": 0,
-                "behavioral": 0,
-                "situational": 0
-            }
-        }
-        
-        result = initial_graph.invoke(initial_state)
-        return result
-    except Exception as e:
-        st.error(f"Analysis error: {str(e)}")
-        return {"error": str(e)}
+def cancel_interview_work(session_id: str, reason: str):
+    """Refuse the session's pending LLM calls and graph steps, and drop its memory and ledger row"""
+    get_cancellations().cancel(session_id, reason)
+    forget_conversation_memory(session_id)
+    get_ledger().forget(session_id)
+
+def release_analysis(job: AnalysisJob, attached: bool, reason: str):
+    """Leave the analysis job; a run this tab started is its session, so drop that session's work too"""
+    get_analysis_jobs().release(job, reason)
+    # An unfinished run other tabs still wait on keeps going (they interview under their own ids)
+    if not attached and (job.finished or job.token.cancelled):
+        session_id = job.snapshot()["state"].get("session_id")
+        if session_id is not None:
+            cancel_interview_work(session_id, reason)
+
+@st.fragment(run_every=SESSION_HEARTBEAT_SECONDS)
+def session_heartbeat():
+    session_cancel_token()
+
+def start_analysis(resume_pdf: bytes, jd_pdf: bytes):
+    """Submit phase 1 to the background workers (or attach to an identical run in flight)"""
+    job, attached = get_analysis_jobs().submit(resume_pdf, jd_pdf)
+    session_cancel_token().on_cancel(lambda reason: release_analysis(job, attached, reason))
+    st.session_state.analysis_job = job
+    st.session_state.analysis_job_attached = attached
+    st.session_state.analysis_error = None
+    st.session_state.stage = 'analysis'
 
 def display_analysis_results(analysis: Dict):
     """Display analysis results in a structured format"""
@@ -161,19 +179,16 @@ def display_analysis_results(analysis: Dict):
         if analysis.get("job_description"):
             st.text_area("Job Description", analysis["job_description"][:1000] + "...", height=200, disabled=True)
     
-    # Extract final score for qualification check
-    final_score = 0.0
+    success, final_score, total_questions = render_analysis_report(analysis)
+    if success:
+        st.session_state.total_questions = total_questions
+    return success, final_score
+
+def render_analysis_report(analysis: Dict):
+    """Static part of the analysis panel (rendered by its fragment, so only panel reruns rebuild it)"""
     analysis_data = analysis.get("resume_jd_analysis", {})
-    
-    if "overall_assessment" in analysis_data:
-        overall_assessment = analysis_data["overall_assessment"]
-        if "final_score" in overall_assessment:
-            score_str = overall_assessment["final_score"]
-            try:
-                # Extract numeric value from "4.7/5" format
-                final_score = float(score_str.split("/")[0])
-            except (ValueError, IndexError):
-                final_score = 0.0
+    # Final score for the qualification check
+    final_score = parse_final_score(analysis_data.get("overall_assessment", {}).get("final_score"))
     
     # Display overall assessment
     if "overall_assessment" in analysis_data:
@@ -231,10 +246,9 @@ def display_analysis_results(analysis: Dict):
             with metrics_cols[i]:
                 st.metric(f"{q_type.title()}", count)
         
-        st.session_state.total_questions = total_questions
-        return True, final_score
+        return True, final_score, total_questions
     
-    return False, final_score
+    return False, final_score, 0
 
 def get_next_question_streamlit(state: Dict) -> Optional[str]:
     """Get next question for Streamlit interface"""
@@ -245,22 +259,29 @@ def get_next_question_streamlit(state: Dict) -> Optional[str]:
             prompt = f"""
             You are a friendly interviewer. Based on the candidate's response, ask a follow-up question.
             
+            {memory_context(state, skip_latest=1)}
             Previous Question: {last_qa.get('question', 'N/A')}
             Candidate's Answer: {last_qa.get('answer', 'N/A')}
             
             Generate a conversational follow-up that asks for more specific details.
             Keep it conversational. Return ONLY the question.
             """
-            return call_llm(prompt)
+            return call_llm(prompt, purpose="follow_up")
+        
+        # Time-boxed interviews stop once another question no longer fits
+        if not fits_another_question(state):
+            state["time_up"] = True
+            return None
         
         # Get current question type and index
         current_type = state.get("current_question_type", "technical")
         type_questions = state["questions"].get(current_type, [])
         type_index = state.get("question_indices", {}).get(current_type, 0)
         
-        # Check if we have more questions in current type
+        # Check if we have more questions in current type (easier / harder variant by running score)
+        scores = [evaluation_score(result) for result in st.session_state.evaluation_results]
         if type_index < len(type_questions):
-            return type_questions[type_index]["question"]
+            return serve_question(state, current_type, type_index, scores)
         
         # Move to next question type
         order = state["question_type_order"]
@@ -273,7 +294,7 @@ def get_next_question_streamlit(state: Dict) -> Optional[str]:
                 # Get first question of next type
                 next_questions = state["questions"].get(next_type, [])
                 if next_questions:
-                    return next_questions[0]["question"]
+                    return serve_question(state, next_type, 0, scores)
         except (ValueError, IndexError):
             pass
         
@@ -286,6 +307,7 @@ def process_user_response(user_input: str):
     """Process user response and update interview state"""
     try:
         state = st.session_state.interview_state
+        record_answer_time(state)
         
         # Check if this is the intro phase
         if st.session_state.get('interview_phase') == 'intro':
@@ -310,16 +332,23 @@ def process_user_response(user_input: str):
             "content": user_input
         })
         
-        # Analyze response depth
+        # Analyze response depth (skipped near the session's LLM budget or when behind schedule)
         state["user_response"] = user_input
         state["current_question"] = st.session_state.current_question
+        budget_status = session_budget_status(state)
+        on_schedule = allow_optional_work(pacing_status(state, questions_left=remaining_questions(state) - 1))
         
         try:
-            depth_analysis = analyze_response_depth(state)
+            if budget_status != "ok":
+                depth_analysis = skipped_depth_analysis(f"session LLM budget {budget_status}")
+            elif not on_schedule:
+                depth_analysis = skipped_depth_analysis("behind interview schedule")
+            else:
+                depth_analysis = analyze_response_depth(state)
             should_follow_up = (
                 depth_analysis.get("needs_followup", False) and 
                 state.get("current_topic_depth", 0) < 1 and
-                depth_analysis.get("depth_score", 3) < 3
+                (depth_analysis.get("depth_score") or 3) < 3
             )
         except:
             should_follow_up = False
@@ -340,11 +369,14 @@ def process_user_response(user_input: str):
         eval_prompt = f"""
         Evaluate this interview response:
         
+        {memory_context(state)}
         Question: {question}
         Answer: {user_input}
         Expected Answer: {expected_answer}
         Job Requirements: {jd}...
         
+        Score this answer on its own merits; use the conversation only to understand references to earlier answers.
+        
         JSON Response:
         {{
             "Question": "{question}", 
@@ -354,12 +386,20 @@ def process_user_response(user_input: str):
         }}
         """
         
+        # Local first pass: the LLM only scores answers the local scorer is unsure about (at the end
+        # of the interview, in one batch, in batched evaluation mode)
+        local_features, evaluation = first_pass(question, user_input, expected_answer, budget_status == "exhausted")
+        if evaluation is None and BATCHED_SCORING:
+            bank_id = questions_list[current_index].get("bank_id") if current_index < len(questions_list) else None
+            evaluation = {**pending_evaluation(question, user_input, expected_answer, current_type, bank_id),
+                          "local_score": local_features}
         try:
-            eval_result = call_llm(eval_prompt)
-            # Clean up JSON response
-            import re
-            cleaned_response = re.sub(r"^```json|```$", "", eval_result.strip(), flags=re.MULTILINE).strip("` \n")
-            evaluation = json.loads(cleaned_response)
+            if evaluation is None:
+                eval_result = call_llm(eval_prompt, purpose="evaluation")
+                # Clean up JSON response
+                import re
+                cleaned_response = re.sub(r"^```json|```$", "", eval_result.strip(), flags=re.MULTILINE).strip("` \n")
+                evaluation = {**json.loads(cleaned_response), "local_score": local_features}
         except:
             evaluation = {
                 "Question": question,
@@ -371,7 +411,14 @@ def process_user_response(user_input: str):
         # Store evaluation
         evaluation["depth_analysis"] = depth_analysis
         evaluation["is_main_question"] = True  # Mark as main question
+        evaluation["difficulty"] = questions_list[current_index].get("level") if current_index < len(questions_list) else None
         st.session_state.evaluation_results.append(evaluation)
+        get_conversation_memory(state.get("session_id")).add_turn(question, user_input)
+        
+        # Record the evaluation once the question is complete (after its follow-up, if any)
+        if not should_follow_up and not is_pending(evaluation):
+            bank_id = questions_list[current_index].get("bank_id") if current_index < len(questions_list) else None
+            get_result_store().append_evaluation(state, evaluation, current_type, bank_id)
         
         # Update state based on follow-up decision
         if should_follow_up:
@@ -409,7 +456,11 @@ def process_followup_response(user_input: str):
         })
         
         # Update the last evaluation with follow-up info
-        if st.session_state.evaluation_results:
+        if st.session_state.evaluation_results and is_pending(st.session_state.evaluation_results[-1]):
+            # Batched evaluation mode: scored together with the main answer at the end
+            st.session_state.evaluation_results[-1]["follow_up_answer"] = user_input
+            st.session_state.evaluation_results[-1]["has_followup"] = True
+        elif st.session_state.evaluation_results:
             last_eval = st.session_state.evaluation_results[-1]
             last_eval["follow_up_answer"] = user_input
             last_eval["has_followup"] = True
@@ -419,6 +470,7 @@ def process_followup_response(user_input: str):
             combined_eval_prompt = f"""
             Re-evaluate this interview response considering both the main answer and follow-up:
             
+            {memory_context(state, skip_latest=1)}
             Question: {last_eval.get("Question", "")}
             Main Answer: {main_answer}
             Follow-up Answer: {user_input}
@@ -430,18 +482,34 @@ def process_followup_response(user_input: str):
             }}
             """
             
+            # Local first pass on both answers together, the LLM only when unsure
+            questions_list = state["questions"].get(state.get("current_question_type", "technical"), [])
+            current_index = state["question_indices"][state.get("current_question_type", "technical")]
+            expected_answer = questions_list[current_index].get("answer", "") if current_index < len(questions_list) else ""
+            _, updated_eval = first_pass(last_eval.get("Question", ""), f"{main_answer}\n{user_input}", expected_answer,
+                                         session_budget_status(state) == "exhausted")
+            
             try:
-                eval_result = call_llm(combined_eval_prompt)
-                import re
-                cleaned_response = re.sub(r"^```json|```$", "", eval_result.strip(), flags=re.MULTILINE).strip("` \n")
-                updated_eval = json.loads(cleaned_response)
+                if updated_eval is not None:
+                    last_eval["scored_locally"] = True
+                else:
+                    eval_result = call_llm(combined_eval_prompt, purpose="reevaluation")
+                    import re
+                    cleaned_response = re.sub(r"^```json|```$", "", eval_result.strip(), flags=re.MULTILINE).strip("` \n")
+                    updated_eval = json.loads(cleaned_response)
                 last_eval["Score"] = updated_eval.get("Score", last_eval["Score"])
                 last_eval["Reasoning"] = f"Updated after follow-up: {updated_eval.get('Reasoning', last_eval['Reasoning'])}"
             except:
                 last_eval["Reasoning"] += f" [Follow-up provided: {user_input[:50]}...]"
+        get_conversation_memory(state.get("session_id")).add_turn(st.session_state.current_question, user_input)
         
         # Now move to next question
         current_type = state.get("current_question_type", "technical")
+        if st.session_state.evaluation_results and not is_pending(st.session_state.evaluation_results[-1]):
+            questions_list = state["questions"].get(current_type, [])
+            current_index = state["question_indices"][current_type]
+            bank_id = questions_list[current_index].get("bank_id") if current_index < len(questions_list) else None
+            get_result_store().append_evaluation(state, st.session_state.evaluation_results[-1], current_type, bank_id)
         state["question_indices"][current_type] += 1
         state["current_topic_depth"] = 0
         state["follow_up_needed"] = False
@@ -476,8 +544,9 @@ def process_intro_response(user_input: str):
         Example: "Thank you for that introduction, [name/background mention]. Now let's dive into some technical questions to better understand your expertise."
         """
         
+        get_conversation_memory(st.session_state.interview_state.get("session_id")).add_turn("Tell me about yourself", user_input)
         try:
-            interviewer_response = call_llm(response_prompt)
+            interviewer_response = call_llm(response_prompt, purpose="intro_reply")
         except:
             interviewer_response = "Thank you for that introduction! Now let's dive into some technical questions to better understand your expertise."
         
@@ -505,26 +574,22 @@ def process_intro_response(user_input: str):
         st.error(f"Error processing intro response: {str(e)}")
         return False
 
+@st.cache_data(show_spinner=False, max_entries=4096)
+def render_message_html(message_type: str, content: str) -> str:
+    """HTML for one chat message (cached, so each message is formatted once)"""
+    if message_type == "interviewer":
+        return f'<div class="chat-message interviewer-message"><strong>🤖 Interviewer:</strong> {content}</div>'
+    return f'<div class="chat-message candidate-message"><strong>👤 You:</strong> {content}</div>'
+
 def render_chat_interface():
     """Render the chat interface"""
     st.markdown("### 💬 Interview Chat")
     
-    # Display chat history
+    # Display chat history as one block (one element per rerun, however long the interview)
     chat_container = st.container()
     with chat_container:
-        for message in st.session_state.chat_history:
-            if message["type"] == "interviewer":
-                st.markdown(f"""
-                <div class="chat-message interviewer-message">
-                    <strong>🤖 Interviewer:</strong> {message["content"]}
-                </div>
-                """, unsafe_allow_html=True)
-            else:
-                st.markdown(f"""
-                <div class="chat-message candidate-message">
-                    <strong>👤 You:</strong> {message["content"]}
-                </div>
-                """, unsafe_allow_html=True)
+        st.markdown("\n".join(render_message_html(message["type"], message["content"])
+                              for message in st.session_state.chat_history), unsafe_allow_html=True)
     
     # Progress indicator (only for actual interview questions, not intro)
     if st.session_state.get('interview_phase') != 'intro':
@@ -564,6 +629,10 @@ def start_interview():
         })
         
         st.session_state.current_question = "Tell me about yourself"
+        session_id = st.session_state.interview_state.get("session_id")
+        session_cancel_token().on_cancel(lambda reason: cancel_interview_work(session_id, reason))
+        start_clock(st.session_state.interview_state)
+        mark_question_asked(st.session_state.interview_state)
         st.session_state.stage = 'interview'
         st.session_state.interview_phase = 'intro'  # Set to intro phase
 
@@ -607,6 +676,8 @@ def display_final_evaluation():
                 st.write(f"**Follow-up Answer:** {result.get('follow_up_answer', 'N/A')}")
             
             st.write(f"**Score:** {score}/5")
+            if result.get("difficulty"):
+                st.write(f"**Difficulty:** {result['difficulty'].title()}")
             st.write(f"**Evaluation:** {result.get('Reasoning', 'N/A')}")
             
             # Depth analysis if available
@@ -615,47 +686,265 @@ def display_final_evaluation():
                 st.write(f"**Response Depth:** {depth.get('depth_score', 'N/A')}/5")
                 if has_followup:
                     st.info("📝 This question included a follow-up for additional details")
+    
+    # LLM usage for this session (recorded to the result store once)
+    state = st.session_state.interview_state or {}
+    if st.session_state.ledger_summary is None:
+        st.session_state.ledger_summary = get_ledger().session_summary(state.get("session_id"))
+        get_result_store().append_ledger(state, st.session_state.ledger_summary)
+        forget_conversation_memory(state.get("session_id"))
+        get_ledger().forget(state.get("session_id"))
+    ledger = st.session_state.ledger_summary
+    
+    st.markdown("#### 💸 LLM Usage")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("LLM Calls", ledger["calls"])
+    with col2:
+        st.metric("Input Tokens", f"{ledger['input_tokens']:,}")
+    with col3:
+        st.metric("Output Tokens", f"{ledger['output_tokens']:,}")
+    with col4:
+        st.metric("Estimated Cost", f"${ledger['cost_usd']:.4f}")
+    if ledger["status"] != "ok":
+        st.warning(f"Session reached {ledger['budget_used']:.0%} of its LLM budget ({ledger['status']}): "
+                   "depth analysis and follow-ups were skipped" + (", answers scored locally" if ledger["status"] == "exhausted" else ""))
+    st.dataframe([{"node": node, **row} for node, row in ledger["by_node"].items()], use_container_width=True)
+
+def render_recruiter_dashboard():
+    """Compare candidates per JD from the stored results"""
+    st.markdown("### 🧑‍💼 Recruiter Dashboard")
+    
+    analytics = get_analytics()
+    jds = analytics.list_jds()
+    if not jds:
+        st.info("No stored interview results yet.")
+        return
+    
+    labels = {f"{jd['title']} ({jd['candidates']} candidates)": jd["jd_hash"] for jd in jds}
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        choice = st.selectbox("Job Description", list(labels))
+    with col2:
+        shortlist_size = st.number_input("Shortlist size", min_value=1, max_value=100, value=10)
+    
+    report = analytics.jd_report(labels[choice], shortlist_size=int(shortlist_size))
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Interviewed Candidates", report["candidates"])
+    with col2:
+        st.metric("Mean Interview Score", f"{report['mean_score']:.2f}/5" if report.get("mean_score") is not None else "N/A")
+    
+    st.markdown("#### 📊 Interview Score Distribution")
+    st.bar_chart(report["distribution"])
+    
+    st.markdown("#### 📐 Score Percentiles by Question Type")
+    st.table(report["percentiles"])
+    
+    st.markdown("#### 🏆 Ranked Shortlist")
+    st.caption("Ranked by mean interview score; ties broken by resume fit score, then questions answered.")
+    st.dataframe(report["shortlist"], use_container_width=True)
+
+@st.fragment(run_every=SIDEBAR_REFRESH_SECONDS)
+def render_progress_sidebar():
+    """Interview progress in the sidebar; refreshes on its own timer instead of with every chat turn"""
+    st.markdown("### 📋 Interview Progress")
+    
+    if st.session_state.stage == 'upload':
+        st.info("📤 Upload files to start")
+    elif st.session_state.stage == 'analysis':
+        st.info("🔍 Analyzing documents...")
+    elif st.session_state.stage == 'interview':
+        if st.session_state.get('interview_phase') == 'intro':
+            st.info("🎯 Introduction Phase")
+            st.write("Getting to know you...")
+        else:
+            st.success(f"💬 Interview in progress\nQuestion {st.session_state.question_count}")
+
+            # Question type breakdown
+            st.markdown("#### Question Types")
+            for q_type in ['technical', 'behavioral', 'situational']:
+                completed = st.session_state.question_indices.get(q_type, 0)
+                total = len(st.session_state.interview_state.get("questions", {}).get(q_type, []))
+                progress_val = completed / max(total, 1)
+                st.progress(progress_val)
+                st.write(f"{q_type.title()}: {completed}/{total}")
+
+                # Highlight current question type
+                if st.session_state.interview_state.get("current_question_type") == q_type:
+                    st.write("👉 *Current*")
+
+    elif st.session_state.stage == 'results':
+        st.success("✅ Interview completed!")
+
+@st.fragment(run_every=ANALYSIS_POLL_SECONDS)
+def render_analysis_job():
+    """Progress of the background analysis; the fit analysis shows as soon as Analyze finishes"""
+    job = st.session_state.analysis_job
+    if job.finished:
+        snapshot = job.snapshot()
+        st.session_state.analysis_job = None
+        if snapshot["status"] == "done":
+            if st.session_state.analysis_job_attached:
+                snapshot["state"]["session_id"] = uuid.uuid4().hex  # another tab's run: interview separately
+            st.session_state.analysis_results = snapshot["state"]
+            st.session_state.interview_state = snapshot["state"]
+            st.session_state.analysis_complete = True
+        else:
+            st.session_state.analysis_error = snapshot["error"] or "Unknown error"
+            st.session_state.stage = 'upload'
+        st.rerun()
+    
+    snapshot = job.snapshot()
+    st.info("🔍 Analyzing documents..." + (" (joined an identical analysis already in progress)"
+                                           if st.session_state.analysis_job_attached else ""))
+    if snapshot["completed_nodes"]:
+        st.caption("Completed: " + " ➝ ".join(node for node in snapshot["completed_nodes"] if node != "Start"))
+    
+    if snapshot["state"].get("resume_jd_analysis"):
+        display_analysis_results(snapshot["state"])
+        st.info("🧠 Generating interview questions...")
+
+@st.fragment
+def render_analysis_panel():
+    """Analysis results and the qualification decision (widgets here rerun only this panel)"""
+    # Display analysis results
+    success, final_score = display_analysis_results(st.session_state.analysis_results)
+
+    if success:
+        st.markdown("---")
+
+        # Check if candidate meets minimum score requirement
+        if final_score >= 2.0:
+            st.success(f"🎉 **Qualification Status: PASSED** (Score: {final_score:.1f}/5.0)")
+            st.info("✅ You meet the minimum requirements to proceed to the interview round!")
+
+            col1, col2, col3 = st.columns([1, 2, 1])
+            with col2:
+                if st.button("🎤 Start Interview", type="primary", use_container_width=True):
+                    start_interview()
+                    st.rerun()
+        else:
+            st.error(f"❌ **Qualification Status: NOT QUALIFIED** (Score: {final_score:.1f}/5.0)")
+            st.warning("⚠️ Unfortunately, your profile does not meet the minimum requirements (Score ≥ 2.0) for this position.")
+
+            # Show what they can do
+            st.markdown("#### 💡 What you can do:")
+            st.markdown("- **Improve your resume** by adding missing skills and experiences")
+            st.markdown("- **Gain more relevant experience** in the required technologies")
+            st.markdown("- **Upload a different resume** if you have an updated version")
+            st.markdown("- **Try applying for a different position** that better matches your profile")
+
+            col1, col2, col3 = st.columns([1, 2, 1])
+            with col2:
+                if st.button("📤 Upload New Documents", type="secondary", use_container_width=True):
+                    # Reset to upload stage
+                    st.session_state.stage = 'upload'
+                    st.session_state.analysis_complete = False
+                    st.session_state.analysis_results = {}
+                    st.rerun()
+
+def submit_answer():
+    """Answer form callback: runs before the chat re-renders, so the new turn shows without an extra rerun"""
+    user_input = st.session_state.get("answer_input", "").strip()
+    if not user_input:
+        return
+    
+    # Process response (LLM calls are accounted to this session in the token ledger)
+    with llm_call_context(session_id=st.session_state.interview_state.get("session_id"), node="Interview"):
+        processed = process_user_response(user_input)
+    if not processed:
+        return
+    
+    # Check if we just finished the intro
+    if st.session_state.get('interview_phase') == 'technical' and st.session_state.current_question == "Tell me about yourself":
+        # Get first technical question
+        next_question = get_next_question_streamlit(st.session_state.interview_state)
+        if next_question:
+            st.session_state.current_question = next_question
+            mark_question_asked(st.session_state.interview_state)
+            st.session_state.chat_history.append({
+                "type": "interviewer",
+                "content": next_question
+            })
+    else:
+        # Handle both follow-up and regular questions
+        with llm_call_context(session_id=st.session_state.interview_state.get("session_id"), node="Interview"):
+            next_question = get_next_question_streamlit(st.session_state.interview_state)
+        
+        if next_question:
+            st.session_state.current_question = next_question
+            mark_question_asked(st.session_state.interview_state)
+            st.session_state.chat_history.append({
+                "type": "interviewer",
+                "content": next_question
+            })
+        else:
+            # Interview ended: score the answers batched evaluation mode left pending
+            try:
+                with llm_call_context(session_id=st.session_state.interview_state.get("session_id"), node="Score"):
+                    score_pending(st.session_state.interview_state, st.session_state.evaluation_results)
+            except WorkCancelled as e:
+                st.error(f"This interview was stopped ({str(e)}). Please start a new one.")
+                return
+            st.session_state.interview_ended = True
+            st.session_state.stage = 'results'
+            final_message = "🎉 Thank you for completing the interview! Here are your results."
+            if st.session_state.interview_state.get("time_up"):
+                final_message = "⏱️ We're at time, so let's stop here. Thank you for your time! Here are your results."
+            st.session_state.chat_history.append({
+                "type": "interviewer",
+                "content": final_message
+            })
+
+@st.fragment
+def render_interview_panel():
+    """Chat and answer form; a submitted answer reruns only this fragment, not the whole app"""
+    if st.session_state.interview_ended:
+        st.rerun()  # switch the whole page to the results
+    
+    # Chat interface
+    render_chat_interface()
+    
+    if st.session_state.current_question:
+        # User input
+        with st.form("response_form", clear_on_submit=True):
+            # Different placeholder for follow-up questions
+            if st.session_state.get('expecting_followup_response', False):
+                placeholder_text = "Please provide more details or examples..."
+                button_text = "Submit Follow-up"
+            else:
+                placeholder_text = "Type your answer here..."
+                button_text = "Submit Response"
+            
+            st.text_area("Your Response:", height=100, placeholder=placeholder_text, key="answer_input")
+            st.form_submit_button(button_text, type="primary", on_click=submit_answer)
+    else:
+        st.error("No current question available. Please restart the interview.")
 
 def main():
     """Main Streamlit application"""
     initialize_session_state()
+    session_heartbeat()
     
     # Header
     st.markdown('<h1 class="main-header">🤖 AI Interview Agent</h1>', unsafe_allow_html=True)
     
+    view = st.sidebar.radio("View", ["🎤 Candidate Interview", "🧑‍💼 Recruiter Dashboard"])
+    if view == "🧑‍💼 Recruiter Dashboard":
+        render_recruiter_dashboard()
+        return
+    
     # Sidebar
     with st.sidebar:
-        st.markdown("### 📋 Interview Progress")
-        
-        if st.session_state.stage == 'upload':
-            st.info("📤 Upload files to start")
-        elif st.session_state.stage == 'analysis':
-            st.info("🔍 Analyzing documents...")
-        elif st.session_state.stage == 'interview':
-            if st.session_state.get('interview_phase') == 'intro':
-                st.info("🎯 Introduction Phase")
-                st.write("Getting to know you...")
-            else:
-                st.success(f"💬 Interview in progress\nQuestion {st.session_state.question_count}")
-                
-                # Question type breakdown
-                st.markdown("#### Question Types")
-                for q_type in ['technical', 'behavioral', 'situational']:
-                    completed = st.session_state.question_indices.get(q_type, 0)
-                    total = len(st.session_state.interview_state.get("questions", {}).get(q_type, []))
-                    progress_val = completed / max(total, 1)
-                    st.progress(progress_val)
-                    st.write(f"{q_type.title()}: {completed}/{total}")
-                    
-                    # Highlight current question type
-                    if st.session_state.interview_state.get("current_question_type") == q_type:
-                        st.write("👉 *Current*")
-                
-        elif st.session_state.stage == 'results':
-            st.success("✅ Interview completed!")
+        render_progress_sidebar()
         
         # Reset button
         if st.button("🔄 Start New Interview"):
+            # Stop this tab's analysis job and interview calls before forgetting them
+            if st.session_state.cancel_token is not None:
+                st.session_state.cancel_token.cancel("reset")
             for key in list(st.session_state.keys()):
                 del st.session_state[key]
             st.rerun()
@@ -675,119 +964,23 @@ def main():
             st.markdown("#### 💼 Job Description")
             jd_file = st.file_uploader("Upload Job Description (PDF)", type=['pdf'], key="jd")
         
+        if st.session_state.analysis_error:
+            st.error(f"Analysis failed: {st.session_state.analysis_error}")
+        
         if resume_file and jd_file:
             if st.button("🚀 Start Analysis", type="primary"):
-                with st.spinner("Analyzing documents..."):
-                    # Save uploaded files
-                    resume_path = save_uploaded_file(resume_file)
-                    jd_path = save_uploaded_file(jd_file)
-                    
-                    if resume_path and jd_path:
-                        # Run analysis
-                        analysis_result = run_analysis(resume_path, jd_path)
-                        
-                        if "error" not in analysis_result:
-                            st.session_state.analysis_results = analysis_result
-                            st.session_state.interview_state = analysis_result
-                            st.session_state.analysis_complete = True
-                            st.session_state.stage = 'analysis'
-                            st.rerun()
-                        else:
-                            st.error(f"Analysis failed: {analysis_result.get('error', 'Unknown error')}")
+                # Analyze straight from the uploaded bytes, in the background
+                start_analysis(resume_file.getvalue(), jd_file.getvalue())
+                st.rerun()
     
     elif st.session_state.stage == 'analysis':
-        # Display analysis results
-        success, final_score = display_analysis_results(st.session_state.analysis_results)
-        
-        if success:
-            st.markdown("---")
-            
-            # Check if candidate meets minimum score requirement
-            if final_score >= 2.0:
-                st.success(f"🎉 **Qualification Status: PASSED** (Score: {final_score:.1f}/5.0)")
-                st.info("✅ You meet the minimum requirements to proceed to the interview round!")
-                
-                col1, col2, col3 = st.columns([1, 2, 1])
-                with col2:
-                    if st.button("🎤 Start Interview", type="primary", use_container_width=True):
-                        start_interview()
-                        st.rerun()
-            else:
-                st.error(f"❌ **Qualification Status: NOT QUALIFIED** (Score: {final_score:.1f}/5.0)")
-                st.warning("⚠️ Unfortunately, your profile does not meet the minimum requirements (Score ≥ 2.0) for this position.")
-                
-                # Show what they can do
-                st.markdown("#### 💡 What you can do:")
-                st.markdown("- **Improve your resume** by adding missing skills and experiences")
-                st.markdown("- **Gain more relevant experience** in the required technologies")
-                st.markdown("- **Upload a different resume** if you have an updated version")
-                st.markdown("- **Try applying for a different position** that better matches your profile")
-                
-                col1, col2, col3 = st.columns([1, 2, 1])
-                with col2:
-                    if st.button("📤 Upload New Documents", type="secondary", use_container_width=True):
-                        # Reset to upload stage
-                        st.session_state.stage = 'upload'
-                        st.session_state.analysis_complete = False
-                        st.session_state.analysis_results = {}
-                        st.rerun()
+        if st.session_state.analysis_job is not None:
+            render_analysis_job()
+        else:
+            render_analysis_panel()
     
     elif st.session_state.stage == 'interview':
-        # Chat interface
-        render_chat_interface()
-        
-        # Get next question if needed
-        if not st.session_state.interview_ended:
-            if st.session_state.current_question:
-                # User input
-                with st.form("response_form", clear_on_submit=True):
-                    # Different placeholder for follow-up questions
-                    if st.session_state.get('expecting_followup_response', False):
-                        placeholder_text = "Please provide more details or examples..."
-                        button_text = "Submit Follow-up"
-                    else:
-                        placeholder_text = "Type your answer here..."
-                        button_text = "Submit Response"
-                    
-                    user_input = st.text_area("Your Response:", height=100, placeholder=placeholder_text)
-                    submitted = st.form_submit_button(button_text, type="primary")
-                
-                if submitted and user_input.strip():
-                    # Process response
-                    if process_user_response(user_input.strip()):
-                        # Check if we just finished the intro
-                        if st.session_state.get('interview_phase') == 'technical' and st.session_state.current_question == "Tell me about yourself":
-                            # Get first technical question
-                            next_question = get_next_question_streamlit(st.session_state.interview_state)
-                            if next_question:
-                                st.session_state.current_question = next_question
-                                st.session_state.chat_history.append({
-                                    "type": "interviewer",
-                                    "content": next_question
-                                })
-                        else:
-                            # Handle both follow-up and regular questions
-                            next_question = get_next_question_streamlit(st.session_state.interview_state)
-                            
-                            if next_question:
-                                st.session_state.current_question = next_question
-                                st.session_state.chat_history.append({
-                                    "type": "interviewer",
-                                    "content": next_question
-                                })
-                            else:
-                                # Interview ended
-                                st.session_state.interview_ended = True
-                                st.session_state.stage = 'results'
-                                final_message = "🎉 Thank you for completing the interview! Here are your results."
-                                st.session_state.chat_history.append({
-                                    "type": "interviewer",
-                                    "content": final_message
-                                })
-                        
-                        st.rerun()
-            else:
-                st.error("No current question available. Please restart the interview.")
+        render_interview_panel()
     
     elif st.session_state.stage == 'results':
         display_final_evaluation()
@@ -796,7 +989,8 @@ def main():
         if st.session_state.evaluation_results:
             results_json = json.dumps({
                 "evaluation": st.session_state.evaluation_results,
-                "analysis": st.session_state.analysis_results.get("resume_jd_analysis", {})
+                "analysis": st.session_state.analysis_results.get("resume_jd_analysis", {}),
+                "llm_usage": st.session_state.ledger_summary
             }, indent=2)
             
             st.download_button(
@@ -0,0 +1,23 @@
+import pytest
+
+from llm import FakeLLM, set_llm_factory
+from tools.results_store import ResultStore
+
+
+@pytest.fixture
+def result_store(tmp_path):
+    """Empty result store in the test's temp directory"""
+    store = ResultStore(directory=str(tmp_path))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def fake_llm():
+    """Routes every get_llm() to a FakeLLM; call it with a responder to change the replies"""
+    def use(responder):
+        set_llm_factory(lambda: FakeLLM(responder))
+
+    use(lambda prompt: "{}")
+    yield use
+    set_llm_factory(None)
@@ -0,0 +1,98 @@
+import threading
+import uuid
+
+import pytest
+
+import graph
+from tools import results_store
+from tools.analysis_jobs import AnalysisJobRunner, document_key
+
+
+class GatedGraph:
+    """Phase-1 stand-in: streams one node, waits for the gate, then streams the analysis"""
+    def __init__(self):
+        self.gate = threading.Event()
+        self.runs = 0
+
+    def stream(self, state, stream_mode=None):
+        self.runs += 1
+        yield {"Extract": {"resume_text": "resume"}}
+        self.gate.wait(5)
+        yield {"Analyze": {"resume_jd_analysis": {"overall_assessment": {"fit": "Good", "final_score": "80"}}}}
+
+
+@pytest.fixture
+def phase_one(monkeypatch, result_store):
+    fake = GatedGraph()
+    monkeypatch.setattr(graph, "build_phase_one_graph", lambda: fake)
+    monkeypatch.setattr(graph, "create_initial_state",
+                        lambda resume, jd: {"session_id": uuid.uuid4().hex, "job_description": "# Data Engineer"})
+    monkeypatch.setattr(results_store, "get_result_store", lambda: result_store)
+    yield fake
+    fake.gate.set()
+
+
+def test_document_key_reads_paths(tmp_path):
+    (tmp_path / "resume.pdf").write_bytes(b"resume")
+    assert document_key(str(tmp_path / "resume.pdf"), b"jd") == document_key(b"resume", b"jd")
+    assert document_key(b"resume", b"jd") != document_key(b"jd", b"resume")
+
+
+def test_duplicate_submissions_share_one_run(phase_one, result_store):
+    runner = AnalysisJobRunner(max_workers=2)
+    job, attached = runner.submit(b"resume", b"jd")
+    again, attached_again = runner.submit(b"resume", b"jd")
+    assert (attached, attached_again) == (False, True)
+    assert again is job and runner.in_flight() == 1
+
+    phase_one.gate.set()
+    snapshot = job.wait(5)
+    assert snapshot["status"] == "done"
+    assert snapshot["completed_nodes"] == ["Extract", "Analyze"]
+    assert snapshot["attached"] == 1
+    assert phase_one.runs == 1
+    assert len(list(result_store.iter_records("analysis"))) == 1
+    assert runner.in_flight() == 0
+
+
+def test_release_cancels_only_when_the_last_holder_leaves(phase_one, result_store):
+    runner = AnalysisJobRunner(max_workers=2)
+    job, _ = runner.submit(b"resume", b"jd")
+    runner.submit(b"resume", b"jd")
+
+    runner.release(job, "reset")
+    assert not job.token.cancelled
+    runner.release(job, "reset")
+    assert job.token.cancelled
+    # An identical submission from now on starts a fresh run
+    fresh, attached = runner.submit(b"resume", b"jd")
+    assert fresh is not job and not attached
+
+    phase_one.gate.set()
+    assert job.wait(5)["status"] == "cancelled"
+    assert fresh.wait(5)["status"] == "done"
+    assert [record["session_id"] for record in result_store.iter_records("analysis")] == [fresh.state["session_id"]]
+
+
+def test_released_queued_job_never_runs(phase_one):
+    runner = AnalysisJobRunner(max_workers=1)
+    running, _ = runner.submit(b"resume", b"jd")
+    queued, _ = runner.submit(b"other resume", b"jd")
+    runner.release(queued)
+
+    phase_one.gate.set()
+    assert running.wait(5)["status"] == "done"
+    assert queued.wait(5)["status"] == "cancelled"
+    assert "while queued" in queued.error
+    assert phase_one.runs == 1
+
+
+def test_snapshot_is_a_private_copy(phase_one):
+    runner = AnalysisJobRunner(max_workers=1)
+    job, _ = runner.submit(b"resume", b"jd")
+    phase_one.gate.set()
+    snapshot = job.wait(5)
+    snapshot["state"]["resume_jd_analysis"]["overall_assessment"]["fit"] = "Poor"
+    snapshot["completed_nodes"].clear()
+    assert job.snapshot()["state"]["resume_jd_analysis"]["overall_assessment"]["fit"] == "Good"
+    assert job.snapshot()["completed_nodes"] == ["Extract", "Analyze"]
@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+from tools import analytics
+from tools.analytics import ResultsAnalytics, _parse_header
+from tools.results_store import ResultStore
+
+
+def add_candidate(store, session_id, jd_hash, fit, scores):
+    store.append("analysis", {"session_id": session_id, "jd_hash": jd_hash, "jd_title": f"Title {jd_hash}",
+                              "final_score": fit, "resume_jd_analysis": {"big": "payload"}})
+    for q_type, score in scores:
+        store.append("evaluation", {"session_id": session_id, "jd_hash": jd_hash, "question_type": q_type,
+                                    "score": score, "evaluation": {"Reasoning": "..."}})
+
+
+@pytest.fixture
+def store(result_store):
+    add_candidate(result_store, "a", "jd1", 70, [("technical", 4), ("behavioral", 5)])
+    add_candidate(result_store, "b", "jd1", 90, [("technical", 5), ("behavioral", 4)])
+    add_candidate(result_store, "c", "jd1", 50, [("technical", 2), ("behavioral", None)])
+    add_candidate(result_store, "d", "jd2", 80, [("technical", 3)])
+    return result_store
+
+
+def test_jd_report_ranks_by_score_then_fit(store):
+    report = ResultsAnalytics(store).jd_report("jd1")
+
+    assert report["candidates"] == 3
+    assert report["title"] == "Title jd1"
+    # a and b tie on 4.5; b has the higher fit score
+    assert [row["session_id"] for row in report["shortlist"]] == ["b", "a", "c"]
+    assert report["shortlist"][2] == {"rank": 3, "session_id": "c", "interview_score": 2.0, "fit_score": 50.0,
+                                      "questions_answered": 1}
+    assert report["distribution"] == {"1": 0, "2": 1, "3": 0, "4": 0, "5": 2}
+    assert report["percentiles"]["technical"]["p50"] == 4.0
+
+
+def test_list_jds_and_unknown_jd(store):
+    engine = ResultsAnalytics(store)
+    assert {row["jd_hash"]: row["candidates"] for row in engine.list_jds()} == {"jd1": 3, "jd2": 1}
+    assert engine.jd_report("missing")["candidates"] == 0
+
+
+def test_payloads_with_nested_evaluation_keys_are_not_skipped(result_store):
+    nested = {"summary": "ok", "evaluation": {"Score": 2}}
+    result_store.append("analysis", {"session_id": "n", "jd_hash": "jd3", "final_score": 60,
+                                     "resume_jd_analysis": nested})
+    result_store.append("evaluation", {"session_id": "n", "jd_hash": "jd3", "question_type": "technical",
+                                       "score": 4, "evaluation": {"Reasoning": "x", "evaluation": {"a": 1}}})
+    report = ResultsAnalytics(result_store).jd_report("jd3")
+    assert report["candidates"] == 1
+    assert report["shortlist"][0]["fit_score"] == 60.0
+    assert report["shortlist"][0]["interview_score"] == 4.0
+
+
+def test_header_parse_falls_back_to_the_whole_line():
+    # A nested marker ahead of the payload cuts the line mid-list
+    line = b'{"kind":"evaluation","tags":[{"a":1,"evaluation":{"b":2}}],"score":3,"evaluation":{"x":1}}'
+    assert _parse_header(line)["score"] == 3
+    assert _parse_header(b'{"kind":"other","score":1}') == {"kind": "other", "score": 1}
+
+
+def test_refresh_picks_up_new_records(store):
+    engine = ResultsAnalytics(store)
+    assert engine.jd_report("jd2")["candidates"] == 1
+    add_candidate(store, "e", "jd2", 60, [("technical", 5)])
+    assert engine.jd_report("jd2")["candidates"] == 2
+
+
+def test_column_cache_round_trip_and_reset(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(analytics, "CACHE_SAVE_EVERY", 1)
+    expected = ResultsAnalytics(store).jd_report("jd1")
+    assert os.path.exists(tmp_path / "analytics-cache.npz")
+
+    assert ResultsAnalytics(store).jd_report("jd1") == expected
+
+    # A store that was reset (file shorter than the cached offset) is rebuilt from scratch
+    store.close()
+    os.remove(tmp_path / "results-00001.jsonl")
+    fresh = ResultStore(directory=str(tmp_path))
+    add_candidate(fresh, "z", "jd1", 10, [("technical", 1)])
+    report = ResultsAnalytics(fresh).jd_report("jd1")
+    assert [row["session_id"] for row in report["shortlist"]] == ["z"]
@@ -0,0 +1,118 @@
+import json
+import re
+import threading
+import uuid
+
+import pytest
+
+from llm import estimate_tokens
+from tools import batch_scoring
+from tools.token_ledger import TokenLedger
+
+JD = "# Data Engineer\nBuild batch and streaming pipelines."
+
+
+def scores_for(prompt):
+    """Scores every numbered answer in a batched prompt 4, naming its question in the reasoning"""
+    items = re.findall(r"\[(\d+)\] Question: (\S+)", prompt)
+    return json.dumps({"scores": [{"id": int(position), "Score": 4, "Reasoning": f"scored {question}"}
+                                  for position, question in items]})
+
+
+def pending(count, answer="I partition the data by date and compact small files nightly."):
+    return [batch_scoring.pending_evaluation(f"q{i}", f"{answer} ({i})", "Partitioning and compaction.",
+                                             "technical", bank_id=f"b{i}")
+            for i in range(count)]
+
+
+@pytest.fixture
+def state(result_store, monkeypatch):
+    monkeypatch.setattr(batch_scoring, "get_result_store", lambda: result_store)
+    return {"session_id": uuid.uuid4().hex, "job_description": JD}
+
+
+def test_answers_reach_the_prompt_in_full(state, fake_llm, result_store):
+    prompts = []
+    fake_llm(lambda prompt: prompts.append(prompt) or scores_for(prompt))
+    evaluations = pending(2, answer="Spark with adaptive query execution. " * 40)
+    evaluations[0]["follow_up_answer"] = "Skew joins get salted keys. " * 30
+    evaluations[0]["pending_score"]["expected_answer"] = "Discusses partitioning, skew and compaction. " * 20
+
+    assert batch_scoring.score_pending(state, evaluations) == 2
+    assert len(prompts) == 1
+    assert evaluations[0]["User_Answer"] in prompts[0]
+    assert evaluations[0]["follow_up_answer"] in prompts[0]
+    assert "Discusses partitioning, skew and compaction. " * 20 in prompts[0]
+    assert [evaluation["Reasoning"] for evaluation in evaluations] == ["scored q0", "scored q1"]
+    assert all(not batch_scoring.is_pending(evaluation) for evaluation in evaluations)
+    assert [record["bank_id"] for record in result_store.iter_records("evaluation")] == ["b0", "b1"]
+
+
+def test_chunks_close_at_the_token_cap(state, fake_llm, monkeypatch):
+    prompts = []
+    lock = threading.Lock()
+
+    def respond(prompt):
+        with lock:
+            prompts.append(prompt)
+        return scores_for(prompt)
+
+    fake_llm(respond)
+    evaluations = pending(5, answer="x" * 400)
+    overhead = estimate_tokens(batch_scoring._scoring_prompt("", JD))
+    monkeypatch.setattr(batch_scoring, "BATCH_SCORING_MAX_TOKENS", overhead + 250)  # two ~110-token answers
+    evaluations.append(pending(1, answer="y" * 2000)[0])  # too big for any chunk: goes alone
+
+    assert [len(chunk) for chunk in batch_scoring._chunk(evaluations, JD)] == [2, 2, 1, 1]
+    assert batch_scoring.score_pending(state, evaluations) == 6
+    assert len(prompts) == 4
+    assert all(estimate_tokens(prompt) <= overhead + 250 for prompt in prompts if "y" * 2000 not in prompt)
+    assert sorted(evaluation["Reasoning"] for evaluation in evaluations) == [f"scored q{i}" for i in (0, 0, 1, 2, 3, 4)]
+
+
+def test_chunks_also_close_at_the_answer_count(monkeypatch):
+    monkeypatch.setattr(batch_scoring, "BATCH_SCORING_CHUNK", 3)
+    assert [len(chunk) for chunk in batch_scoring._chunk(pending(7), JD)] == [3, 3, 1]
+
+
+def test_chunks_are_scored_in_parallel(state, fake_llm, monkeypatch):
+    monkeypatch.setattr(batch_scoring, "BATCH_SCORING_CHUNK", 1)
+    both_calls = threading.Barrier(2, timeout=5)  # only passes if the two chunks are in flight together
+
+    def respond(prompt):
+        both_calls.wait()
+        return scores_for(prompt)
+
+    fake_llm(respond)
+    evaluations = pending(2)
+    batch_scoring.score_pending(state, evaluations)
+    assert [evaluation["Reasoning"] for evaluation in evaluations] == ["scored q0", "scored q1"]
+
+
+def test_failed_chunks_are_scored_locally(state, fake_llm, monkeypatch, result_store):
+    monkeypatch.setattr(batch_scoring, "BATCH_SCORING_CHUNK", 1)
+
+    def respond(prompt):
+        if "Question: q1" in prompt:
+            raise RuntimeError("backend down")
+        return scores_for(prompt)
+
+    fake_llm(respond)
+    evaluations = pending(2)
+    assert batch_scoring.score_pending(state, evaluations) == 2
+    assert evaluations[0]["Reasoning"] == "scored q0" and "scored_locally" not in evaluations[0]
+    assert evaluations[1]["scored_locally"] is True
+    assert "batched scoring unavailable" in evaluations[1]["Reasoning"]
+    assert 1 <= evaluations[1]["Score"] <= 5
+    assert len(list(result_store.iter_records("evaluation"))) == 2
+
+
+def test_exhausted_budget_scores_everything_locally(state, fake_llm, monkeypatch):
+    ledger = TokenLedger(token_budget=100, cost_budget=0)
+    ledger.record({"session_id": state["session_id"], "node": "Interview", "input_tokens": 100, "output_tokens": 0})
+    monkeypatch.setattr(batch_scoring, "get_ledger", lambda: ledger)
+    fake_llm(lambda prompt: pytest.fail("no LLM call once the budget is exhausted"))
+
+    evaluations = pending(3)
+    assert batch_scoring.score_pending(state, evaluations) == 3
+    assert all(evaluation["scored_locally"] for evaluation in evaluations)
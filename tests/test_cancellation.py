@@ -0,0 +1,86 @@
+import uuid
+
+import pytest
+
+from llm import llm_call_context
+from tools import batch_scoring
+from tools.cancellation import CancellationRegistry, CancellationToken, WorkCancelled, get_cancellations
+from tools.interview_conversational_agent import call_llm
+
+
+def test_token_cancels_once_and_runs_callbacks():
+    token = CancellationToken("job")
+    reasons = []
+    token.on_cancel(reasons.append)
+    token.raise_if_cancelled()
+
+    assert token.cancel("reset") is True
+    assert token.cancel("again") is False
+    token.on_cancel(reasons.append)  # registered late: runs at once
+    assert reasons == ["reset", "reset"]
+    with pytest.raises(WorkCancelled, match="job cancelled \\(reset\\)"):
+        token.raise_if_cancelled()
+
+
+def test_failing_callback_does_not_stop_the_others():
+    token = CancellationToken()
+    seen = []
+    token.on_cancel(lambda reason: 1 / 0)
+    token.on_cancel(seen.append)
+    token.cancel("reset")
+    assert seen == ["reset"]
+
+
+def test_registry_refuses_cancelled_scopes_and_counts_skipped_work():
+    registry = CancellationRegistry(abandon_after=0)
+    registry.check("s1", prompt="x" * 40)
+    registry.check(None, prompt="x")
+
+    registry.cancel("s1", "abandoned")
+    registry.cancel("s1", "again")
+    assert registry.is_cancelled("s1") and not registry.is_cancelled("s2")
+    with pytest.raises(WorkCancelled, match="abandoned"):
+        registry.check("s1", prompt="x" * 40)
+    with pytest.raises(WorkCancelled):
+        registry.check("s1", node="Evaluate")
+    assert registry.stats() == {"sessions_cancelled": 1, "llm_calls_skipped": 1, "input_tokens_skipped": 10,
+                                "nodes_skipped": 1}
+    registry.reset_stats()
+    assert registry.stats() == {}
+
+
+def test_reap_cancels_tokens_without_a_heartbeat():
+    registry = CancellationRegistry(abandon_after=60)
+    idle, active = CancellationToken("idle"), CancellationToken("active")
+    registry._watched.update({idle, active})  # watch() would also start the reaper thread
+    idle.last_seen -= 120
+
+    assert registry.reap() == 1
+    assert idle.cancelled and idle.reason == "abandoned"
+    assert not active.cancelled
+    assert registry.stats()["sessions_abandoned"] == 1
+
+
+@pytest.fixture
+def cancelled_session(fake_llm):
+    fake_llm(lambda prompt: '{"scores": []}')
+    session_id = uuid.uuid4().hex
+    get_cancellations().cancel(session_id, "abandoned")
+    return session_id
+
+
+def test_call_llm_reraises_cancellation(cancelled_session):
+    with llm_call_context(session_id=cancelled_session), pytest.raises(WorkCancelled):
+        call_llm("prompt")
+
+
+def test_cancelled_sessions_are_not_scored_or_stored(cancelled_session, result_store, monkeypatch):
+    store = result_store
+    monkeypatch.setattr(batch_scoring, "get_result_store", lambda: store)
+    state = {"session_id": cancelled_session, "job_description": "jd"}
+    pending = [batch_scoring.pending_evaluation("q", "a thorough answer here", "expected", "technical")]
+
+    with pytest.raises(WorkCancelled):
+        batch_scoring.score_pending(state, pending)
+    store.append_evaluation(state, {"Score": 3}, "technical")
+    assert list(store.iter_records()) == []
@@ -0,0 +1,68 @@
+import uuid
+
+import pytest
+
+from llm import estimate_tokens
+from tools.conversation_memory import (
+    ConversationMemory, clip, forget_conversation_memory, get_conversation_memory, memory_context,
+)
+
+LONG_ANSWER = "I built the ingestion service in Python. " + "It handled retries, backpressure and schema drift. " * 40
+
+
+@pytest.fixture
+def memory():
+    return ConversationMemory(uuid.uuid4().hex, token_cap=300, recent_turns=2, summary_tokens=100)
+
+
+def test_clip_bounds_tokens():
+    assert clip("  short  ", 10) == "short"
+    clipped = clip(LONG_ANSWER, 50)
+    assert estimate_tokens(clipped) <= 51 and clipped.endswith("…")
+
+
+def test_older_turns_fold_into_the_summary(memory, fake_llm):
+    prompts = []
+    fake_llm(lambda prompt: prompts.append(prompt) or "Claims Python ingestion work " * 100)
+    for i in range(5):
+        memory.add_turn(f"Question {i}?", f"Answer {i}.")
+    assert memory.flush(5)
+
+    assert memory.turns_seen == 5
+    assert prompts and "Answer 0." in prompts[0]
+    assert estimate_tokens(memory.summary) <= memory.summary_tokens + 1
+    rendered = memory.render()
+    assert "Notes on earlier answers" in rendered
+    assert "Answer 4." in rendered and "Answer 3." in rendered and "Answer 2." not in rendered
+    assert "Answer 4." not in memory.render(skip_latest=1)
+
+
+def test_render_stays_within_the_token_cap(memory, fake_llm):
+    fake_llm(lambda prompt: LONG_ANSWER)
+    for i in range(30):
+        memory.add_turn(f"Tell me about project {i} and the hardest bug you fixed there?", LONG_ANSWER)
+        assert estimate_tokens(memory.render()) <= memory.token_cap + 1
+    memory.flush(5)
+    assert estimate_tokens(memory.render()) <= memory.token_cap + 1
+
+
+def test_failed_summary_compacts_locally(memory, fake_llm):
+    def failing(prompt):
+        raise RuntimeError("backend down")
+
+    fake_llm(failing)
+    for i in range(6):
+        memory.add_turn(f"Question {i}?", f"Answer {i}. More detail follows here.")
+    memory.flush(5)
+    assert "Answer 0." in memory.summary and "More detail" not in memory.summary
+    assert estimate_tokens(memory.summary) <= memory.summary_tokens + 1
+
+
+def test_memory_is_kept_per_session_until_forgotten():
+    session_id = uuid.uuid4().hex
+    assert memory_context({"session_id": session_id}) == ""
+    get_conversation_memory(session_id).add_turn("Why Python?", "Readable.")
+    assert get_conversation_memory(session_id) is get_conversation_memory(session_id)
+    assert "Readable." in memory_context({"session_id": session_id})
+    forget_conversation_memory(session_id)
+    assert memory_context({"session_id": session_id}) == ""
@@ -0,0 +1,79 @@
+import pytest
+
+from tools import difficulty_ladder
+from tools.difficulty_ladder import evaluation_score, next_level, running_score, serve_question
+
+
+def make_state(ladder=None, **extra):
+    entry = {"question": "Base?", "answer": "base answer", "bank_id": "technical-1"}
+    if ladder is not None:
+        entry["ladder"] = ladder
+    return {"questions": {"technical": [entry]}, **extra}
+
+
+LADDER = {"easy": {"question": "Easy?", "answer": "easy answer"},
+          "hard": {"question": "Hard?", "answer": "hard answer"}}
+
+
+@pytest.mark.parametrize("current, score, expected", [
+    ("medium", 4.0, "hard"),
+    ("hard", 5, "hard"),
+    ("medium", 2.5, "easy"),
+    ("easy", 1, "easy"),
+    ("easy", 3, "easy"),
+    ("medium", None, "medium"),
+    ("unknown", 4.5, "hard"),
+])
+def test_next_level(current, score, expected):
+    assert next_level(current, score) == expected
+
+
+def test_running_score_uses_the_recent_window_of_numeric_scores():
+    assert running_score([1, 1, "N/A", 5, 4, "3"]) == 4.0
+    assert running_score([None, "N/A"]) is None
+
+
+def test_evaluation_score_falls_back_to_the_local_shadow_score():
+    assert evaluation_score({"Score": 2, "local_score": {"score": 5}}) == 2
+    assert evaluation_score({"local_score": {"score": 5}}) == 5
+    assert evaluation_score({}) is None
+
+
+def test_strong_answers_serve_the_harder_variant():
+    state = make_state(LADDER)
+    assert serve_question(state, "technical", 0, scores=[5, 4]) == "Hard?"
+    served = state["questions"]["technical"][0]
+    assert served["level"] == "hard" and served["answer"] == "hard answer"
+    assert served["bank_id"] is None
+    assert state["difficulty_level"] == "hard"
+    # Serving the same entry again keeps the chosen variant
+    assert serve_question(state, "technical", 0, scores=[1, 1]) == "Hard?"
+
+
+def test_scores_default_to_the_state_evaluations():
+    state = make_state(LADDER, evaluation=[{"Score": 1}, {"local_score": {"score": 2}}])
+    assert serve_question(state, "technical", 0) == "Easy?"
+
+
+def test_middling_answers_serve_the_base_question():
+    state = make_state(LADDER)
+    assert serve_question(state, "technical", 0, scores=[3]) == "Base?"
+    assert state["questions"]["technical"][0]["bank_id"] == "technical-1"
+    assert state["questions"]["technical"][0]["level"] == "medium"
+
+
+def test_missing_rung_falls_back_to_the_base_question():
+    state = make_state({"easy": LADDER["easy"], "hard": {"question": ""}})
+    assert serve_question(state, "technical", 0, scores=[5]) == "Base?"
+    assert state["difficulty_level"] == "medium"
+
+
+def test_no_ladder_or_disabled_ladder_leaves_the_entry_alone(monkeypatch):
+    state = make_state()
+    assert serve_question(state, "technical", 0, scores=[5]) == "Base?"
+    assert "level" not in state["questions"]["technical"][0]
+
+    monkeypatch.setattr(difficulty_ladder, "QUESTION_LADDER_ENABLED", False)
+    state = make_state(LADDER)
+    assert serve_question(state, "technical", 0, scores=[5]) == "Base?"
+    assert "difficulty_level" not in state
@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+from tools import interview_pacing
+from tools.interview_pacing import (
+    LatencyTracker, allow_optional_work, fits_another_question, mark_question_asked, pacing_status,
+    record_answer_time, remaining_questions,
+)
+
+
+@pytest.fixture
+def latency(monkeypatch):
+    """Rolling LLM latency pinned to 1s"""
+    tracker = LatencyTracker(window=5)
+    tracker.record({"latency": 1.0})
+    monkeypatch.setattr(interview_pacing, "get_latency_tracker", lambda: tracker)
+    monkeypatch.setattr(interview_pacing, "QUESTION_LLM_CALLS", 1)
+    return tracker
+
+
+def make_state(budget, elapsed, questions_left, answers=(10.0,)):
+    return {
+        "time_budget": budget,
+        "interview_started_at": time.time() - elapsed,
+        "answer_seconds": list(answers),
+        "questions": {"technical": [{}] * questions_left},
+        "question_indices": {"technical": 0},
+        "question_type_order": ["technical"],
+    }
+
+
+def test_without_a_budget_the_interview_is_not_time_boxed(latency):
+    assert pacing_status({"interview_started_at": time.time()}) == {"time_boxed": False, "status": "on_track"}
+    assert pacing_status({"time_budget": 60}) == {"time_boxed": False, "status": "on_track"}
+
+
+@pytest.mark.parametrize("elapsed, status", [
+    (0, "on_track"),   # 100s left, 3 questions at 11s each, 67s slack
+    (60, "behind"),    # 40s left, 7s slack < 12s for a follow-up
+    (92, "out_of_time"),  # 8s left < 11s for one more question
+])
+def test_status_follows_the_projected_remaining_time(latency, elapsed, status):
+    state = make_state(100, elapsed, questions_left=3)
+    pacing = pacing_status(state)
+    assert pacing["status"] == status
+    assert allow_optional_work(pacing) is (status == "on_track")
+    assert fits_another_question(state) is (status != "out_of_time")
+
+
+def test_answer_time_is_the_median_of_recent_answers(latency):
+    pacing = pacing_status(make_state(100, 0, questions_left=1, answers=[5, 30, 7, 6]))
+    assert pacing["answer_time"] == 6.5
+    assert pacing["llm_latency"] == 1.0
+
+
+def test_latency_tracker_ignores_errors_and_keeps_a_window():
+    tracker = LatencyTracker(window=2)
+    assert tracker.rolling_latency(default=3.0) == 3.0
+    for latency in (10.0, 1.0, 3.0):
+        tracker.record({"latency": latency})
+    tracker.record({"latency": 100.0, "error": True})
+    assert tracker.rolling_latency() == 2.0
+
+
+def test_answer_clock_and_remaining_questions():
+    state = make_state(0, 0, questions_left=3, answers=[])
+    state["question_indices"]["technical"] = 1
+    assert remaining_questions(state) == 2
+
+    record_answer_time(state)
+    assert state["answer_seconds"] == []
+    mark_question_asked(state)
+    state["question_asked_at"] -= 4
+    record_answer_time(state)
+    assert state["answer_seconds"] == [pytest.approx(4, abs=0.1)]
+    assert "question_asked_at" not in state
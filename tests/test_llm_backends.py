@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+import llm
+from llm import FailoverLLM, FakeLLM, backend_health, create_backend, get_llm, register_backend
+from tools import llm_cassette
+
+
+class Flaky(FakeLLM):
+    """FakeLLM that fails while `down` is set, counting the attempts"""
+    def __init__(self, name, state):
+        super().__init__(lambda prompt: f"{name}: {prompt}")
+        self.state = state
+
+    def invoke(self, prompt):
+        self.state["calls"] += 1
+        if self.state["down"]:
+            raise TimeoutError("backend unreachable")
+        return super().invoke(prompt)
+
+
+@pytest.fixture
+def backends(monkeypatch):
+    monkeypatch.setattr(llm, "_backends", dict(llm._backends))
+    monkeypatch.setattr(llm, "_backend_down_until", {})
+    monkeypatch.setattr(llm_cassette, "LLM_CASSETTE_MODE", "off")
+    states = {name: {"down": False, "calls": 0} for name in ("primary", "secondary")}
+    for name, state in states.items():
+        register_backend(name, lambda name=name, state=state: Flaky(name, state))
+    return states
+
+
+def test_registry(backends):
+    assert create_backend("primary").invoke("hi") == "primary: hi"
+    assert create_backend("fake").invoke("anything") == "{}"
+    with pytest.raises(ValueError, match="Unknown LLM backend 'nope'"):
+        create_backend("nope")
+
+
+def test_get_llm_follows_the_configured_backends(backends, monkeypatch):
+    monkeypatch.setattr(llm, "LLM_BACKENDS", ["secondary"])
+    assert get_llm().invoke("hi") == "secondary: hi"
+    monkeypatch.setattr(llm, "LLM_BACKENDS", ["primary", "secondary"])
+    assert isinstance(get_llm(), FailoverLLM)
+
+
+def test_an_llm_factory_overrides_the_backends(backends, fake_llm):
+    fake_llm(lambda prompt: "from factory")
+    assert get_llm().invoke("hi") == "from factory"
+
+
+def test_failover_skips_a_failed_backend_during_its_cooldown(backends):
+    backends["primary"]["down"] = True
+    failover = FailoverLLM(["primary", "secondary"], cooldown=60)
+    assert failover.invoke("hi") == "secondary: hi"
+    assert failover.served_by == "secondary"
+    assert "primary" in backend_health()
+
+    # Cooling down: the next call goes straight to the secondary
+    assert failover.invoke("again") == "secondary: again"
+    assert backends["primary"]["calls"] == 1
+
+
+def test_failover_returns_to_a_recovered_backend_after_the_cooldown(backends):
+    backends["primary"]["down"] = True
+    failover = FailoverLLM(["primary", "secondary"], cooldown=0)
+    failover.invoke("hi")
+    backends["primary"]["down"] = False
+    assert failover.invoke("hi") == "primary: hi"
+    assert failover.served_by == "primary"
+    assert backend_health() == {}
+
+
+def test_failover_raises_the_last_error_when_every_backend_fails(backends):
+    backends["primary"]["down"] = backends["secondary"]["down"] = True
+    failover = FailoverLLM(["primary", "secondary"], cooldown=60)
+    with pytest.raises(TimeoutError):
+        failover.invoke("hi")
+    # All cooling down: both are tried anyway
+    with pytest.raises(TimeoutError):
+        failover.invoke("hi")
+    assert backends["primary"]["calls"] == backends["secondary"]["calls"] == 2
+
+
+def test_failover_streams_and_awaits(backends):
+    backends["primary"]["down"] = True
+    failover = FailoverLLM(["primary", "secondary"], cooldown=60)
+    assert asyncio.run(failover.ainvoke("hi")) == "secondary: hi"
+    assert "".join(failover.stream("hi")) == "secondary: hi"
+
+
+def test_fake_llm_error_rate():
+    fake = FakeLLM(lambda prompt: "ok", error_rate=1.0)
+    with pytest.raises(RuntimeError, match="Simulated LLM failure"):
+        fake.invoke("hi")
+    assert FakeLLM(lambda prompt: prompt.upper()).invoke("hi") == "HI"
+
+
+def test_failover_needs_known_backends(backends, monkeypatch):
+    with pytest.raises(RuntimeError, match="no LLM backend available"):
+        FailoverLLM([])
+    with pytest.raises(ValueError, match="Unknown LLM backend"):
+        FailoverLLM(["primary", "nope"])
+    monkeypatch.setattr(llm, "LLM_BACKENDS", [])
+    with pytest.raises(RuntimeError, match="no LLM backend available"):
+        get_llm()
+
+    failover = FailoverLLM(["primary"])
+    failover.names.clear()
+    with pytest.raises(RuntimeError, match="no LLM backend available"):
+        failover.invoke("hi")
+    with pytest.raises(RuntimeError, match="no LLM backend available"):
+        "".join(failover.stream("hi"))
+    with pytest.raises(RuntimeError, match="no LLM backend available"):
+        asyncio.run(failover.ainvoke("hi"))
@@ -0,0 +1,106 @@
+import json
+
+import pytest
+
+from llm import FakeLLM, llm_call_context
+from tools.llm_cassette import CassetteRecorder, RecordingLLM, ReplayLLM, prompt_key
+
+
+def write_cassette(path, calls):
+    with open(path, "w", encoding="utf-8") as f:
+        for call in calls:
+            f.write(json.dumps({"key": prompt_key(call["prompt"]), "node": None, "purpose": None, "latency": 0.5,
+                                "input_tokens": 10, "output_tokens": 5, "model": "recorded-model", "error": None,
+                                **call}) + "\n")
+        f.write('{"key": "torn')  # interrupted recording
+
+
+def test_prompt_key_ignores_whitespace():
+    assert prompt_key("Score this\n    answer  ") == prompt_key("Score this answer")
+    assert prompt_key("Score this answer") != prompt_key("Score that answer")
+
+
+def test_exact_matches_replay_in_recorded_order(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    write_cassette(path, [{"prompt": "Q", "response": "first"}, {"prompt": "Q", "response": "second"}])
+    replay = ReplayLLM(str(path), latency="zero")
+    assert replay.recorded_calls == 2
+    assert [replay.invoke("Q") for _ in range(3)] == ["first", "second", "second"]
+    assert replay.model_name == "recorded-model"
+    assert replay.last_usage["input_tokens"] == 10
+    assert replay.stats == {"exact": 3, "by_tag": 0, "missed": 0}
+
+
+def test_unknown_prompts_fail_unless_the_tag_fallback_is_on(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    write_cassette(path, [{"prompt": "old template", "response": "eval", "node": "Interview", "purpose": "evaluate"}])
+    replay = ReplayLLM(str(path), latency="zero")
+    with llm_call_context(node="Interview", purpose="evaluate"):
+        with pytest.raises(RuntimeError, match="No cassette recording"):
+            replay.invoke("new template")
+    assert replay.stats == {"exact": 0, "by_tag": 0, "missed": 1}
+
+
+def test_tag_fallback_serves_the_same_node_and_purpose(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    write_cassette(path, [
+        {"prompt": "old template 1", "response": "eval 1", "node": "Interview", "purpose": "evaluate"},
+        {"prompt": "old template 2", "response": "eval 2", "node": "Interview", "purpose": "evaluate"},
+        {"prompt": "other", "response": "followup", "node": "Interview", "purpose": "followup"},
+    ])
+    replay = ReplayLLM(str(path), latency="zero", tag_fallback=True)
+    with llm_call_context(node="Interview", purpose="evaluate"):
+        assert [replay.invoke(f"new template {i}") for i in range(3)] == ["eval 1", "eval 2", "eval 1"]
+    with pytest.raises(RuntimeError, match="No cassette recording"):
+        replay.invoke("new template")
+    assert replay.stats == {"exact": 0, "by_tag": 3, "missed": 1}
+
+
+def test_each_session_replays_from_its_own_position(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    write_cassette(path, [
+        {"prompt": "Q", "response": "first", "node": "Interview", "purpose": "evaluate"},
+        {"prompt": "Q", "response": "second", "node": "Interview", "purpose": "evaluate"},
+    ])
+    replay = ReplayLLM(str(path), latency="zero", tag_fallback=True)
+    with llm_call_context(session_id="a", node="Interview", purpose="evaluate"):
+        assert [replay.invoke("Q"), replay.invoke("changed")] == ["first", "first"]
+    with llm_call_context(session_id="b", node="Interview", purpose="evaluate"):
+        assert [replay.invoke("Q"), replay.invoke("changed")] == ["first", "first"]
+    with llm_call_context(session_id="a", node="Interview", purpose="evaluate"):
+        assert [replay.invoke("Q"), replay.invoke("changed")] == ["second", "second"]
+
+
+def test_recorded_failures_replay_as_failures(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    write_cassette(path, [{"prompt": "Q", "response": None, "error": "TimeoutError: deadline exceeded"}])
+    with pytest.raises(RuntimeError, match="Replayed LLM failure: TimeoutError"):
+        ReplayLLM(str(path), latency="zero").invoke("Q")
+
+
+def test_missing_cassette():
+    with pytest.raises(FileNotFoundError):
+        ReplayLLM("does/not/exist.jsonl")
+
+
+def test_record_then_replay_round_trip(tmp_path):
+    path = str(tmp_path / "recorded" / "cassette.jsonl")
+    recorder = CassetteRecorder(path)
+    recording = RecordingLLM(FakeLLM(lambda prompt: f"reply to {prompt}"), recorder)
+    with llm_call_context(node="QuestionGen", purpose="technical"):
+        assert recording.invoke("Q1") == "reply to Q1"
+    failing = RecordingLLM(FakeLLM(lambda prompt: "", error_rate=1.0), recorder)
+    with pytest.raises(RuntimeError):
+        failing.invoke("Q2")
+    recorder.close()
+    assert recorder.calls == 2
+
+    with open(path, encoding="utf-8") as f:
+        first = json.loads(f.readline())
+    assert (first["node"], first["purpose"], first["response"]) == ("QuestionGen", "technical", "reply to Q1")
+    assert first["prompt"] == "<redacted 2 chars>"
+
+    replay = ReplayLLM(path, latency="zero")
+    assert replay.invoke("Q1") == "reply to Q1"
+    with pytest.raises(RuntimeError, match="Simulated LLM failure"):
+        replay.invoke("Q2")
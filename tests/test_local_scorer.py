@@ -0,0 +1,86 @@
+import pytest
+
+from tools import local_scorer
+from tools.local_scorer import (
+    ScoringPaths, agreement, content_tokens, cosine, first_pass, hashed_ngrams, local_evaluation, local_score,
+    term_coverage,
+)
+
+EXPECTED = ("A Python generator is a function that uses yield to produce values lazily, one at a time, "
+            "keeping its state between calls, which saves memory when iterating over large data streams.")
+GOOD = ("A generator is a Python function that uses yield to produce values lazily one at a time, "
+        "keeping state between calls and saving memory when iterating large data streams.")
+OFF_TOPIC = ("Kubernetes schedules containers onto cluster nodes and restarts failed pods according "
+             "to deployment manifests and health probes.")
+
+
+@pytest.fixture(autouse=True)
+def fresh_paths(monkeypatch):
+    monkeypatch.setattr(local_scorer, "_paths", ScoringPaths())
+
+
+def test_content_tokens_drop_stopwords_and_trailing_punctuation():
+    assert content_tokens("The answer is: use C++ and Node.js.") == ["answer", "use", "c++", "node.js"]
+    assert content_tokens(None) == []
+
+
+def test_similarity_helpers():
+    vector = hashed_ngrams(content_tokens(GOOD))
+    assert cosine(vector, vector) == pytest.approx(1.0)
+    assert cosine(vector, hashed_ngrams([])) == 0.0
+    assert term_coverage({"generator", "memory"}, {"generators", "speed"}) == 0.5
+    assert term_coverage(set(), {"anything"}) == 0.0
+
+
+def test_short_and_unreferenced_answers():
+    assert local_score("I dunno", EXPECTED) == {"score": 1, "confidence": 0.95, "similarity": 0.0, "coverage": 0.0}
+    assert local_score(GOOD, "")["confidence"] == 0.0
+
+
+def test_close_answers_outscore_off_topic_ones():
+    good, off = local_score(GOOD, EXPECTED), local_score(OFF_TOPIC, EXPECTED)
+    assert good["score"] >= 4
+    assert off["score"] <= 2
+    assert good["similarity"] > off["similarity"]
+    assert 0 <= good["confidence"] <= 1
+
+
+def test_local_evaluation_has_the_llm_shape():
+    evaluation = local_evaluation("What is a generator?", GOOD, EXPECTED)
+    assert set(evaluation) >= {"Question", "User_Answer", "Score", "Reasoning"}
+    assert evaluation["scored_locally"] is True
+    assert "LLM budget reached" in evaluation["Reasoning"]
+
+
+def test_first_pass_paths(monkeypatch):
+    monkeypatch.setattr(local_scorer, "LOCAL_SCORING_ENABLED", False)
+    features, evaluation = first_pass("Q", GOOD, EXPECTED)
+    assert evaluation is None and "confidence" in features
+    _, evaluation = first_pass("Q", GOOD, EXPECTED, budget_exhausted=True)
+    assert evaluation["scored_locally"]
+
+    monkeypatch.setattr(local_scorer, "LOCAL_SCORING_ENABLED", True)
+    monkeypatch.setattr(local_scorer, "LOCAL_SCORE_CONFIDENCE", 0.0)
+    _, evaluation = first_pass("Q", GOOD, EXPECTED)
+    assert evaluation["Score"] == features["score"]
+    monkeypatch.setattr(local_scorer, "LOCAL_SCORE_CONFIDENCE", 1.01)
+    _, evaluation = first_pass("Q", GOOD, EXPECTED)
+    assert evaluation is None
+
+    snapshot = local_scorer.get_scoring_paths().snapshot()
+    assert snapshot["counts"] == {"llm": 1, "budget": 1, "local": 1, "escalated": 1}
+    assert snapshot["llm_share"] == 0.5
+
+
+def test_agreement_only_uses_llm_scored_main_answers():
+    evaluations = [
+        {"Score": 4, "local_score": {"confidence": 0.9, "score": 4}},
+        {"Score": 2, "local_score": {"confidence": 0.6, "score": 4}},
+        {"Score": 5, "local_score": {"confidence": 0.9, "score": 1}, "scored_locally": True},
+        {"Score": 5, "local_score": {"confidence": 0.9, "score": 1}, "has_followup": True},
+        {"Score": 3},
+    ]
+    low, high = agreement(evaluations, thresholds=(0.5, 0.8))
+    assert low == {"threshold": 0.5, "local_share": 1.0, "answers": 2, "exact": 0.5, "within_one": 0.5, "mae": 1.0}
+    assert high == {"threshold": 0.8, "local_share": 0.5, "answers": 1, "exact": 1.0, "within_one": 1.0, "mae": 0.0}
+    assert agreement([], thresholds=(0.5,))[0]["local_share"] is None
@@ -0,0 +1,83 @@
+import json
+import uuid
+
+import pytest
+
+import bulk_screen
+from llm import FakeLLM
+from tools.prefilter import JDSkillExtractor, ResumeSkillIndex, select_candidates, tokenize
+
+SKILLS = {"required": ["Python", "Kubernetes", "machine learning"], "preferred": ["Go"]}
+
+
+def test_tokenize_keeps_tech_spellings():
+    assert tokenize("C++, C#, Node.js and scikit-learn.") == ["c++", "c#", "node.js", "and", "scikit-learn"]
+
+
+def test_index_scores_weighted_skill_coverage():
+    index = ResumeSkillIndex()
+    index.add("strong", "Python and Go services on Kubernetes; machine learning pipelines")
+    index.add("partial", "Python scripts, some learning about machines")
+    index.add("none", "Retail manager")
+    scores = {row["resume"]: row for row in index.score(SKILLS)}
+
+    assert scores["strong"]["prefilter_score"] == 1.0
+    assert scores["partial"]["prefilter_score"] == round(1 / 3.5, 3)
+    assert scores["partial"]["matched_skills"] == ["Python"]
+    assert scores["none"]["prefilter_score"] == 0.0
+    assert ResumeSkillIndex().score({"required": []}) == []
+
+
+@pytest.mark.parametrize("top_n, threshold, passed", [
+    (None, None, ["a", "b", "c"]),
+    (2, None, ["a", "b"]),
+    (None, 0.5, ["a"]),
+    (2, 0.05, ["a", "b"]),
+])
+def test_select_candidates(top_n, threshold, passed):
+    scored = [{"resume": "c", "prefilter_score": 0.0}, {"resume": "a", "prefilter_score": 0.9},
+              {"resume": "b", "prefilter_score": 0.4}]
+    ranked = select_candidates(scored, top_n=top_n, threshold=threshold)
+    assert [row["resume"] for row in ranked] == ["a", "b", "c"]
+    assert [row["prefilter_rank"] for row in ranked] == [1, 2, 3]
+    assert [row["resume"] for row in ranked if row["passed_prefilter"]] == passed
+
+
+def test_jd_skills_are_extracted_once_per_jd():
+    calls = []
+    llm = FakeLLM(lambda prompt: calls.append(prompt) or json.dumps({**SKILLS, "preferred": ["Go", 7]}))
+    jd = f"Platform engineer {uuid.uuid4().hex}"
+    assert JDSkillExtractor(llm).extract(jd) == SKILLS
+    assert JDSkillExtractor(llm).extract(jd) == SKILLS
+    assert len(calls) == 1
+    assert "error" in JDSkillExtractor(FakeLLM(lambda prompt: "nope")).extract(f"Other JD {uuid.uuid4().hex}")
+
+
+class StubAnalyzer:
+    """Documents are their own text; "broken" ones fail conversion"""
+    def __init__(self, llm, resume_pdf, jd_pdf):
+        pass
+
+    def _pdf_to_markdown(self, pdf, doc_type="resume"):
+        return "Error converting PDF" if "broken" in pdf else pdf
+
+    def analyze_texts(self, resume_text, jd_text):
+        return {"overall_assessment": {"fit": "Good", "final_score": "4/5"}}
+
+
+def test_screening_records_every_resume(monkeypatch, result_store):
+    monkeypatch.setattr(bulk_screen, "ResumeJDAnalyzer", StubAnalyzer)
+    monkeypatch.setattr(bulk_screen, "get_result_store", lambda: result_store)
+    llm = FakeLLM(lambda prompt: json.dumps(SKILLS))
+    resumes = ["Python Kubernetes machine learning Go", "Python only", "broken.pdf"]
+
+    result = bulk_screen.screen_resumes(f"Python Kubernetes JD {uuid.uuid4().hex}", resumes, top_n=1, llm=llm)
+    assert result["llm_analyses"] == 1
+    rows = {row["resume"]: row for row in result["rows"]}
+    assert rows[resumes[0]]["final_score"] == 4.0
+    assert rows[resumes[1]]["final_score"] is None and not rows[resumes[1]]["passed_prefilter"]
+
+    records = {record["resume"]: record for record in result_store.iter_records("screening")}
+    assert set(records) == set(resumes)
+    assert records["broken.pdf"]["error"] == "Error converting PDF"
+    assert records["broken.pdf"]["final_score"] is None
@@ -0,0 +1,113 @@
+import json
+
+import pytest
+
+from tools import question_generator
+from tools.question_bank import NEAR_DUPLICATE_THRESHOLD, QuestionBank, pick_common_skills
+
+PROJECT_A = "How would you use Python to scale the data pipeline in your fraud detection project?"
+PROJECT_B = "How would you use Python to scale the data pipeline in your churn model project?"
+
+
+@pytest.fixture
+def bank(tmp_path):
+    return QuestionBank("jd", bank_dir=str(tmp_path))
+
+
+def test_near_duplicate_on_same_skill_is_reused(bank):
+    first = bank.add_or_reuse({"question": "Explain Python generators and when you would use them in a data pipeline?",
+                               "answer": "a"}, "Python")
+    second = bank.add_or_reuse({"question": "Explain Python generators, and when you would use them in data pipelines?",
+                                "answer": "b"}, "python")
+    assert second == first
+    assert bank.stats["near_duplicates"] == 1
+    assert len(bank.entries) == 1
+
+
+def test_similar_questions_below_threshold_are_kept_apart(bank):
+    # Two candidates' project questions share most of their wording (~0.6 Jaccard)
+    assert NEAR_DUPLICATE_THRESHOLD > 0.6
+    first = bank.add_or_reuse({"question": PROJECT_A, "answer": "a"}, "Python")
+    second = bank.add_or_reuse({"question": PROJECT_B, "answer": "b"}, "Python")
+    assert second["question"] == PROJECT_B
+    assert first["bank_id"] != second["bank_id"]
+
+
+def test_near_duplicates_never_cross_skills(bank):
+    bank.add_or_reuse({"question": "Explain Python generators and when you would use them?", "answer": "a"}, "Python")
+    other = bank.add_or_reuse({"question": "Explain Python generators and when you would use them?", "answer": "b"}, "Docker")
+    assert other["answer"] == "b"
+    assert len(bank.entries) == 2
+
+
+def test_questions_without_a_skill_are_not_banked(bank):
+    question = {"question": "Tell me about a conflict in your team at Acme?", "answer": "a"}
+    assert bank.add_or_reuse(question, "") is question
+    assert bank.entries == []
+
+
+def test_bank_persists_and_serves_least_used(bank, tmp_path):
+    bank.add_or_reuse({"question": "What is a Python decorator?", "answer": "a"}, "Python")
+    bank.add_or_reuse({"question": "How does the GIL limit CPU-bound threads?", "answer": "b"}, "Python")
+
+    reloaded = QuestionBank("jd", bank_dir=str(tmp_path))
+    assert [e["question"] for e in reloaded.entries] == [e["question"] for e in bank.entries]
+    served = [reloaded.lookup("python")["question"] for _ in range(2)]
+    assert sorted(served) == sorted(e["question"] for e in bank.entries)
+    assert reloaded.lookup("Kubernetes") is None
+
+
+def test_legacy_candidate_specific_entries_are_dropped_on_load(tmp_path):
+    (tmp_path / "jd.json").write_text(json.dumps({"entries": [
+        {"id": "behavioral-1", "skill": "", "type": "behavioral", "question": "q", "answer": "a", "signature": [], "uses": 3},
+        {"id": "technical-2", "skill": "python", "type": "technical", "question": "q2", "answer": "a2", "signature": [], "uses": 1},
+    ]}))
+    assert [e["id"] for e in QuestionBank("jd", bank_dir=str(tmp_path)).entries] == ["technical-2"]
+
+
+def test_pick_common_skills_keeps_jd_skills_in_candidate_order():
+    skills = ["Go", "Python", "python", "Kubernetes", "Docker"]
+    jd = "We use Python, Docker and Kubernetes"
+    assert pick_common_skills(skills, jd, limit=2) == ["Python", "Kubernetes"]
+    assert pick_common_skills(["Rust"], jd) == []
+
+
+class CountingGenerator:
+    def __init__(self):
+        self.skills = []
+
+    def generate_skill_question(self, skill, difficulty_level="intermediate", jd_text=""):
+        self.skills.append(skill)
+        return {"question": f"How do you apply {skill} to production services?", "answer": "a"}
+
+
+def test_banked_skill_questions_skip_generation_on_a_full_hit(bank, monkeypatch):
+    monkeypatch.setattr(question_generator, "get_question_bank", lambda jd_text: bank)
+    context = {"technical_context": {"skills": ["Python", "Docker"]}}
+    jd = "Python and Docker engineers"
+
+    generator = CountingGenerator()
+    questions, full_hit = question_generator.banked_skill_questions(context, jd, generator)
+    assert not full_hit
+    assert generator.skills == ["Python", "Docker"]
+
+    generator = CountingGenerator()
+    again, full_hit = question_generator.banked_skill_questions(context, jd, generator)
+    assert full_hit
+    assert generator.skills == []
+    assert [q["question"] for q in again] == [q["question"] for q in questions]
+
+
+def test_no_banked_skills_is_never_a_full_hit(bank, monkeypatch):
+    monkeypatch.setattr(question_generator, "get_question_bank", lambda jd_text: bank)
+    generator = CountingGenerator()
+    # No skill in common with the JD
+    context = {"technical_context": {"skills": ["Rust"]}}
+    assert question_generator.banked_skill_questions(context, "Python and Docker", generator) == ([], False)
+
+    # Banking switched off per interview
+    monkeypatch.setattr(question_generator, "BANKED_SKILLS_PER_INTERVIEW", 0)
+    context = {"technical_context": {"skills": ["Python", "Docker"]}}
+    assert question_generator.banked_skill_questions(context, "Python and Docker", generator) == ([], False)
+    assert pick_common_skills(["Python"], "Python shop", limit=0) == []
+    assert generator.skills == []
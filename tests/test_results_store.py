@@ -0,0 +1,91 @@
+import os
+import threading
+import time
+
+import pytest
+
+from tools import results_store
+from tools.results_store import ResultStore, coerce_score, jd_title
+
+
+def test_records_iterate_oldest_first_with_filters(result_store):
+    for i in range(5):
+        result_store.append("evaluation", {"session_id": f"s{i % 2}", "score": i})
+    result_store.append("analysis", {"session_id": "s0"})
+
+    assert [r["score"] for r in result_store.iter_records("evaluation")] == [0, 1, 2, 3, 4]
+    assert [r["score"] for r in result_store.iter_records("evaluation", session_id="s1")] == [1, 3]
+    assert [r["kind"] for r in result_store.iter_records(session_id="s0")] == ["evaluation"] * 3 + ["analysis"]
+
+
+def test_rotates_to_a_new_segment_at_max_bytes(tmp_path):
+    store = ResultStore(directory=str(tmp_path), max_bytes=200)
+    for i in range(20):
+        store.append("evaluation", {"session_id": "s", "score": i, "padding": "x" * 40})
+    store.close()
+
+    segments = sorted(os.listdir(tmp_path))
+    assert len(segments) > 1
+    assert segments[0] == "results-00001.jsonl"
+    assert all(os.path.getsize(tmp_path / name) < 200 + 120 for name in segments)
+    assert [r["score"] for r in ResultStore(directory=str(tmp_path)).iter_records("evaluation")] == list(range(20))
+
+
+def test_reopened_store_appends_to_the_last_segment(tmp_path):
+    store = ResultStore(directory=str(tmp_path))
+    store.append("evaluation", {"score": 1})
+    store.close()
+    store = ResultStore(directory=str(tmp_path))
+    store.append("evaluation", {"score": 2})
+    store.close()
+    assert os.listdir(tmp_path) == ["results-00001.jsonl"]
+    assert [r["score"] for r in store.iter_records()] == [1, 2]
+
+
+def test_appends_never_wait_for_an_fsync(result_store, monkeypatch):
+    disk_free = threading.Event()
+    synced_on = []
+
+    def slow_fsync(fd):
+        synced_on.append(threading.current_thread().name)
+        disk_free.wait(5)
+        os.close(fd)
+
+    monkeypatch.setattr(results_store, "_fsync", slow_fsync)
+    result_store.fsync_every = 1
+    started = time.monotonic()
+    for i in range(3):
+        result_store.append("evaluation", {"score": i})
+    assert [r["score"] for r in result_store.iter_records()] == [0, 1, 2]
+    assert time.monotonic() - started < 1
+
+    disk_free.set()
+    results_store._fsync_executor.submit(lambda: None).result()  # drain queued fsyncs
+    assert synced_on and all(name.startswith("results-fsync") for name in synced_on)
+
+
+def test_torn_final_line_is_skipped(result_store, tmp_path):
+    result_store.append("evaluation", {"score": 1})
+    result_store.close()
+    with open(tmp_path / "results-00001.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"kind": "evaluation", "sco')
+    assert [r["score"] for r in result_store.iter_records()] == [1]
+
+
+def test_append_evaluation_record_shape(result_store):
+    state = {"session_id": "s1", "job_description": "# Senior ML Engineer\nPython"}
+    result_store.append_evaluation(state, {"Score": "4/5", "follow_up_generated": True}, "technical", "technical-1")
+    record = next(result_store.iter_records("evaluation"))
+    assert record["score"] == 4.0
+    assert record["has_followup"] is True
+    assert (record["question_type"], record["bank_id"]) == ("technical", "technical-1")
+
+
+@pytest.mark.parametrize("value, expected", [(4, 4.0), ("3", 3.0), ("4/5", 4.0), (None, None), ("n/a", None)])
+def test_coerce_score(value, expected):
+    assert coerce_score(value) == expected
+
+
+def test_jd_title_strips_markdown():
+    assert jd_title("\n\n## **Data Engineer**\nDetails") == "Data Engineer"
+    assert jd_title("") == "Untitled JD"
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from llm import FakeLLM
+from tools import resume_extractor
+from tools.resume_extractor import ResumeExtractionStore, ResumeExtractor, resume_hash, split_context_with_extraction
+
+EXTRACTION = {
+    "technical_context": {"skills": ["Python", "Docker"], "projects": ["Fraud pipeline"], "relevant_experience": []},
+    "behavioral_context": {"leadership": ["Led a team of 4"], "teamwork": [], "communication": []},
+    "situational_context": {"problem_solving": [], "challenges": [], "decision_making": []},
+}
+RELEVANCE = {"technical_context": {"skills": ["Python"], "projects": [], "relevant_experience": []},
+             "matching_skills": ["Python"], "missing_elements": ["Go"]}
+
+
+class CountingLLM(FakeLLM):
+    def __init__(self):
+        super().__init__(self.reply)
+        self.prompts = []
+
+    def reply(self, prompt):
+        self.prompts.append(prompt)
+        return json.dumps(RELEVANCE if "Job Description" in prompt else EXTRACTION)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResumeExtractionStore(cache_dir=str(tmp_path))
+
+
+def test_extraction_is_reused_across_job_descriptions(store, monkeypatch):
+    monkeypatch.setattr(resume_extractor, "_store", store)
+    llm = CountingLLM()
+    first = split_context_with_extraction(llm, "resume text", "JD one")
+    second = split_context_with_extraction(llm, "resume text", "JD two")
+    assert first == second
+    assert first["technical_context"] == RELEVANCE["technical_context"]
+    assert first["behavioral_context"] == EXTRACTION["behavioral_context"]
+    assert sum("Job Description" not in prompt for prompt in llm.prompts) == 1
+    assert len(llm.prompts) == 3
+
+
+def test_callers_get_private_copies(store):
+    llm = CountingLLM()
+    extractor = ResumeExtractor(llm, store)
+    extractor.extract("resume text")["technical_context"]["skills"].append("Mutated")
+    store.get(resume_hash("resume text"))["behavioral_context"].clear()
+    assert extractor.extract("resume text") == EXTRACTION
+    assert len(llm.prompts) == 1
+
+
+def test_memory_is_bounded_and_backed_by_disk(tmp_path):
+    store = ResumeExtractionStore(cache_dir=str(tmp_path), max_entries=2)
+    for key in ("a", "b", "c"):
+        store.put(key, {"key": key})
+    assert list(store._memory) == ["b", "c"]
+
+    assert store.get("a") == {"key": "a"}  # reloaded from disk, evicting the least recently used
+    assert list(store._memory) == ["c", "a"]
+    assert store.get("missing") is None
+    assert store.stats == {"hits": 1, "misses": 1}
+
+
+def test_unparseable_extraction_is_not_cached(store):
+    llm = FakeLLM(lambda prompt: "not json")
+    assert "error" in ResumeExtractor(llm, store).extract("resume text")
+    assert store.get(resume_hash("resume text")) is None
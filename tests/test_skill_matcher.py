@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from llm import FakeLLM
+from tools import analyzer
+from tools.skill_matcher import SkillMatcher, format_skill_findings
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return SkillMatcher()
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Built services in Python and Golang on K8s", ["Python", "Go", "Kubernetes"]),
+    ("Frontend in React with Redux and TypeScript", ["React", "TypeScript"]),
+    ("Spark and Hadoop ETL jobs", ["Spark"]),
+    ("Fine-tuned BERT with Transformers", ["Hugging Face"]),
+    ("Trained models in torch on a GPU cluster", ["PyTorch"]),
+    ("Experience with\nmachine   learning", ["Machine Learning"]),
+    ("C++ and C# developer", ["C++", "C#"]),
+])
+def test_finds_skills_in_order_of_first_mention(matcher, text, expected):
+    assert matcher.find_skills(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "Able to react to feedback and spark interest in peers",
+    "Maintained power transformers and switchgear at the substation",
+    "Carried the torch for the accessibility initiative",
+    "Ranked documents with TF-IDF features",
+    "Let's go over the rest of the plan",
+    "Javanese and pythonic are not skills",
+])
+def test_plain_english_is_not_a_skill(matcher, text):
+    assert matcher.find_skills(text) == []
+
+
+def test_compare_splits_jd_skills_by_resume_coverage(matcher):
+    skills = matcher.compare("Python, Docker and AWS", "We need Python, Kubernetes and Docker")
+    assert skills == {"matching_skills": ["Python", "Docker"], "missing_elements": ["Kubernetes"]}
+    assert "JD skills missing from the resume: Kubernetes" in format_skill_findings(skills)
+
+
+def test_custom_dictionary_entries_are_matched():
+    matcher = SkillMatcher({"Elixir": ["elixir", "phoenix framework"]}, context_aliases={})
+    assert matcher.find_skills("Phoenix Framework APIs") == ["Elixir"]
+
+
+def test_llm_reported_skills_outside_the_dictionary_are_merged(matcher):
+    skills = matcher.compare("Python and Docker", "Python, Kubernetes, Docker and Erlang")
+    analysis = {"other_matching_skills": ["Python", "Pulumi ", "pyspark", "Terraform"],
+                "other_missing_elements": ["Erlang", "K8s", "erlang", 3], "fit": "Good"}
+    merged = matcher.merge_reported(skills, analysis)
+    assert merged == {"matching_skills": ["Python", "Docker", "Pulumi"],
+                      "missing_elements": ["Kubernetes", "Erlang"]}
+    assert analysis == {"fit": "Good"}
+    assert matcher.merge_reported(skills, {}) == skills
+
+
+def test_local_mode_analysis_reports_skills_outside_the_dictionary(monkeypatch):
+    monkeypatch.setattr(analyzer, "SKILL_MATCH_MODE", "local")
+    reply = json.dumps({"other_matching_skills": ["Pulumi"], "other_missing_elements": [],
+                        "overall_assessment": {"fit": "Good", "final_score": "4/5"}})
+    llm = FakeLLM(lambda prompt: reply)
+    analysis = analyzer.ResumeJDAnalyzer(llm, None, None).analyze_texts("Python, Pulumi", "Python and Pulumi, Kubernetes")
+    assert analysis["matching_skills"] == ["Python", "Pulumi"]
+    assert analysis["missing_elements"] == ["Kubernetes"]
+    assert "other_matching_skills" not in analysis
@@ -0,0 +1,112 @@
+import threading
+import uuid
+
+import pytest
+
+import graph
+from llm import llm_call_context, record_usage
+from tools.analysis_jobs import AnalysisJobRunner
+from tools.cancellation import CancellationRegistry, CancellationToken, get_cancellations
+from tools.token_ledger import TokenLedger, call_cost, format_ledger, get_ledger
+
+
+def usage(session_id, node="Interview", purpose=None, input_tokens=1000, output_tokens=100, **extra):
+    return {"session_id": session_id, "node": node, "purpose": purpose, "input_tokens": input_tokens,
+            "output_tokens": output_tokens, "model": "gemini-2.5-flash", **extra}
+
+
+def forget_session(ledger, session_id, reason):
+    """What the web app does when a tab is reset or abandoned (cancel_interview_work)"""
+    get_cancellations().cancel(session_id, reason)
+    ledger.forget(session_id)
+
+
+def test_calls_are_totalled_per_session_and_node():
+    ledger = TokenLedger(token_budget=0, cost_budget=0)
+    ledger.record(usage("s1", purpose="evaluate"))
+    ledger.record(usage("s1", purpose="evaluate", error=True, reasoning_tokens=50))
+    ledger.record(usage("s1", node="Analyze"))
+    ledger.record(usage("s2"))
+    ledger.record(usage(None))  # untagged calls belong to no session
+
+    summary = ledger.session_summary("s1")
+    assert (summary["calls"], summary["errors"], summary["input_tokens"]) == (3, 1, 3000)
+    assert summary["by_node"]["Interview/evaluate"]["reasoning_tokens"] == 50
+    assert set(summary["by_node"]) == {"Interview/evaluate", "Analyze"}
+    assert summary["cost_usd"] == round(3 * call_cost("gemini-2.5-flash", 1000, 100), 6)
+    assert summary["status"] == "ok"
+    assert "Interview/evaluate" in format_ledger(summary)
+    assert ledger.session_summary("unknown")["calls"] == 0
+
+
+def test_budget_degrades_then_exhausts():
+    ledger = TokenLedger(token_budget=1000, cost_budget=0, degrade_at=0.8)
+    ledger.record(usage("s1", input_tokens=700, output_tokens=100))
+    assert ledger.budget_status("s1") == "degraded"
+    ledger.record(usage("s1", input_tokens=200, output_tokens=0))
+    assert ledger.budget_status("s1") == "exhausted"
+    assert ledger.budget_status("s2") == "ok"
+    assert ledger.budget_status(None) == "ok"
+
+
+def test_reset_session_leaves_no_ledger_entry():
+    ledger = TokenLedger()
+    session_id = uuid.uuid4().hex
+    ledger.record(usage(session_id))
+    forget_session(ledger, session_id, "reset")
+    ledger.record(usage(session_id))  # a call that was already in flight finishes late
+    assert session_id not in ledger._sessions
+
+
+def test_abandoned_session_leaves_no_ledger_entry():
+    ledger = TokenLedger()
+    registry = CancellationRegistry(abandon_after=60)
+    session_id = uuid.uuid4().hex
+    token = CancellationToken("browser session")
+    token.on_cancel(lambda reason: forget_session(ledger, session_id, reason))
+    registry.watch(token)
+    ledger.record(usage(session_id))
+
+    token.last_seen -= 120  # no heartbeat for two minutes
+    assert registry.reap() == 1
+    ledger.record(usage(session_id))
+    assert token.reason == "abandoned"
+    assert session_id not in ledger._sessions
+
+
+class UsageGraph:
+    """Phase-1 stand-in that makes one LLM call, then another once the gate opens"""
+    def __init__(self):
+        self.gate = threading.Event()
+
+    def stream(self, state, stream_mode=None):
+        with llm_call_context(session_id=state["session_id"], node="Analyze"):
+            record_usage(1000, 100, 0.1, model="gemini-2.5-flash")
+            yield {"Extract": {"resume_text": "resume"}}
+            self.gate.wait(5)
+            record_usage(1000, 100, 0.1, model="gemini-2.5-flash")  # in flight when the job was released
+        yield {"Analyze": {"resume_jd_analysis": {"overall_assessment": {"fit": "Good", "final_score": "80"}}}}
+
+
+@pytest.fixture
+def usage_graph(monkeypatch):
+    fake = UsageGraph()
+    monkeypatch.setattr(graph, "build_phase_one_graph", lambda: fake)
+    monkeypatch.setattr(graph, "create_initial_state", lambda resume, jd: {"session_id": uuid.uuid4().hex})
+    yield fake
+    fake.gate.set()
+
+
+def test_released_analysis_job_leaves_no_ledger_entry(usage_graph):
+    ledger = get_ledger()
+    runner = AnalysisJobRunner(max_workers=1)
+    job, _ = runner.submit(b"resume", b"jd")
+    while "Extract" not in job.snapshot()["completed_nodes"]:
+        job._done.wait(0.01)
+    session_id = job.snapshot()["state"]["session_id"]
+    assert ledger.session_summary(session_id)["calls"] == 1
+
+    runner.release(job, "reset")
+    usage_graph.gate.set()
+    assert job.wait(5)["status"] == "cancelled"
+    assert session_id not in ledger._sessions
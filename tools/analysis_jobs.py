@@ -0,0 +1,170 @@
+# tools/analysis_jobs.py
+import copy
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple, Union
+
+from tools.cancellation import CancellationToken, WorkCancelled, get_cancellations
+from tools.log import get_logger
+from tools.token_ledger import get_ledger
+
+logger = get_logger("analysis_jobs")
+
+# Phase-1 runs executing at once; further submissions queue
+ANALYSIS_WORKERS = int(os.environ.get("ANALYSIS_WORKERS", "4"))
+
+
+def document_key(resume_pdf: Union[str, bytes], jd_pdf: Union[str, bytes]) -> str:
+    """Identity of a submission: hash of both documents' bytes (paths are read)"""
+    digest = hashlib.sha256()
+    for document in (resume_pdf, jd_pdf):
+        if isinstance(document, str):
+            with open(document, "rb") as f:
+                document = f.read()
+        digest.update(hashlib.sha256(document).digest())
+    return digest.hexdigest()
+
+
+class AnalysisJob:
+    """One phase-1 run in the background; the state fills in node by node as the graph streams"""
+    def __init__(self, key: str):
+        self.key = key
+        self.status = "queued"  # queued, running, done, error, cancelled
+        self.state = {}
+        self.completed_nodes = []
+        self.error = None
+        self.attached = 0  # extra submissions served by this run
+        self.subscribers = 1  # submissions still waiting for it (the run is cancelled when none are)
+        self.token = CancellationToken(f"analysis {key[:12]}")
+        self.submitted_at = time.time()
+        self.finished_at = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self._done.is_set()
+
+    def snapshot(self) -> Dict:
+        """Private copy of the job as of now (state, progress, status), safe to mutate"""
+        with self._lock:
+            return {
+                "key": self.key,
+                "status": self.status,
+                "state": copy.deepcopy(self.state),
+                "completed_nodes": list(self.completed_nodes),
+                "error": self.error,
+                "attached": self.attached,
+            }
+
+    def wait(self, timeout: Optional[float] = None) -> Dict:
+        self._done.wait(timeout)
+        return self.snapshot()
+
+
+class AnalysisJobRunner:
+    """Runs phase 1 on a worker pool, streaming per-node results, and coalesces identical submissions.
+
+    A submission whose documents match a job still in flight attaches to that job instead of
+    starting a duplicate run (double-clicks, reset + re-upload, two tabs on the same files).
+    A job every submitter has released is cancelled: skipped if still queued, otherwise stopped
+    at its next node or LLM call, and never stored.
+    """
+    def __init__(self, max_workers: int = ANALYSIS_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis")
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def submit(self, resume_pdf: Union[str, bytes], jd_pdf: Union[str, bytes]) -> Tuple[AnalysisJob, bool]:
+        """Start (or attach to) the phase-1 run for these documents; returns (job, attached)"""
+        key = document_key(resume_pdf, jd_pdf)
+        with self._lock:
+            job = self._in_flight.get(key)
+            if job is not None:
+                with job._lock:
+                    job.attached += 1
+                    job.subscribers += 1
+                return job, True
+            job = AnalysisJob(key)
+            self._in_flight[key] = job
+        self._pool.submit(self._run, job, resume_pdf, jd_pdf)
+        return job, False
+
+    def release(self, job: AnalysisJob, reason: str = "released"):
+        """A submitter no longer wants the result; the last one to leave cancels the job"""
+        with job._lock:
+            job.subscribers -= 1
+            abandoned = job.subscribers <= 0 and not job.finished
+        if abandoned:
+            with self._lock:
+                if self._in_flight.get(job.key) is job:
+                    self._in_flight.pop(job.key)  # an identical submission from now on starts afresh
+            job.token.cancel(reason)
+
+    def _run(self, job: AnalysisJob, resume_pdf, jd_pdf):
+        from graph import build_phase_one_graph, create_initial_state  # lazy import (graph imports tools)
+        from tools.results_store import get_result_store
+
+        cancellations = get_cancellations()
+        try:
+            if job.token.cancelled:
+                cancellations.record("jobs_skipped")
+                raise WorkCancelled(f"cancelled while queued ({job.token.reason})")
+            state = create_initial_state(resume_pdf, jd_pdf)
+            # Cancelling the job cancels its session, which stops its LLM calls and graph nodes
+            job.token.on_cancel(lambda reason: cancellations.cancel(state["session_id"], reason))
+            with job._lock:
+                job.status = "running"
+                job.state = dict(state)
+            for update in build_phase_one_graph().stream(state, stream_mode="updates"):
+                for node, node_state in update.items():
+                    with job._lock:
+                        job.state.update(node_state or {})
+                        job.completed_nodes.append(node)
+                job.token.raise_if_cancelled()
+            with job._lock:
+                failed = "error" in job.state or "error" in job.state.get("resume_jd_analysis", {})
+                job.status = "error" if failed else "done"
+                job.error = job.state.get("error") or job.state.get("resume_jd_analysis", {}).get("error")
+            if not failed:
+                get_result_store().append_analysis(job.state)
+        except WorkCancelled as e:
+            if job.status == "running":
+                cancellations.record("jobs_aborted")
+            with job._lock:
+                job.status = "cancelled"
+                job.error = str(e)
+                session_id = job.state.get("session_id")
+            if session_id is not None:
+                get_ledger().forget(session_id)  # nobody will read the cancelled run's usage
+            logger.info("🛑 Analysis job %s cancelled: %s", job.key[:12], e)
+        except Exception as e:
+            with job._lock:
+                job.status = "error"
+                job.error = str(e)
+            logger.error("❌ Analysis job %s failed: %s", job.key[:12], e)
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                if self._in_flight.get(job.key) is job:
+                    self._in_flight.pop(job.key)
+            job._done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._in_flight)
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_analysis_jobs() -> AnalysisJobRunner:
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = AnalysisJobRunner()
+        return _runner
@@ -0,0 +1,246 @@
+# tools/analytics.py
+import json
+import os
+import threading
+from typing import Dict, List
+
+import numpy as np
+
+from tools.results_store import ResultStore, get_result_store
+from tools.log import get_logger
+
+logger = get_logger("analytics")
+
+SCORE_PERCENTILES = [25, 50, 75, 90]
+# Rewrite the on-disk column cache after this many newly ingested records
+CACHE_SAVE_EVERY = 1000
+
+# Bulky payload the store writes last in each kind of record (lines start with the kind);
+# analytics parses only the fields before it
+_PAYLOAD_MARKERS = {
+    b'{"kind":"evaluation",': b',"evaluation":{',
+    b'{"kind":"analysis",': b',"resume_jd_analysis":{',
+    b'{"kind":"screening",': b',"resume_jd_analysis":{',
+}
+
+_COLUMNS = {
+    "eval_jd": np.int32, "eval_session": np.int32, "eval_qtype": np.int16, "eval_score": np.float32,
+    "analysis_jd": np.int32, "analysis_session": np.int32, "analysis_fit": np.float32,
+}
+
+
+def _parse_header(line: bytes) -> Dict:
+    """The record's fields before its payload, or the whole record if that cut doesn't parse"""
+    for prefix, marker in _PAYLOAD_MARKERS.items():
+        if line.startswith(prefix):
+            index = line.find(marker)
+            if index != -1:
+                try:
+                    return json.loads(line[:index] + b"}")
+                except json.JSONDecodeError:
+                    pass
+            break
+    return json.loads(line)
+
+
+class ResultsAnalytics:
+    """Cross-candidate analytics over the result store, held as NumPy columns.
+
+    Loading is lazy and incremental: columns (plus how far into each result file they reach)
+    are cached next to the store, so a cold start reads the cache and parses only records
+    appended since; queries are then pure array operations.
+    """
+    def __init__(self, store: ResultStore = None):
+        self.store = store or get_result_store()
+        self.cache_path = os.path.join(self.store.directory, "analytics-cache.npz")
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._reset()
+
+    def _reset(self):
+        self._offsets = {}
+        self._codes = {"jd": {}, "session": {}, "qtype": {}}
+        self.jd_titles = {}
+        self._columns = {name: np.empty(0, dtype=dtype) for name, dtype in _COLUMNS.items()}
+        self._pending = {name: [] for name in _COLUMNS}
+        self._unsaved = 0
+
+    def _code(self, column: str, value) -> int:
+        codes = self._codes[column]
+        if value not in codes:
+            codes[value] = len(codes)
+        return codes[value]
+
+    def _ingest(self, record: Dict):
+        kind = record.get("kind")
+        if kind == "evaluation" and record.get("score") is not None:
+            self._pending["eval_jd"].append(self._code("jd", record.get("jd_hash")))
+            self._pending["eval_session"].append(self._code("session", record.get("session_id")))
+            self._pending["eval_qtype"].append(self._code("qtype", record.get("question_type")))
+            self._pending["eval_score"].append(record["score"])
+        elif kind == "analysis":
+            self._pending["analysis_jd"].append(self._code("jd", record.get("jd_hash")))
+            self._pending["analysis_session"].append(self._code("session", record.get("session_id")))
+            self._pending["analysis_fit"].append(record.get("final_score") or 0.0)
+            if record.get("jd_title"):
+                self.jd_titles[record.get("jd_hash")] = record["jd_title"]
+        else:
+            return
+        self._unsaved += 1
+
+    # -------------------------------
+    # 🔹 Column cache
+    # -------------------------------
+    def _load_cache(self):
+        try:
+            with np.load(self.cache_path) as cached:
+                meta = json.loads(str(cached["meta"]))
+                columns = {name: cached[name] for name in _COLUMNS}
+        except (OSError, KeyError, ValueError):
+            return
+
+        # A result file that shrank or vanished means the store was reset: rebuild from scratch
+        for path, offset in meta["offsets"].items():
+            if not os.path.exists(path) or os.path.getsize(path) < offset:
+                return
+
+        self._offsets = meta["offsets"]
+        self._codes = {column: {value: i for i, value in enumerate(values)} for column, values in meta["codes"].items()}
+        self.jd_titles = meta["jd_titles"]
+        self._columns = columns
+
+    def _save_cache(self):
+        self._flush_pending()
+        meta = {
+            "offsets": self._offsets,
+            "codes": {column: list(codes) for column, codes in self._codes.items()},
+            "jd_titles": self.jd_titles,
+        }
+        try:
+            tmp_path = f"{self.cache_path}.{os.getpid()}.tmp.npz"
+            np.savez(tmp_path, meta=np.array(json.dumps(meta)), **self._columns)
+            os.replace(tmp_path, self.cache_path)
+            self._unsaved = 0
+        except OSError as e:
+            logger.warning("⚠️ Could not save analytics cache: %s", e)
+
+    def _flush_pending(self):
+        if any(self._pending.values()):
+            for name, dtype in _COLUMNS.items():
+                if self._pending[name]:
+                    self._columns[name] = np.concatenate([self._columns[name], np.asarray(self._pending[name], dtype=dtype)])
+                    self._pending[name] = []
+
+    def refresh(self):
+        """Ingest records appended since the last refresh (loading the column cache on first use)"""
+        self.store.flush()
+        with self._lock:
+            if not self._loaded:
+                self._load_cache()
+                self._loaded = True
+
+            for path in self.store._segment_paths():
+                offset = self._offsets.get(path, 0)
+                if os.path.getsize(path) <= offset:
+                    continue
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    data = f.read()
+                # Only consume complete lines; a partially written record is picked up next time
+                end = data.rfind(b"\n") + 1
+                for line in data[:end].splitlines():
+                    try:
+                        self._ingest(_parse_header(line))
+                    except json.JSONDecodeError:
+                        continue
+                self._offsets[path] = offset + end
+
+            if self._unsaved >= CACHE_SAVE_EVERY:
+                self._save_cache()
+
+    def _get_arrays(self) -> Dict[str, np.ndarray]:
+        self.refresh()
+        with self._lock:
+            self._flush_pending()
+            return dict(self._columns)
+
+    # -------------------------------
+    # 🔹 Queries
+    # -------------------------------
+    def list_jds(self) -> List[Dict]:
+        arrays = self._get_arrays()
+        candidate_counts = np.bincount(arrays["analysis_jd"], minlength=len(self._codes["jd"]))
+        return [
+            {"jd_hash": jd, "title": self.jd_titles.get(jd, (jd or "")[:12]), "candidates": int(candidate_counts[code])}
+            for jd, code in self._codes["jd"].items()
+        ]
+
+    def jd_report(self, jd_hash: str, shortlist_size: int = 10) -> Dict:
+        """Score distribution, per-question-type percentiles and a ranked shortlist for one JD"""
+        arrays = self._get_arrays()
+        jd_code = self._codes["jd"].get(jd_hash)
+        if jd_code is None:
+            return {"jd_hash": jd_hash, "candidates": 0, "distribution": {}, "percentiles": {}, "shortlist": []}
+
+        n_sessions = len(self._codes["session"])
+        mask = arrays["eval_jd"] == jd_code
+        sessions = arrays["eval_session"][mask]
+        scores = arrays["eval_score"][mask]
+        qtypes = arrays["eval_qtype"][mask]
+
+        # Per-candidate interview score (mean over answered questions)
+        answered = np.bincount(sessions, minlength=n_sessions)
+        totals = np.bincount(sessions, weights=scores, minlength=n_sessions)
+        candidates = np.flatnonzero(answered)
+        mean_scores = totals[candidates] / answered[candidates]
+
+        # Fit score from phase 1 (last analysis per session wins)
+        fit = np.full(n_sessions, -np.inf, dtype=np.float32)
+        analysis_mask = arrays["analysis_jd"] == jd_code
+        fit[arrays["analysis_session"][analysis_mask]] = arrays["analysis_fit"][analysis_mask]
+
+        # Rank by interview score, ties broken by fit score, then by questions answered
+        order = np.lexsort((-answered[candidates], -fit[candidates], -mean_scores))
+        session_ids = list(self._codes["session"])
+        shortlist = [
+            {
+                "rank": rank + 1,
+                "session_id": session_ids[candidates[i]],
+                "interview_score": round(float(mean_scores[i]), 2),
+                "fit_score": float(fit[candidates[i]]) if np.isfinite(fit[candidates[i]]) else None,
+                "questions_answered": int(answered[candidates[i]]),
+            }
+            for rank, i in enumerate(order[:shortlist_size])
+        ]
+
+        histogram, _ = np.histogram(mean_scores, bins=np.arange(0.5, 6.0, 1.0))
+        qtype_names = list(self._codes["qtype"])
+        percentiles = {}
+        for code in np.unique(qtypes):
+            type_scores = scores[qtypes == code]
+            percentiles[qtype_names[code]] = dict(zip(
+                (f"p{p}" for p in SCORE_PERCENTILES),
+                np.round(np.percentile(type_scores, SCORE_PERCENTILES), 2).tolist(),
+            ))
+
+        return {
+            "jd_hash": jd_hash,
+            "title": self.jd_titles.get(jd_hash),
+            "candidates": int(candidates.size),
+            "mean_score": round(float(mean_scores.mean()), 2) if candidates.size else None,
+            "distribution": {str(score): int(count) for score, count in zip(range(1, 6), histogram)},
+            "percentiles": percentiles,
+            "shortlist": shortlist,
+        }
+
+
+_analytics = None
+_analytics_lock = threading.Lock()
+
+
+def get_analytics() -> ResultsAnalytics:
+    global _analytics
+    with _analytics_lock:
+        if _analytics is None:
+            _analytics = ResultsAnalytics()
+        return _analytics
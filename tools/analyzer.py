@@ -1,36 +1,86 @@
 # tools/analyzer.py
 import json
 import re
-import pymupdf4llm
 import os
 
+from tools.profiling import profiled
+from tools.log import get_logger, log_payload
+from tools.pdf_converter import convert_pdf, describe_pdf_source, read_pdf_source
+from tools.skill_matcher import SKILL_MATCH_MODE, format_skill_findings, get_skill_matcher
+
+logger = get_logger("analyzer")
+
+
+def build_document_prefix(resume_text: str, jd_text: str) -> str:
+    """Shared, byte-stable prompt prefix holding both documents.
+
+    Every phase-1 prompt starts with exactly this text and appends its own
+    instructions, so the prefix can be cached once per session and reused.
+    """
+    return f"""You are an expert AI hiring assistant.
+
+Resume:
+{resume_text}
+
+Job Description:
+{jd_text}
+
+---
+"""
+
+
+def parse_final_score(score) -> float:
+    """Numeric value of an LLM "4.5/5"-style score (0.0 when unparseable)"""
+    try:
+        return float(str(score).split("/")[0])
+    except (ValueError, IndexError):
+        return 0.0
+
+
 class ResumeJDAnalyzer:
-    def __init__(self, llm, resume_pdf_path, jd_pdf_path):
+    """Resume/JD fit analysis; each PDF may be a file path, raw bytes or a file-like buffer"""
+    def __init__(self, llm, resume_pdf_path, jd_pdf_path, context_cache=None):
         self.llm = llm
         self.resume_pdf_path = resume_pdf_path
         self.jd_pdf_path = jd_pdf_path
+        self.context_cache = context_cache
+        self.cache_handle = None
+        self.conversion_reports = {}
+        # Markdown produced by analyze_resume_and_jd, reused by the tool wrapper
+        self.resume_text = None
+        self.jd_text = None
         
-    def _pdf_to_markdown(self, pdf_path):
-        """Convert PDF to markdown using pymupdf4llm"""
+    @profiled("pdf_to_markdown")
+    def _pdf_to_markdown(self, pdf_source, role=None):
+        """Convert PDF to markdown using pymupdf4llm (page ranges in parallel for long documents)"""
         try:
-            print(f"📄 Converting PDF: {pdf_path}")
-            if not os.path.exists(pdf_path):
-                return f"Error: PDF file not found at {pdf_path}"
+            pdf_source = read_pdf_source(pdf_source)
+            label = describe_pdf_source(pdf_source)
+            logger.info("📄 Converting PDF: %s", label)
+            if isinstance(pdf_source, str) and not os.path.exists(pdf_source):
+                return f"Error: PDF file not found at {pdf_source}"
             
-            markdown_content = pymupdf4llm.to_markdown(pdf_path)
-            print(f"✅ Successfully converted PDF. Content length: {len(markdown_content)} characters")
+            report = convert_pdf(pdf_source)
+            markdown_content = report.pop("markdown")
+            self.conversion_reports[role or label] = report
+            slowest = max(report["pages"], key=lambda p: p["seconds"], default=None)
+            logger.info("✅ Successfully converted PDF. Content length: %d characters, %s tier (%s), %d pages in %.2fs on %d worker(s)%s",
+                        len(markdown_content), report["tier"], report["tier_reason"], len(report["pages"]), report["wall_time"],
+                        report["workers"], f", slowest page {slowest['page']} ({slowest['seconds']:.2f}s)" if slowest else "")
             return markdown_content
         except Exception as e:
             error_msg = f"Error converting PDF to markdown: {str(e)}"
-            print(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             return error_msg
 
     def analyze_resume_and_jd(self):
-        print("🔍 Starting Resume-JD Analysis...")
+        logger.info("🔍 Starting Resume-JD Analysis...")
         
         # Convert PDFs to markdown
-        resume_text = self._pdf_to_markdown(self.resume_pdf_path)
-        jd_text = self._pdf_to_markdown(self.jd_pdf_path)
+        resume_text = self._pdf_to_markdown(self.resume_pdf_path, "resume")
+        jd_text = self._pdf_to_markdown(self.jd_pdf_path, "job_description")
+        self.resume_text = resume_text
+        self.jd_text = jd_text
         
         # Check if PDF conversion was successful
         if "Error" in resume_text or "Error" in jd_text:
@@ -40,10 +90,46 @@ class ResumeJDAnalyzer:
                 "jd_conversion": jd_text[:200] + "..." if len(jd_text) > 200 else jd_text
             }
         
-        prompt = f"""
-You are an expert AI hiring assistant.
+        return self.analyze_texts(resume_text, jd_text)
 
-Given the candidate's resume and the job description below, do the following in a step-by-step and return a structured JSON object:
+    def analyze_texts(self, resume_text, jd_text):
+        """Fit analysis on already-converted resume and JD markdown"""
+        prefix = build_document_prefix(resume_text, jd_text)
+        skills = None
+        if SKILL_MATCH_MODE == "local":
+            # Skill lists are set intersection: computed locally, the LLM only does the judgment
+            skills = get_skill_matcher().compare(resume_text, jd_text)
+            instructions = f"""
+{format_skill_findings(skills)}
+Given the candidate's resume, the job description and the skill comparison above, do the following in a step-by-step and return a structured JSON object:
+
+---
+### 🧠 STEP 1: Reasoning — Does Resume Match the JD?
+1. Aligned Experience
+2. Research Alignment
+3. Other Gaps (non-skill requirements such as experience level or domain)
+4. Exceeds Expectations
+5. Final Summary
+
+Return only the JSON object.
+
+{{
+  "other_matching_skills": [...],
+  "other_missing_elements": [...],
+  "aligned_experience": [...],
+  "research_alignment": [...],
+  "other_gaps": [...],
+  "extra_strengths": [...],
+  "overall_assessment": {{
+    "fit": "Excellent | Good | Average | Weak",
+    "final_score": "4.5/5",
+    "recommendation": "Should this candidate be interviewed?"
+  }}
+}}
+"""
+        else:
+            instructions = """
+Given the candidate's resume and the job description above, do the following in a step-by-step and return a structured JSON object:
 
 ---
 ### 🧠 STEP 1: Reasoning — Does Resume Match the JD?
@@ -54,48 +140,48 @@ Given the candidate's resume and the job description below, do the following in
 5. Exceeds Expectations
 6. Final Summary
 
-Resume:
-{resume_text}
-
-Job Description:
-{jd_text}
-
 Return only the JSON object.
 
-{{
+{
   "matching_skills": [...],
   "aligned_experience": [...],
   "research_alignment": [...],
   "missing_elements": [...],
   "extra_strengths": [...],
-  "overall_assessment": {{
+  "overall_assessment": {
     "fit": "Excellent | Good | Average | Weak",
     "final_score": "4.5/5",
     "recommendation": "Should this candidate be interviewed?"
-  }}
-}}
+  }
+}
 """
         try:
-            print("🤖 Calling LLM for analysis...")
-            analysis = self.llm.invoke(prompt)
-            print(f"✅ LLM response received. Length: {len(analysis)} characters")
+            logger.info("🤖 Calling LLM for analysis...")
+            if self.context_cache is not None:
+                self.cache_handle = self.context_cache.create(prefix)
+                analysis = self.context_cache.invoke(self.cache_handle, instructions)
+            else:
+                analysis = self.llm.invoke(prefix + instructions)
+            logger.info("✅ LLM response received. Length: %d characters", len(analysis))
             
             cleaned = re.sub(r"^```json|```$", "", analysis.strip(), flags=re.MULTILINE).strip("` \n")
-            print("🧹 Cleaned LLM response for JSON parsing")
+            logger.debug("🧹 Cleaned LLM response for JSON parsing")
             
             parsed_result = json.loads(cleaned)
-            print("✅ Successfully parsed JSON response")
+            logger.info("✅ Successfully parsed JSON response")
+            if skills is not None:
+                parsed_result.update(get_skill_matcher().merge_reported(skills, parsed_result))
             return parsed_result
             
         except json.JSONDecodeError as e:
-            print(f"❌ JSON parsing failed: {str(e)}")
+            logger.error("❌ JSON parsing failed: %s", e)
             return {
                 "error": "Invalid JSON returned by LLM.",
                 "raw_output": analysis,
                 "json_error": str(e)
             }
         except Exception as e:
-            print(f"❌ LLM call failed: {str(e)}")
+            logger.error("❌ LLM call failed: %s", e)
             return {
                 "error": "LLM call failed",
                 "exception": str(e)
@@ -103,39 +189,36 @@ Return only the JSON object.
 
 # LangGraph tool wrapper
 def analyze_resume_jd_tool(state: dict) -> dict:
-    from llm import GeminiLLM  # lazy import
+    from llm import get_context_cache, get_llm  # lazy import
     
-    print("🚀 Starting analyze_resume_jd_tool...")
+    logger.info("🚀 Starting analyze_resume_jd_tool...")
     
+    analyzer = None
     try:
-        # Get PDF paths from state
+        # Get PDFs (paths or in-memory bytes) from state
         resume_pdf = state["resume_pdf"]
         jd_pdf = state["jd_pdf"]
 
         
         # Create analyzer and get analysis
-        analyzer = ResumeJDAnalyzer(GeminiLLM(), resume_pdf, jd_pdf)
+        analyzer = ResumeJDAnalyzer(get_llm(), resume_pdf, jd_pdf, context_cache=get_context_cache())
         analysis_result = analyzer.analyze_resume_and_jd()
-        print(analysis_result)
+        log_payload(logger, "📄 Analysis result", analysis_result)
         
         state["resume_jd_analysis"] = analysis_result
+        state["context_cache_handle"] = analyzer.cache_handle
         
-        # Convert PDFs to text and store in expected keys for other tools
-        try:
-            print("📝 Converting PDFs to text for other tools...")
-            import pymupdf4llm
-            state["resume"] = pymupdf4llm.to_markdown(resume_pdf)
-            state["job_description"] = pymupdf4llm.to_markdown(jd_pdf)
-            print("✅ PDF to text conversion successful")
-        except Exception as e:
-            print(f"❌ PDF to text conversion failed: {str(e)}")
-            state["resume"] = f"Error converting resume PDF: {str(e)}"
-            state["job_description"] = f"Error converting JD PDF: {str(e)}"
+        # Store the text the analyzer already converted in expected keys for other tools
+        state["resume"] = analyzer.resume_text
+        state["job_description"] = analyzer.jd_text
+        state["document_extraction"] = analyzer.conversion_reports
         
         return state
         
     except Exception as e:
-        print(f"❌ Critical error in analyze_resume_jd_tool: {str(e)}")
+        logger.error("❌ Critical error in analyze_resume_jd_tool: %s", e)
+        if analyzer is not None and analyzer.cache_handle:
+            analyzer.context_cache.release(analyzer.cache_handle)  # never reaches ContextSplit's release
         state["resume_jd_analysis"] = {
             "error": "Critical error in analysis tool",
             "exception": str(e)
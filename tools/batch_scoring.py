@@ -0,0 +1,142 @@
+# tools/batch_scoring.py
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Dict, List, Optional
+
+from llm import estimate_tokens, get_llm, llm_call_context
+from tools.cancellation import WorkCancelled, get_cancellations
+from tools.local_scorer import local_evaluation
+from tools.log import get_logger
+from tools.results_store import get_result_store
+from tools.token_ledger import get_ledger
+
+logger = get_logger("batch_scoring")
+
+# "live" scores every answer as it comes in; "batched" only decides follow-ups live and scores all
+# answers (follow-up answers included) in a few LLM calls once the interview ends
+EVALUATION_MODE = os.environ.get("EVALUATION_MODE", "live")
+BATCHED_SCORING = EVALUATION_MODE == "batched"
+# Answers per end-of-interview scoring call (chunks are scored in parallel)
+BATCH_SCORING_CHUNK = int(os.environ.get("BATCH_SCORING_CHUNK", "8"))
+# Estimated prompt tokens per scoring call: answers go in whole, so a chunk closes early once the
+# next one would push it past this (an answer bigger than that is scored on its own)
+BATCH_SCORING_MAX_TOKENS = int(os.environ.get("BATCH_SCORING_MAX_TOKENS", "6000"))
+
+PENDING_REASONING = "Scored at the end of the interview"
+
+
+def pending_evaluation(question: str, answer: str, expected_answer: str, question_type: str,
+                       bank_id: Optional[str] = None) -> Dict:
+    """Placeholder in the usual evaluation shape; `score_pending` fills in Score and Reasoning"""
+    return {
+        "Question": question,
+        "User_Answer": answer,
+        "Score": None,
+        "Reasoning": PENDING_REASONING,
+        "pending_score": {"expected_answer": expected_answer, "question_type": question_type, "bank_id": bank_id},
+    }
+
+
+def is_pending(evaluation: Dict) -> bool:
+    return "pending_score" in evaluation
+
+
+def _item_text(position: int, evaluation: Dict) -> str:
+    item = f"[{position}] Question: {evaluation['Question']}\nAnswer: {evaluation['User_Answer']}\n"
+    if evaluation.get("follow_up_answer"):
+        item += f"Follow-up answer: {evaluation['follow_up_answer']}\n"
+    return item + f"Expected Answer: {evaluation['pending_score']['expected_answer']}"
+
+
+def _scoring_prompt(items_text: str, jd: str) -> str:
+    return f"""
+    Evaluate these interview responses. Score each answer on its own merits (1-5), taking a
+    follow-up answer into account together with the answer it follows up on.
+
+    Job Requirements: {jd[:300]}...
+
+    {items_text}
+
+    JSON Response:
+    {{
+        "scores": [
+            {{"id": 1, "Score": 1-5, "Reasoning": "one or two sentences explaining the score"}}
+        ]
+    }}
+    Return one entry per response, ids as numbered above.
+    """
+
+
+def _chunk(pending: List[Dict], jd: str) -> List[List[Dict]]:
+    """Split the answers into calls of at most BATCH_SCORING_CHUNK answers and BATCH_SCORING_MAX_TOKENS"""
+    budget = BATCH_SCORING_MAX_TOKENS - estimate_tokens(_scoring_prompt("", jd))
+    chunks, size = [[]], 0
+    for evaluation in pending:
+        tokens = estimate_tokens(_item_text(BATCH_SCORING_CHUNK, evaluation) + "\n\n")
+        if chunks[-1] and (len(chunks[-1]) >= BATCH_SCORING_CHUNK or size + tokens > budget):
+            chunks.append([])
+            size = 0
+        chunks[-1].append(evaluation)
+        size += tokens
+    return chunks
+
+
+def _score_chunk(chunk: List[Dict], jd: str) -> Dict[int, Dict]:
+    """One LLM call for a chunk of answers; returns {position in chunk: {"Score", "Reasoning"}}"""
+    items_text = "\n\n".join(_item_text(position, evaluation) for position, evaluation in enumerate(chunk, start=1))
+    prompt = _scoring_prompt(items_text, jd)
+    with llm_call_context(purpose="batch_evaluation"):
+        raw = get_llm().invoke(prompt)
+    cleaned = re.sub(r"^```json|```$", "", str(raw).strip(), flags=re.MULTILINE).strip("` \n")
+    scores = {}
+    for entry in json.loads(cleaned).get("scores", []):
+        if isinstance(entry, dict) and isinstance(entry.get("id"), int) and 1 <= entry["id"] <= len(chunk):
+            scores[entry["id"] - 1] = entry
+    return scores
+
+
+def score_pending(state: Dict, evaluations: List[Dict]) -> int:
+    """Score every pending evaluation in `evaluations` in place and store them; returns how many.
+
+    Chunks of up to BATCH_SCORING_CHUNK answers (fewer when their full text would exceed
+    BATCH_SCORING_MAX_TOKENS) go out in parallel. Answers a chunk failed to score (or
+    all of them once the session's LLM budget is exhausted) are scored locally.
+    """
+    pending = [evaluation for evaluation in evaluations if is_pending(evaluation)]
+    if not pending:
+        return 0
+    get_cancellations().check(state.get("session_id"))  # an abandoned session isn't scored, not even locally
+
+    jd = state.get("job_description", "")
+    chunks = _chunk(pending, jd)
+    results = [{} for _ in chunks]
+    if get_ledger().budget_status(state.get("session_id")) != "exhausted":
+        logger.info("🧮 Scoring %d answers in %d batched call(s)...", len(pending), len(chunks))
+        with ThreadPoolExecutor(max_workers=min(len(chunks), 4)) as pool:
+            futures = [pool.submit(copy_context().run, _score_chunk, chunk, jd) for chunk in chunks]
+            for i, future in enumerate(futures):
+                try:
+                    results[i] = future.result()
+                except WorkCancelled:
+                    raise
+                except Exception as e:
+                    logger.warning("⚠️ Batched scoring failed for %d answers, scoring locally: %s", len(chunks[i]), e)
+
+    store = get_result_store()
+    for chunk, scores in zip(chunks, results):
+        for position, evaluation in enumerate(chunk):
+            details = evaluation.pop("pending_score")
+            scored = scores.get(position)
+            if scored is not None and scored.get("Score") is not None:
+                evaluation["Score"] = scored["Score"]
+                evaluation["Reasoning"] = scored.get("Reasoning", "")
+            else:
+                answer = f"{evaluation['User_Answer']}\n{evaluation.get('follow_up_answer', '')}".strip()
+                fallback = local_evaluation(evaluation["Question"], answer, details["expected_answer"],
+                                            "batched scoring unavailable")
+                evaluation.update({key: fallback[key] for key in ("Score", "Reasoning", "scored_locally", "local_score")})
+            store.append_evaluation(state, evaluation, details["question_type"], details["bank_id"])
+    return len(pending)
@@ -0,0 +1,163 @@
+# tools/cancellation.py
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, Optional
+
+from tools.log import get_logger
+
+logger = get_logger("cancellation")
+
+# Sessions whose owner hasn't been seen for this long are treated as abandoned and cancelled (0 = never)
+SESSION_ABANDON_SECONDS = float(os.environ.get("SESSION_ABANDON_SECONDS", "300"))
+
+# Cancelled sessions remembered, so stragglers for them are still refused (oldest forgotten first)
+MAX_CANCELLED_SCOPES = 10000
+
+
+class WorkCancelled(RuntimeError):
+    """Raised at the next LLM call or graph node boundary once the work's session is cancelled"""
+
+
+class CancellationToken:
+    """Cooperative cancellation flag. Work checks it between steps; `on_cancel` callbacks
+    propagate the cancellation (to a session's LLM calls, a background job, ...)"""
+    def __init__(self, name: Optional[str] = None):
+        self.name = name
+        self.reason = None
+        self.last_seen = time.monotonic()
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled") -> bool:
+        """Cancel once and run the callbacks; False if it was already cancelled"""
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback(reason)
+            except Exception as e:
+                logger.warning("⚠️ Cancellation callback failed: %s", e)
+        return True
+
+    def on_cancel(self, callback: Callable[[str], None]):
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self.reason)
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise WorkCancelled(f"{self.name or 'work'} cancelled ({self.reason})")
+
+    def touch(self):
+        """Heartbeat from the token's owner (see CancellationRegistry.watch)"""
+        self.last_seen = time.monotonic()
+
+
+class CancellationRegistry:
+    """Cancelled session scopes, abandoned-owner detection, and counts of the work cancellation avoided.
+
+    LLM calls and graph nodes check the session they are tagged with (`check`), so cancelling a
+    session id stops its pending calls wherever they run: graph nodes, background jobs, memory updates.
+    Calls already in flight finish (their clients can't be interrupted) and are counted as wasted.
+    """
+    def __init__(self, abandon_after: float = SESSION_ABANDON_SECONDS):
+        self.abandon_after = abandon_after
+        self._cancelled = OrderedDict()  # scope -> reason
+        self._watched = set()
+        self._stats = Counter()
+        self._lock = threading.Lock()
+        self._reaper = None
+
+    def cancel(self, scope: str, reason: str = "cancelled"):
+        if scope is None:
+            return
+        with self._lock:
+            if scope in self._cancelled:
+                return
+            self._cancelled[scope] = reason
+            while len(self._cancelled) > MAX_CANCELLED_SCOPES:
+                self._cancelled.popitem(last=False)
+            self._stats["sessions_cancelled"] += 1
+        logger.info("🛑 Session %s cancelled (%s)", str(scope)[:12], reason)
+
+    def is_cancelled(self, scope: Optional[str]) -> bool:
+        return scope is not None and scope in self._cancelled
+
+    def check(self, scope: Optional[str], prompt: Optional[str] = None, node: Optional[str] = None):
+        """Raise WorkCancelled if `scope` is cancelled, counting the LLM call (or node) skipped"""
+        if scope is None or scope not in self._cancelled:
+            return
+        with self._lock:
+            if prompt is not None:
+                self._stats["llm_calls_skipped"] += 1
+                self._stats["input_tokens_skipped"] += len(prompt) // 4
+            if node is not None:
+                self._stats["nodes_skipped"] += 1
+            reason = self._cancelled.get(scope)
+        raise WorkCancelled(f"session {str(scope)[:12]} cancelled ({reason})")
+
+    def record(self, metric: str, count: int = 1):
+        with self._lock:
+            self._stats[metric] += count
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+
+    # -------------------------------
+    # 🔹 Abandoned owners
+    # -------------------------------
+    def watch(self, token: CancellationToken):
+        """Cancel `token` (reason "abandoned") once it goes `abandon_after` seconds without a `touch`"""
+        if not self.abandon_after:
+            return
+        with self._lock:
+            self._watched.add(token)
+            if self._reaper is None:
+                self._reaper = threading.Thread(target=self._reap_forever, name="cancellation-reaper", daemon=True)
+                self._reaper.start()
+
+    def reap(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            self._watched = {token for token in self._watched if not token.cancelled}
+            idle = [token for token in self._watched if now - token.last_seen > self.abandon_after]
+            self._watched.difference_update(idle)
+        for token in idle:
+            if token.cancel("abandoned"):
+                self.record("sessions_abandoned")
+        return len(idle)
+
+    def _reap_forever(self):
+        while True:
+            time.sleep(max(self.abandon_after / 4, 1.0))
+            self.reap()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_cancellations() -> CancellationRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = CancellationRegistry()
+        return _registry
@@ -1,21 +1,29 @@
 # tools/context_splitter.py
+import functools
+import os
 import re
 import json
 from typing import Dict
 
+from tools.analyzer import build_document_prefix
+from tools.resume_extractor import split_context_with_extraction
+
+# "full" = one resume+JD split call, "extract" = cached resume extraction + JD-relevance pass
+CONTEXT_SPLIT_MODE = os.environ.get("CONTEXT_SPLIT_MODE", "full")
+
 
 class ContextSplitter:
-    def __init__(self, llm, resume, job_description):
+    def __init__(self, llm, resume, job_description, context_cache=None, cache_handle=None):
         self.llm = llm
         self.resume = resume
         self.job_description = job_description
+        self.context_cache = context_cache
+        self.cache_handle = cache_handle
     
     def context_split(self):
         """Split resume into technical, behavioral, and situational contexts"""
-        prompt = f"""
-        You are an expert AI hiring assistant.
-
-        Given the candidate's resume and the job description below, split the resume into three distinct contexts:
+        instructions = """
+        Given the candidate's resume and the job description above, split the resume into three distinct contexts:
 
         1. Technical Context: which are relevant or slightly relevant to the job description.
         - Technical skills, tools, frameworks
@@ -37,34 +45,31 @@ class ContextSplitter:
         - Fast-paced environment experience
         - Critical decision-making instances
 
-        Resume:
-        {self.resume}
-        
-        Job Description:
-        {self.job_description}
-        
         Return a JSON object with these contexts structured as follows:
         
-        {{
-            "technical_context": {{
+        {
+            "technical_context": {
                 "skills": [],
                 "projects": [],
                 "relevant_experience": []
-            }},
-            "behavioral_context": {{
+            },
+            "behavioral_context": {
                 "leadership": [],
                 "teamwork": [],
                 "communication": []
-            }},
-            "situational_context": {{
+            },
+            "situational_context": {
                 "problem_solving": [],
                 "challenges": [],
                 "decision_making": []
-            }}
-        }}
+            }
+        }
         """
         try:
-            context = self.llm.invoke(prompt)
+            if self.context_cache is not None and self.cache_handle:
+                context = self.context_cache.invoke(self.cache_handle, instructions)
+            else:
+                context = self.llm.invoke(build_document_prefix(self.resume, self.job_description) + instructions)
             cleaned_context = re.sub(r"^```json|```$", "", context.strip(), flags=re.MULTILINE).strip("` \n")
             return json.loads(cleaned_context)
         except json.JSONDecodeError:
@@ -74,16 +79,46 @@ class ContextSplitter:
             }
 
 def context_split_tool(state: dict) -> dict:
-    from llm import GeminiLLM  # lazy import
+    from llm import get_context_cache, get_llm  # lazy import
     resume = state["resume"]  # Fixed: use text content, not PDF path
     jd = state["job_description"]  # Fixed: use text content, not PDF path
     
     
-    # Create splitter instance
-    splitter = ContextSplitter(GeminiLLM(), resume, jd)
-    
-    # Get context split
-    context_split = splitter.context_split()
+    context_cache = get_context_cache()
+    cache_handle = state.get("context_cache_handle")
+
+    if CONTEXT_SPLIT_MODE == "extract":
+        context_split = split_context_with_extraction(get_llm(), resume, jd)
+    else:
+        # Create splitter instance
+        splitter = ContextSplitter(get_llm(), resume, jd, context_cache=context_cache, cache_handle=cache_handle)
+        context_split = splitter.context_split()
     state["context_split"] = context_split
+
+    # Last phase-1 consumer of the document prefix: drop the cached copy
+    release_document_prefix(state)
     
-    return state    
+    return state
+
+
+def release_document_prefix(state: dict):
+    """Drop the session's hold on the cached document prefix (at most once per state)"""
+    from llm import get_context_cache  # lazy import
+
+    context_cache = get_context_cache()
+    if context_cache is not None and state.get("context_cache_handle"):
+        context_cache.release(state["context_cache_handle"])
+    state["context_cache_handle"] = None
+
+
+def releasing_document_prefix(node):
+    """Wrap ContextSplit so the prefix is released even when the node fails or a cancelled
+    session is stopped before it runs"""
+    @functools.wraps(node)
+    def wrapper(state, *args, **kwargs):
+        try:
+            return node(state, *args, **kwargs)
+        finally:
+            if isinstance(state, dict):
+                release_document_prefix(state)
+    return wrapper    
@@ -0,0 +1,181 @@
+# tools/conversation_memory.py
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from llm import estimate_tokens, get_llm, llm_call_context
+from tools.log import get_logger
+from tools.token_ledger import get_ledger
+
+logger = get_logger("conversation_memory")
+
+# Hard cap on the rendered memory (summary + recent turns) added to follow-up / evaluation prompts
+MEMORY_TOKEN_CAP = int(os.environ.get("MEMORY_TOKEN_CAP", "600"))
+# Most recent Q&A turns kept verbatim; older ones are folded into the rolling summary
+MEMORY_RECENT_TURNS = int(os.environ.get("MEMORY_RECENT_TURNS", "3"))
+MEMORY_SUMMARY_TOKENS = int(os.environ.get("MEMORY_SUMMARY_TOKENS", "250"))
+
+# Turns folded into the summary per LLM call (bounds the summary prompt when updates fall behind)
+MEMORY_SUMMARY_BATCH = 4
+
+# Summary updates run here, off the interview's critical path
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory")
+
+
+def clip(text: str, max_tokens: int) -> str:
+    """Cut text to roughly max_tokens (same ~4 characters/token estimate as the rest of the budget)"""
+    text = (text or "").strip()
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    return text[:max(max_tokens, 1) * 4].rsplit(" ", 1)[0] + "…"
+
+
+def first_sentence(text: str) -> str:
+    return re.split(r"(?<=[.!?])\s", (text or "").strip(), maxsplit=1)[0]
+
+
+class ConversationMemory:
+    """Rolling interview memory: an LLM-maintained summary of older turns plus the last few verbatim.
+
+    `add_turn` is cheap; turns leaving the verbatim window are folded into the summary by a
+    background update. `render` always fits in `token_cap`, however long the interview runs.
+    """
+    def __init__(self, session_id: Optional[str] = None, token_cap: int = MEMORY_TOKEN_CAP,
+                 recent_turns: int = MEMORY_RECENT_TURNS, summary_tokens: int = MEMORY_SUMMARY_TOKENS):
+        self.session_id = session_id
+        self.token_cap = token_cap
+        self.recent_turns = recent_turns
+        self.summary_tokens = summary_tokens
+        self.summary = ""
+        self.turns_seen = 0
+        self._recent = []
+        self._pending = []  # left the window, not yet summarized (includes the batch being summarized)
+        self._updating = False
+        self._idle = threading.Event()
+        self._idle.set()
+        self._lock = threading.Lock()
+
+    def add_turn(self, question: str, answer: str):
+        with self._lock:
+            self.turns_seen += 1
+            self._recent.append({"question": question or "", "answer": answer or ""})
+            while len(self._recent) > self.recent_turns:
+                self._pending.append(self._recent.pop(0))
+            start = bool(self._pending) and not self._updating
+            if start:
+                self._updating = True
+                self._idle.clear()
+        if start:
+            _executor.submit(self._update_summary)
+
+    def _update_summary(self):
+        while True:
+            with self._lock:
+                batch = self._pending[:MEMORY_SUMMARY_BATCH]
+                summary = self.summary
+                if not batch:
+                    self._updating = False
+                    self._idle.set()
+                    return
+            try:
+                updated = self._summarize(summary, batch)
+            except Exception as e:
+                logger.warning("⚠️ Memory summary update failed, compacting locally: %s", e)
+                updated = self._compact(summary, batch)
+            with self._lock:
+                self.summary = updated
+                del self._pending[:len(batch)]
+
+    def _summarize(self, summary: str, turns: List[Dict]) -> str:
+        # Near the session's LLM budget, keep the memory without spending calls on it
+        if get_ledger().budget_status(self.session_id) != "ok":
+            return self._compact(summary, turns)
+
+        exchanges = "\n".join(f"Q: {clip(t['question'], 60)}\nA: {clip(t['answer'], 200)}" for t in turns)
+        prompt = f"""
+        You keep the interviewer's running notes for an ongoing job interview.
+
+        Notes so far:
+        {summary or "(none yet)"}
+
+        New exchanges:
+        {exchanges}
+
+        Rewrite the notes to include the new exchanges, in at most {self.summary_tokens * 3 // 4} words:
+        skills and experience the candidate claimed, concrete examples given, and weak or unanswered areas.
+        Return ONLY the notes.
+        """
+        with llm_call_context(session_id=self.session_id, node="Memory", purpose="summary"):
+            response = get_llm().invoke(prompt)
+        return clip(str(response), self.summary_tokens)
+
+    def _compact(self, summary: str, turns: List[Dict]) -> str:
+        """No-LLM fallback: one line per turn, oldest notes dropped first to stay under the summary cap"""
+        lines = [summary] if summary else []
+        lines += [f"{clip(t['question'], 20)} → {clip(first_sentence(t['answer']), 30)}" for t in turns]
+        text = "\n".join(lines)
+        while estimate_tokens(text) > self.summary_tokens and "\n" in text:
+            text = text.split("\n", 1)[1]
+        return clip(text, self.summary_tokens)
+
+    def render(self, skip_latest: int = 0) -> str:
+        """Prompt-ready memory under `token_cap`; `skip_latest` leaves out turns the prompt quotes itself"""
+        with self._lock:
+            summary = self.summary
+            pending = list(self._pending)
+            recent = self._recent[:len(self._recent) - skip_latest] if skip_latest else list(self._recent)
+        if not (summary or pending or recent):
+            return ""
+
+        # Summary first, then the recent turns verbatim (clipped evenly), then one-liners for turns
+        # awaiting summarization, newest first, in whatever room is left
+        parts = []
+        if summary:
+            parts.append("Notes on earlier answers:\n" + clip(summary, self.summary_tokens))
+        room = self.token_cap - sum(estimate_tokens(part) for part in parts) - 10
+        recent_part = ""
+        if recent:
+            per_turn = max((room * 2 // 3) // len(recent), 40)
+            recent_part = "Recent exchanges:\n" + "\n".join(
+                f"Q: {clip(t['question'], 25)}\nA: {clip(t['answer'], per_turn - 30)}" for t in recent)
+            room -= estimate_tokens(recent_part)
+        lines = []
+        for t in reversed(pending):
+            line = f"- {clip(t['question'], 20)} → {clip(first_sentence(t['answer']), 30)}"
+            room -= estimate_tokens(line) + 1
+            if room < 0:
+                break
+            lines.insert(0, line)
+        if lines:
+            parts.append("\n".join(lines))
+        if recent_part:
+            parts.append(recent_part)
+        return clip("\n\n".join(parts), self.token_cap)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for pending summary updates (tests, end of session)"""
+        return self._idle.wait(timeout)
+
+
+_memories = {}
+_memories_lock = threading.Lock()
+
+
+def get_conversation_memory(session_id: str) -> ConversationMemory:
+    with _memories_lock:
+        if session_id not in _memories:
+            _memories[session_id] = ConversationMemory(session_id)
+        return _memories[session_id]
+
+
+def forget_conversation_memory(session_id: str):
+    with _memories_lock:
+        _memories.pop(session_id, None)
+
+
+def memory_context(state: Dict, skip_latest: int = 0) -> str:
+    """Memory block for a prompt ("" before the first turn)"""
+    memory = get_conversation_memory(state.get("session_id")).render(skip_latest)
+    return f"Conversation so far (for context):\n{memory}\n" if memory else ""
@@ -0,0 +1,64 @@
+# tools/difficulty_ladder.py
+import os
+from typing import Dict, Iterable, Optional
+
+from tools.results_store import coerce_score
+
+# Phase 1 adds an easier and a harder variant of every question (one batched LLM call)
+QUESTION_LADDER_ENABLED = os.environ.get("QUESTION_LADDER_ENABLED", "1") == "1"
+# Running score (mean of the last LADDER_WINDOW scores) that moves the next question a rung up / down
+LADDER_STEP_UP_AT = float(os.environ.get("LADDER_STEP_UP_AT", "4.0"))
+LADDER_STEP_DOWN_AT = float(os.environ.get("LADDER_STEP_DOWN_AT", "2.5"))
+LADDER_WINDOW = 3
+
+LADDER_LEVELS = ["easy", "medium", "hard"]
+BASE_LEVEL = "medium"  # the question as generated
+
+
+def running_score(scores: Iterable) -> Optional[float]:
+    numeric = [score for score in (coerce_score(value) for value in scores) if score is not None]
+    recent = numeric[-LADDER_WINDOW:]
+    return sum(recent) / len(recent) if recent else None
+
+
+def evaluation_score(evaluation: Dict):
+    """Score to adapt on; an answer awaiting batched scoring counts with its local shadow score"""
+    if evaluation.get("Score") is not None:
+        return evaluation["Score"]
+    return (evaluation.get("local_score") or {}).get("score")
+
+
+def next_level(current: str, score: Optional[float]) -> str:
+    """One rung up after strong answers, one down after weak ones, otherwise stay"""
+    position = LADDER_LEVELS.index(current) if current in LADDER_LEVELS else LADDER_LEVELS.index(BASE_LEVEL)
+    if score is not None and score >= LADDER_STEP_UP_AT:
+        position = min(position + 1, len(LADDER_LEVELS) - 1)
+    elif score is not None and score <= LADDER_STEP_DOWN_AT:
+        position = max(position - 1, 0)
+    return LADDER_LEVELS[position]
+
+
+def serve_question(state: Dict, q_type: str, index: int, scores: Optional[Iterable] = None) -> str:
+    """Question text to ask next, picked locally from the entry's ladder by the running score.
+
+    The served variant replaces the entry in `state["questions"]` (with its own ideal answer and a
+    "level"), so evaluation compares against the right answer. Serving the same entry again
+    returns the variant already chosen. `scores` defaults to the state's evaluations.
+    """
+    entry = state["questions"][q_type][index]
+    ladder = entry.get("ladder")
+    if "level" in entry or not ladder or not QUESTION_LADDER_ENABLED:
+        return entry["question"]
+
+    if scores is None:
+        scores = [evaluation_score(evaluation) for evaluation in state.get("evaluation", [])]
+    level = next_level(state.get("difficulty_level", BASE_LEVEL), running_score(scores))
+    variant = ladder.get(level) if level != BASE_LEVEL else None
+    if level != BASE_LEVEL and not (variant and variant.get("question")):
+        level, variant = BASE_LEVEL, None  # rung missing from the generated ladder
+    state["difficulty_level"] = level
+    served = {**entry, **(variant or {}), "level": level}
+    if variant and "bank_id" in entry:
+        served["bank_id"] = None  # a variant isn't the banked question, so keep its scores apart
+    state["questions"][q_type][index] = served
+    return state["questions"][q_type][index]["question"]
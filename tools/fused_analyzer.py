@@ -0,0 +1,158 @@
+# tools/fused_analyzer.py
+import json
+import re
+
+from tools.analyzer import ResumeJDAnalyzer, build_document_prefix
+from tools.difficulty_ladder import QUESTION_LADDER_ENABLED
+from tools.log import get_logger
+from tools.question_generator import QuestionGenerator, attach_difficulty_ladder
+from tools.skill_matcher import SKILL_MATCH_MODE, format_skill_findings, get_skill_matcher
+
+logger = get_logger("fused_analyzer")
+
+
+class FusedPhaseOneAnalyzer:
+    """Run the whole of phase 1 (fit analysis, context split, questions) in one LLM call"""
+    def __init__(self, llm, resume, job_description):
+        self.llm = llm
+        self.resume = resume
+        self.job_description = job_description
+
+    def analyze(self):
+        skills = None
+        if SKILL_MATCH_MODE == "local":
+            # Skill lists come from the local matcher; PART 1 only asks for the judgment
+            skills = get_skill_matcher().compare(self.resume, self.job_description)
+            fit_header = f"\n{format_skill_findings(skills)}\nGiven the candidate's resume, the job description and the skill comparison above"
+            fit_steps = """1. Aligned Experience
+2. Research Alignment
+3. Other Gaps (non-skill requirements such as experience level or domain)
+4. Exceeds Expectations
+5. Final Summary"""
+            fit_fields = """    "other_matching_skills": [...],
+    "other_missing_elements": [...],
+    "aligned_experience": [...],
+    "research_alignment": [...],
+    "other_gaps": [...],
+    "extra_strengths": [...],"""
+        else:
+            fit_header = "\nGiven the candidate's resume and the job description above"
+            fit_steps = """1. Matching Skills
+2. Aligned Experience
+3. Research Alignment
+4. Gaps or Missing Elements
+5. Exceeds Expectations
+6. Final Summary"""
+            fit_fields = """    "matching_skills": [...],
+    "aligned_experience": [...],
+    "research_alignment": [...],
+    "missing_elements": [...],
+    "extra_strengths": [...],"""
+
+        instructions = fit_header + """, do ALL of the following in one pass and return a single structured JSON object:
+
+---
+### 🧠 PART 1: Resume-JD Fit Analysis
+""" + fit_steps + """
+
+### 📊 PART 2: Context Split
+Split the resume into three contexts:
+1. Technical Context (relevant or slightly relevant to the job): skills, projects, relevant experience
+2. Behavioral Context: leadership, teamwork, communication
+3. Situational Context: problem solving, challenges, decision making
+
+### ❓ PART 3: Interview Questions
+Using the contexts from PART 2, generate:
+- 2 Medium level technical questions leveraging the candidate's projects, plus 1 technical question on the JD's main focused topics [such as AI, ML, DevOps, etc]
+- 1 behavioral question (STAR method, specific to their experience)
+- 1 situational question (realistic scenario testing decision making under constraints)
+
+Each question must be within 1-2 lines and include an ideal answer within a line to verify correctness.
+
+Return only the JSON object.
+
+{
+  "resume_jd_analysis": {
+""" + fit_fields + """
+    "overall_assessment": {
+      "fit": "Excellent | Good | Average | Weak",
+      "final_score": "4.5/5",
+      "recommendation": "Should this candidate be interviewed?"
+    }
+  },
+  "context_split": {
+    "technical_context": {"skills": [], "projects": [], "relevant_experience": []},
+    "behavioral_context": {"leadership": [], "teamwork": [], "communication": []},
+    "situational_context": {"problem_solving": [], "challenges": [], "decision_making": []}
+  },
+  "questions": {
+    "technical": [{"question": "Short technical question here?", "answer": "Ideal correct answer here."}],
+    "behavioral": [{"question": "Short behavioral question here?", "answer": "Ideal correct answer here."}],
+    "situational": [{"question": "Short situational question here?", "answer": "Ideal correct answer here."}]
+  }
+}
+"""
+        try:
+            logger.info("🤖 Calling LLM for fused phase-1 analysis...")
+            response = self.llm.invoke(build_document_prefix(self.resume, self.job_description) + instructions)
+            cleaned = re.sub(r"^```json|```$", "", response.strip(), flags=re.MULTILINE).strip("` \n")
+            parsed = json.loads(cleaned)
+        except json.JSONDecodeError as e:
+            logger.error("❌ Fused JSON parsing failed: %s", e)
+            return {"error": "Invalid JSON returned by LLM.", "raw_output": response, "json_error": str(e)}
+        except Exception as e:
+            logger.error("❌ Fused LLM call failed: %s", e)
+            return {"error": "LLM call failed", "exception": str(e)}
+
+        missing = [key for key in ("resume_jd_analysis", "context_split", "questions") if not isinstance(parsed.get(key), dict)]
+        if missing:
+            return {"error": f"Fused response missing sections: {missing}", "raw_output": response}
+
+        if skills is not None:
+            analysis = parsed["resume_jd_analysis"]
+            analysis.update(get_skill_matcher().merge_reported(skills, analysis))
+
+        questions = parsed["questions"]
+        for q_type in ("technical", "behavioral", "situational"):
+            type_questions = questions.get(q_type, [])
+            if isinstance(type_questions, dict):
+                type_questions = [type_questions]
+            type_questions = [q for q in type_questions if isinstance(q, dict) and q.get("question")]
+            if not type_questions:
+                return {"error": f"Fused response has no {q_type} questions", "raw_output": response}
+            questions[q_type] = type_questions
+
+        logger.info("✅ Fused phase-1 response parsed")
+        return parsed
+
+
+# LangGraph tool wrapper
+def fused_analysis_tool(state: dict) -> dict:
+    from llm import get_llm  # lazy import
+
+    logger.info("🚀 Starting fused_analysis_tool...")
+    llm = get_llm()
+    converter = ResumeJDAnalyzer(llm, state["resume_pdf"], state["jd_pdf"])
+    resume_text = converter._pdf_to_markdown(state["resume_pdf"], "resume")
+    jd_text = converter._pdf_to_markdown(state["jd_pdf"], "job_description")
+    state["resume"] = resume_text
+    state["job_description"] = jd_text
+    state["document_extraction"] = converter.conversion_reports
+
+    if "Error" in resume_text or "Error" in jd_text:
+        state["fused_error"] = "PDF conversion failed"
+        return state
+
+    result = FusedPhaseOneAnalyzer(llm, resume_text, jd_text).analyze()
+    if "error" in result:
+        # Leave phase-1 keys untouched so the step-by-step graph can take over
+        state["fused_error"] = result["error"]
+        return state
+
+    state["resume_jd_analysis"] = result["resume_jd_analysis"]
+    state["context_split"] = result["context_split"]
+    state["questions"] = result["questions"]
+    if QUESTION_LADDER_ENABLED:
+        attach_difficulty_ladder(state["questions"], jd_text, QuestionGenerator(llm))
+    state["fused_error"] = None
+    return state
@@ -1,10 +1,28 @@
+import contextvars
 import json
 from typing import TypedDict, List, Dict, Optional
 from langgraph.graph import StateGraph
-from llm import GeminiLLM
+from llm import get_llm, llm_call_context, tag_llm_calls
+from tools.batch_scoring import BATCHED_SCORING, is_pending, pending_evaluation, score_pending
+from tools.cancellation import WorkCancelled
+from tools.conversation_memory import get_conversation_memory, memory_context
+from tools.difficulty_ladder import serve_question
+from tools.interview_pacing import (
+    allow_optional_work, fits_another_question, mark_question_asked, pacing_status, record_answer_time,
+    remaining_questions, start_clock,
+)
+from tools.local_scorer import first_pass
+from tools.log import get_logger
+from tools.profiling import profiled
+from tools.results_store import get_result_store
+from tools.token_ledger import get_ledger
 import re
+
+logger = get_logger("interview")
+
 # Enhanced State Schema
 class InterviewConversationState(TypedDict):
+    session_id: str
     resume: str
     job_description: str
     questions: Dict[str, List[Dict[str, str]]]
@@ -20,28 +38,62 @@ class InterviewConversationState(TypedDict):
     current_question_type: str
     interview_phase: str
     question_indices: Dict[str, int]  # 🔹 NEW: Track index per question type
+    time_budget: float  # time-box (see tools/interview_pacing.py)
+    interview_started_at: float
+    question_asked_at: float
+    answer_seconds: List[float]
+    time_up: bool
+    difficulty_level: str  # current rung of the question ladder (see tools/difficulty_ladder.py)
 
 # -------------------------------
 # 🔹 Fixed LLM Integration
 # -------------------------------
-def call_llm(prompt: str) -> str:
-    """Fixed LLM wrapper that handles response correctly"""
+def call_llm(prompt: str, purpose: Optional[str] = None) -> str:
+    """Fixed LLM wrapper that handles response correctly (`purpose` labels the call in the token ledger)"""
     try:
-        response = GeminiLLM().invoke(prompt)
+        with llm_call_context(purpose=purpose):
+            response = get_llm().invoke(prompt)
         return response
+    except WorkCancelled:
+        raise
     except Exception as e:
         return f"Error calling LLM: {str(e)}"
 
+
+def session_budget_status(state: Dict) -> str:
+    """"ok", "degraded" (skip depth analysis and follow-ups) or "exhausted" (also score locally)"""
+    return get_ledger().budget_status(state.get("session_id"))
+
+
+def skipped_depth_analysis(reason: str) -> Dict:
+    return {"needs_followup": False, "reason": f"Skipped: {reason}", "depth_score": None}
+
+# -------------------------------
+# 🔹 Candidate Input
+# -------------------------------
+# Where answers come from: stdin for the CLI, a scripted source per session in load tests
+_answer_source = contextvars.ContextVar("answer_source", default=input)
+
+
+def set_answer_source(source):
+    """Read candidate answers from `source(prompt) -> str` in the current thread/context"""
+    return _answer_source.set(source)
+
+
+def read_candidate_input(prompt: str = "👤 You: ") -> str:
+    return _answer_source.get()(prompt)
+
 # -------------------------------
 # 🔹 Human-like Introduction
 # -------------------------------
 def introduce_interview(state: InterviewConversationState) -> InterviewConversationState:
     """Start with a warm, human-like introduction"""
+    start_clock(state)
     print("👋 Hello! Welcome to your interview today.")
     print("🤖 Interviewer: I'm excited to learn more about you and your background.")
     print("Let's start with a quick introduction. Could you tell me a bit about yourself?")
     
-    user_input = input("👤 You: ")
+    user_input = read_candidate_input()
     
     # Generate a personalized response based on their intro
     response_prompt = f"""
@@ -52,7 +104,7 @@ def introduce_interview(state: InterviewConversationState) -> InterviewConversat
     Make it 1-2 sentences max.
     """
     
-    interviewer_response = call_llm(response_prompt)
+    interviewer_response = call_llm(response_prompt, purpose="intro_reply")
     print(f"🤖 Interviewer: {interviewer_response}")
     print("\nLet's dive into some technical questions first. 🚀")
     
@@ -60,6 +112,7 @@ def introduce_interview(state: InterviewConversationState) -> InterviewConversat
         "question": "Tell me about yourself",
         "answer": user_input
     })
+    get_conversation_memory(state.get("session_id")).add_turn("Tell me about yourself", user_input)
     state["interview_phase"] = "technical"
     state["current_question_type"] = "technical"
     
@@ -90,9 +143,9 @@ def get_next_question(state: InterviewConversationState) -> Optional[str]:
     # 🔹 FIX: Use proper index tracking per type
     type_index = state.get("question_indices", {}).get(current_type, 0)
     
-    # Check if we have more questions in current type
+    # Check if we have more questions in current type (easier / harder variant by running score)
     if type_index < len(type_questions):
-        return type_questions[type_index]["question"]
+        return serve_question(state, current_type, type_index)
     
     # 🔹 FIX: Move to next question type if current is exhausted
     order = state["question_type_order"]
@@ -114,7 +167,7 @@ def get_next_question(state: InterviewConversationState) -> Optional[str]:
             # Get first question of next type
             next_questions = state["questions"].get(next_type, [])
             if next_questions:
-                return next_questions[0]["question"]
+                return serve_question(state, next_type, 0)
     except (ValueError, IndexError):
         pass
     
@@ -127,6 +180,7 @@ def generate_follow_up_question(state: InterviewConversationState) -> str:
     prompt = f"""
     You are a conversational interviewer. Based on the candidate's response, ask a follow-up question.
     
+    {memory_context(state, skip_latest=1)}
     Previous Question: {last_qa.get('question', 'N/A')}
     Candidate's Answer: {last_qa.get('answer', 'N/A')}
     
@@ -137,7 +191,7 @@ def generate_follow_up_question(state: InterviewConversationState) -> str:
     Keep it conversational. Return ONLY the question.
     """
     
-    return call_llm(prompt)
+    return call_llm(prompt, purpose="follow_up")
 
 # -------------------------------
 # 🔹 Enhanced Response Analysis
@@ -164,9 +218,11 @@ def analyze_response_depth(state: InterviewConversationState) -> Dict:
     """
     
     try:
-        raw = call_llm(prompt)
+        raw = call_llm(prompt, purpose="depth_analysis")
         cleaned_response = re.sub(r"^```json|```$", "", raw.strip(), flags=re.MULTILINE).strip("` \n")
         return json.loads(cleaned_response)
+    except WorkCancelled:
+        raise
     except:
         return {
             "needs_followup": False,
@@ -191,11 +247,13 @@ def ask_question(state: InterviewConversationState) -> InterviewConversationStat
 
     print(f"\n🤖 Interviewer: {question}")
     state["current_question"] = question
+    mark_question_asked(state)
     return state    
 
 def receive_response(state: InterviewConversationState) -> InterviewConversationState:
     """Get and store candidate response"""
-    user_input = input("👤 You: ")
+    user_input = read_candidate_input()
+    record_answer_time(state)
     state["user_response"] = user_input
     state["chat_history"].append({
         "question": state["current_question"],
@@ -211,17 +269,34 @@ def evaluate_and_decide_followup(state: InterviewConversationState) -> Interview
     # Get expected answer from questions dict based on current question type
     current_type = state.get("current_question_type", "technical")
     current_index = state["question_indices"][current_type]
-    expected_answer = state["questions"][current_type][current_index]["answer"]
+    current_entry = state["questions"][current_type][current_index]
+    expected_answer = current_entry["answer"]
+    
+    # Near the session's LLM budget: drop optional calls first, then score locally
+    budget_status = session_budget_status(state)
+    if budget_status != "ok":
+        logger.info("💸 Session LLM budget %s: skipping depth analysis and follow-ups%s",
+                    budget_status, ", scoring locally" if budget_status == "exhausted" else "")
+    
+    # Time-boxed interviews: skip optional LLM work when the remaining questions barely fit
+    pacing = pacing_status(state, questions_left=remaining_questions(state) - 1)
+    on_schedule = allow_optional_work(pacing)
+    if not on_schedule:
+        logger.info("⏱️ Behind schedule (%.0fs left, LLM ~%.1fs/call): skipping depth analysis and follow-ups",
+                    pacing["remaining"], pacing["llm_latency"])
     
     # Standard evaluation
     eval_prompt = f"""
     Evaluate this interview response:
     
+    {memory_context(state)}
     Question: {question}
     Answer: {answer}
     Expected Answer: {expected_answer}
     Job Requirements: {jd[:300]}...
     
+    Score this answer on its own merits; use the conversation only to understand references to earlier answers.
+    
     JSON Response:
     {{
         "Question": "question", 
@@ -231,10 +306,19 @@ def evaluate_and_decide_followup(state: InterviewConversationState) -> Interview
     }}
     """
     
+    # Local first pass: the LLM only scores answers the local scorer is unsure about (at the end of
+    # the interview, in one batch, in batched evaluation mode)
+    local_features, evaluation = first_pass(question, answer, expected_answer, budget_status == "exhausted")
+    if evaluation is None and BATCHED_SCORING:
+        evaluation = {**pending_evaluation(question, answer, expected_answer, current_type, current_entry.get("bank_id")),
+                      "local_score": local_features}
     try:
-        eval_raw = call_llm(eval_prompt)
-        cleaned_response = re.sub(r"^```json|```$", "", eval_raw.strip(), flags=re.MULTILINE).strip("` \n")
-        evaluation = json.loads(cleaned_response)
+        if evaluation is None:
+            eval_raw = call_llm(eval_prompt, purpose="evaluation")
+            cleaned_response = re.sub(r"^```json|```$", "", eval_raw.strip(), flags=re.MULTILINE).strip("` \n")
+            evaluation = {**json.loads(cleaned_response), "local_score": local_features}
+    except WorkCancelled:
+        raise
     except:
         evaluation = {
             "Question": question, 
@@ -244,20 +328,29 @@ def evaluate_and_decide_followup(state: InterviewConversationState) -> Interview
         }
     
     # Analyze for follow-up need (less aggressive)
-    depth_analysis = analyze_response_depth(state)
+    if budget_status != "ok":
+        depth_analysis = skipped_depth_analysis(f"session LLM budget {budget_status}")
+    elif not on_schedule:
+        depth_analysis = skipped_depth_analysis("behind interview schedule")
+    else:
+        depth_analysis = analyze_response_depth(state)
     
     # Decide on follow-up (be more selective)
     should_follow_up = (
         depth_analysis.get("needs_followup", False) and 
         state.get("current_topic_depth", 0) < 1 and  # Max 1 follow-up per question
-        depth_analysis.get("depth_score", 3) < 3  # Only if response was shallow
+        (depth_analysis.get("depth_score") or 3) < 3  # Only if response was shallow
     )
     
     state["evaluation"].append({
         **evaluation,
         "depth_analysis": depth_analysis,
-        "follow_up_generated": should_follow_up
+        "follow_up_generated": should_follow_up,
+        "difficulty": current_entry.get("level")
     })
+    if not is_pending(state["evaluation"][-1]):
+        get_result_store().append_evaluation(state, state["evaluation"][-1], current_type, current_entry.get("bank_id"))
+    get_conversation_memory(state.get("session_id")).add_turn(question, answer)
     
     if should_follow_up:
         state["follow_up_needed"] = True
@@ -271,16 +364,28 @@ def evaluate_and_decide_followup(state: InterviewConversationState) -> Interview
         state["question_indices"][current_type] += 1
         state["current_topic_depth"] = 0
         
-        # Debug print to track progress
-        print(f"📊 Debug: {current_type} question {state['question_indices'][current_type]} completed")
+        logger.debug("📊 %s question %d completed", current_type, state["question_indices"][current_type])
+        
+        if remaining_questions(state) and not fits_another_question(state):
+            state["time_up"] = True
+            print(f"\n⏱️ We're at time, so let's stop here ({remaining_questions(state)} questions left unasked).")
+            print("🤖 Interviewer: Thank you for your time, it was great learning about your experience.")
     
     return state
 
+def score_interview(state: InterviewConversationState) -> InterviewConversationState:
+    """End of the interview: score the answers left pending by batched evaluation mode"""
+    score_pending(state, state["evaluation"])
+    return state
+
 # -------------------------------
 # 🔹 Conversation Flow Conditions
 # -------------------------------
 def should_continue(state: InterviewConversationState) -> str:
     """Decide conversation flow"""
+    if state.get("time_up", False):
+        return "end"
+    
     # Check if we have follow-up pending
     if state.get("follow_up_needed", False):
         return "continue_followup"
@@ -300,10 +405,11 @@ def should_continue(state: InterviewConversationState) -> str:
 def build_interview_conversational_graph():
     graph = StateGraph(InterviewConversationState)
     
-    graph.add_node("Introduce", introduce_interview)
-    graph.add_node("Ask", ask_question)
-    graph.add_node("Respond", receive_response)
-    graph.add_node("Evaluate", evaluate_and_decide_followup)
+    graph.add_node("Introduce", profiled("Introduce")(tag_llm_calls("Introduce")(introduce_interview)))
+    graph.add_node("Ask", profiled("Ask")(tag_llm_calls("Ask")(ask_question)))
+    graph.add_node("Respond", profiled("Respond")(tag_llm_calls("Respond")(receive_response)))
+    graph.add_node("Evaluate", profiled("Evaluate")(tag_llm_calls("Evaluate")(evaluate_and_decide_followup)))
+    graph.add_node("Score", profiled("Score")(tag_llm_calls("Score")(score_interview)))
     
     graph.set_entry_point("Introduce")
     
@@ -315,8 +421,9 @@ def build_interview_conversational_graph():
     graph.add_conditional_edges("Evaluate", should_continue, {
         "continue_followup": "Ask",
         "continue_structured": "Ask", 
-        "end": "__end__"
+        "end": "Score"
     })
+    graph.add_edge("Score", "__end__")
     
     return graph.compile()
 
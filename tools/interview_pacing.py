@@ -0,0 +1,129 @@
+# tools/interview_pacing.py
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Dict
+
+from tools.batch_scoring import BATCHED_SCORING
+
+# Wall-clock budget for the interview itself, from the introduction on (seconds, 0 = no time-box)
+INTERVIEW_TIME_BUDGET = float(os.environ.get("INTERVIEW_TIME_BUDGET", "0"))
+# Assumed time a candidate takes to answer, until the session's own answers are observed
+INTERVIEW_ANSWER_SECONDS = float(os.environ.get("INTERVIEW_ANSWER_SECONDS", "90"))
+# Number of recent LLM calls the rolling latency is taken over
+LLM_LATENCY_WINDOW = int(os.environ.get("LLM_LATENCY_WINDOW", "50"))
+
+# LLM calls per step: a question costs an evaluation (none live in batched evaluation mode), a
+# follow-up adds depth analysis + generation
+QUESTION_LLM_CALLS = 0 if BATCHED_SCORING else 1
+FOLLOWUP_LLM_CALLS = 2
+
+
+class LatencyTracker:
+    """Rolling latency of recent successful LLM calls across all sessions (reflects current load)"""
+    def __init__(self, window: int = LLM_LATENCY_WINDOW):
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, entry: Dict):
+        """Usage listener"""
+        if not entry.get("error"):
+            with self._lock:
+                self._latencies.append(entry["latency"])
+
+    def rolling_latency(self, default: float = 2.0) -> float:
+        with self._lock:
+            latencies = list(self._latencies)
+        return statistics.fmean(latencies) if latencies else default
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_latency_tracker() -> LatencyTracker:
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            from llm import add_usage_listener  # lazy import
+            _tracker = LatencyTracker()
+            add_usage_listener(_tracker.record)
+        return _tracker
+
+
+# -------------------------------
+# 🔹 Session clock (kept in the interview state)
+# -------------------------------
+def start_clock(state: Dict):
+    get_latency_tracker()
+    state.setdefault("interview_started_at", time.time())
+    state.setdefault("answer_seconds", [])
+
+
+def mark_question_asked(state: Dict):
+    state["question_asked_at"] = time.time()
+
+
+def record_answer_time(state: Dict):
+    asked_at = state.pop("question_asked_at", None)
+    if asked_at is not None:
+        state.setdefault("answer_seconds", []).append(round(time.time() - asked_at, 3))
+
+
+def remaining_questions(state: Dict) -> int:
+    return sum(max(len(state.get("questions", {}).get(q_type, [])) - state.get("question_indices", {}).get(q_type, 0), 0)
+               for q_type in state.get("question_type_order", []))
+
+
+# -------------------------------
+# 🔹 Policy
+# -------------------------------
+def pacing_status(state: Dict, questions_left: int = None) -> Dict:
+    """Where the interview stands against its time budget.
+
+    Projects the remaining questions at (typical answer time + their LLM calls at the rolling
+    latency). "slack" is the time left over after that: optional work (depth analysis and
+    follow-ups) only runs while the slack covers it.
+    """
+    budget = state.get("time_budget", INTERVIEW_TIME_BUDGET)
+    if not budget or "interview_started_at" not in state:
+        return {"time_boxed": False, "status": "on_track"}
+
+    latency = get_latency_tracker().rolling_latency()
+    answers = state.get("answer_seconds") or []
+    answer_time = statistics.median(answers[-10:]) if answers else INTERVIEW_ANSWER_SECONDS
+    question_cost = answer_time + QUESTION_LLM_CALLS * latency
+    followup_cost = answer_time + FOLLOWUP_LLM_CALLS * latency
+
+    if questions_left is None:
+        questions_left = remaining_questions(state)
+    elapsed = time.time() - state["interview_started_at"]
+    remaining = budget - elapsed
+    slack = remaining - questions_left * question_cost
+
+    if remaining < question_cost:
+        status = "out_of_time"
+    elif slack < followup_cost:
+        status = "behind"
+    else:
+        status = "on_track"
+    return {
+        "time_boxed": True,
+        "status": status,
+        "elapsed": round(elapsed, 1),
+        "remaining": round(remaining, 1),
+        "slack": round(slack, 1),
+        "llm_latency": round(latency, 3),
+        "answer_time": round(answer_time, 1),
+    }
+
+
+def allow_optional_work(pacing: Dict) -> bool:
+    """Depth analysis and follow-ups only when the remaining questions still fit with room to spare"""
+    return pacing["status"] == "on_track"
+
+
+def fits_another_question(state: Dict) -> bool:
+    return pacing_status(state)["status"] != "out_of_time"
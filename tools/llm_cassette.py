@@ -0,0 +1,222 @@
+# tools/llm_cassette.py
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+
+from llm import LLMBackend, _call_tags, _track_call, record_usage
+from tools.cancellation import WorkCancelled
+from tools.log import redact
+
+# "record" appends every LLM call to the cassette, "replay" serves calls from it, "off" (default)
+LLM_CASSETTE_MODE = os.environ.get("LLM_CASSETTE_MODE", "off")
+LLM_CASSETTE = os.environ.get("LLM_CASSETTE", os.path.join(".cache", "llm_cassette.jsonl"))
+# Replay timing: "recorded" sleeps each call's recorded latency, "zero" answers at once
+LLM_CASSETTE_LATENCY = os.environ.get("LLM_CASSETTE_LATENCY", "recorded")
+# Answer a prompt the cassette lacks with a recording of the same node and purpose instead of failing
+LLM_CASSETTE_TAG_FALLBACK = os.environ.get("LLM_CASSETTE_TAG_FALLBACK", "0") == "1"
+
+
+def prompt_key(prompt: str) -> str:
+    """Identity of a prompt, insensitive to indentation and line wrapping"""
+    return hashlib.sha256(re.sub(r"\s+", " ", prompt).strip().encode("utf-8")).hexdigest()[:24]
+
+
+class CassetteRecorder:
+    """Appends one JSON line per call (prompt, response, latency, tokens, node/purpose tags).
+
+    Prompts go through the log redaction (LOG_REDACT, on by default) since replay only needs their
+    key; responses are kept verbatim and can quote the resume or JD.
+    """
+    def __init__(self, path: str = LLM_CASSETTE):
+        self.path = path
+        self.calls = 0
+        self._file = None
+        self._lock = threading.Lock()
+
+    def append(self, prompt: str, response: Optional[str], latency: float, usage: Dict, model: Optional[str],
+               error: Optional[str] = None):
+        tags = _call_tags.get()
+        line = json.dumps({
+            "key": prompt_key(prompt),
+            "node": tags.get("node"),
+            "purpose": tags.get("purpose"),
+            "latency": round(latency, 4),
+            "input_tokens": (usage or {}).get("input_tokens", 0),
+            "output_tokens": (usage or {}).get("output_tokens", 0),
+            "model": model,
+            "error": error,
+            "prompt": redact({"prompt": prompt})["prompt"],
+            "response": response,
+        }, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+            self.calls += 1
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class RecordingLLM(LLMBackend):
+    """Passes calls through to `inner` and records each one, failures included"""
+    def __init__(self, inner: LLMBackend, recorder: CassetteRecorder):
+        super().__init__()
+        self.inner = inner
+        self.recorder = recorder
+        self.model_name = getattr(inner, "model_name", None)
+
+    def _done(self, prompt: str, response: Optional[str], started: float, error: Optional[Exception] = None):
+        if isinstance(error, WorkCancelled):
+            return  # never reached the backend
+        self.last_usage = getattr(self.inner, "last_usage", {}) if error is None else {}
+        self.model_name = getattr(self.inner, "model_name", None)
+        self.recorder.append(prompt, response, time.perf_counter() - started, self.last_usage, self.model_name,
+                             f"{type(error).__name__}: {str(error)}" if error is not None else None)
+
+    def invoke(self, prompt: str):
+        started = time.perf_counter()
+        try:
+            response = self.inner.invoke(prompt)
+        except Exception as e:
+            self._done(prompt, None, started, e)
+            raise
+        self._done(prompt, response, started)
+        return response
+
+    def stream(self, prompt: str):
+        started = time.perf_counter()
+        parts = []
+        try:
+            for chunk in self.inner.stream(prompt):
+                parts.append(chunk)
+                yield chunk
+        except Exception as e:
+            self._done(prompt, None, started, e)
+            raise
+        self._done(prompt, "".join(parts), started)
+
+    async def ainvoke(self, prompt: str):
+        started = time.perf_counter()
+        try:
+            response = await self.inner.ainvoke(prompt)
+        except Exception as e:
+            self._done(prompt, None, started, e)
+            raise
+        self._done(prompt, response, started)
+        return response
+
+
+class ReplayLLM(LLMBackend):
+    """Serves calls from a recorded cassette, with the recorded latencies or none.
+
+    A prompt recorded several times is answered with its recordings in order (then the last one
+    again); each session (the session_id call tag) keeps its own position, so concurrent sessions
+    replay the same way whatever order their calls interleave in. A prompt the cassette doesn't
+    have fails, unless `tag_fallback` is set: then it gets the session's next recording made by the
+    same node for the same purpose (e.g. to replay a changed prompt template). Recorded failures are
+    replayed as failures.
+    """
+    def __init__(self, path: str = LLM_CASSETTE, latency: str = LLM_CASSETTE_LATENCY,
+                 tag_fallback: bool = LLM_CASSETTE_TAG_FALLBACK):
+        super().__init__()
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"LLM cassette {path} not found (record one with LLM_CASSETTE_MODE=record)")
+        self.path = path
+        self.latency = latency
+        self.tag_fallback = tag_fallback
+        self._by_key = defaultdict(list)
+        self._by_tag = defaultdict(list)
+        self._key_next = defaultdict(int)  # (session_id, prompt key) -> next recording
+        self._tag_next = defaultdict(int)  # (session_id, node, purpose) -> next recording
+        self._lock = threading.Lock()
+        self.stats = {"exact": 0, "by_tag": 0, "missed": 0}
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    call = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn final line of an interrupted recording
+                self._by_key[call["key"]].append(call)
+                self._by_tag[(call.get("node"), call.get("purpose"))].append(call)
+        self.recorded_calls = sum(len(calls) for calls in self._by_tag.values())
+
+    def _lookup(self, prompt: str) -> Optional[Dict]:
+        tags = _call_tags.get()
+        session_id = tags.get("session_id")
+        with self._lock:
+            key = prompt_key(prompt)
+            recordings = self._by_key.get(key)
+            if recordings:
+                self.stats["exact"] += 1
+                cursor = (session_id, key)
+                call = recordings[min(self._key_next[cursor], len(recordings) - 1)]
+                self._key_next[cursor] += 1
+                return call
+            tag = (tags.get("node"), tags.get("purpose"))
+            candidates = self._by_tag.get(tag) if self.tag_fallback else None
+            if candidates:
+                self.stats["by_tag"] += 1
+                cursor = (session_id, *tag)
+                call = candidates[self._tag_next[cursor] % len(candidates)]
+                self._tag_next[cursor] += 1
+                return call
+            self.stats["missed"] += 1
+            return None
+
+    def invoke(self, prompt: str):
+        started = time.perf_counter()
+        with _track_call(prompt):
+            call = self._lookup(prompt)
+            if call is not None and self.latency == "recorded":
+                time.sleep(call["latency"])
+        self.model_name = call.get("model") if call else None
+        if call is None or call.get("error"):
+            self._record_error(prompt, started)
+            raise RuntimeError(f"Replayed LLM failure: {call['error']}" if call else
+                               f"No cassette recording for this prompt in {self.path}"
+                               + ("" if self.tag_fallback else " (LLM_CASSETTE_TAG_FALLBACK=1 replays the same node's)"))
+        self._record({"input_tokens": call["input_tokens"], "output_tokens": call["output_tokens"]}, started)
+        return call["response"]
+
+
+_recorder = None
+_replay = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette_recorder() -> CassetteRecorder:
+    global _recorder
+    with _cassette_lock:
+        if _recorder is None:
+            _recorder = CassetteRecorder()
+        return _recorder
+
+
+def get_cassette_replay() -> ReplayLLM:
+    """The cassette is loaded once and shared by every call (each session keeps its own replay position)"""
+    global _replay
+    with _cassette_lock:
+        if _replay is None:
+            _replay = ReplayLLM()
+        return _replay
+
+
+def cassette_summary() -> Optional[Dict]:
+    """What the cassette layer did this process (None when off)"""
+    if LLM_CASSETTE_MODE == "record" and _recorder is not None:
+        return {"mode": "record", "path": _recorder.path, "recorded_calls": _recorder.calls}
+    if LLM_CASSETTE_MODE == "replay" and _replay is not None:
+        return {"mode": "replay", "path": _replay.path, "latency": _replay.latency, "tag_fallback": _replay.tag_fallback,
+                "recorded_calls": _replay.recorded_calls, **_replay.stats}
+    return None
@@ -0,0 +1,192 @@
+# tools/local_scorer.py
+import os
+import re
+import threading
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from tools.results_store import coerce_score
+
+# Score answers locally first and only call the LLM when the local score is uncertain
+LOCAL_SCORING_ENABLED = os.environ.get("LOCAL_SCORING_ENABLED", "0") == "1"
+# Minimum confidence (0-1) for a local score to stand without the LLM
+LOCAL_SCORE_CONFIDENCE = float(os.environ.get("LOCAL_SCORE_CONFIDENCE", "0.75"))
+
+# Width of the hashed n-gram vectors
+HASH_DIM = 4096
+# Answers with fewer content words than this get a confident 1
+MIN_ANSWER_WORDS = 3
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#.\-]*")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "i", "in", "is", "it", "its",
+    "of", "on", "or", "that", "the", "this", "to", "was", "we", "with", "you", "your", "would", "will",
+}
+
+
+def content_tokens(text: str) -> List[str]:
+    return [word for word in (w.rstrip(".-") for w in _WORD_RE.findall((text or "").lower()))
+            if word and word not in _STOPWORDS]
+
+
+def content_words(text: str) -> set:
+    return set(content_tokens(text))
+
+
+def hashed_ngrams(tokens: List[str]) -> np.ndarray:
+    """Log-scaled counts of word uni/bigrams and in-word character trigrams, hashed into HASH_DIM buckets"""
+    grams = list(tokens) + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    grams += [f"#{token[i:i + 3]}" for token in tokens for i in range(max(len(token) - 2, 1))]
+    vector = np.zeros(HASH_DIM)
+    if grams:
+        buckets = np.fromiter((zlib.crc32(gram.encode()) % HASH_DIM for gram in grams), dtype=np.int64, count=len(grams))
+        vector += np.bincount(buckets, minlength=HASH_DIM)
+    return np.log1p(vector)
+
+
+def cosine(a: np.ndarray, b: np.ndarray) -> float:
+    norm = np.linalg.norm(a) * np.linalg.norm(b)
+    return float(a @ b / norm) if norm else 0.0
+
+
+def term_coverage(expected: set, given: set) -> float:
+    """Share of the expected key terms present in the answer (a shared 5-letter stem counts)"""
+    if not expected:
+        return 0.0
+    stems = {word[:5] for word in given if len(word) >= 5}
+    covered = sum(1 for term in expected if term in given or (len(term) >= 5 and term[:5] in stems))
+    return covered / len(expected)
+
+
+def local_score(answer: str, expected_answer: str) -> Dict:
+    """1-5 score of an answer against the ideal answer from lexical overlap, with a 0-1 confidence.
+
+    Similarity (hashed n-gram cosine) and key-term coverage are each mapped to 0-1 and averaged.
+    Confidence is high when the two signals agree, the estimate sits near a whole score, and the
+    score is near either end of the scale; overlap can't tell a 3 from a 4 nearly as well.
+    """
+    given_tokens = content_tokens(answer)
+    expected_tokens = content_tokens(expected_answer)
+    if len(set(given_tokens)) < MIN_ANSWER_WORDS:
+        return {"score": 1, "confidence": 0.95, "similarity": 0.0, "coverage": 0.0}
+    if not expected_tokens:
+        return {"score": 3, "confidence": 0.0, "similarity": 0.0, "coverage": 0.0}
+
+    similarity = cosine(hashed_ngrams(given_tokens), hashed_ngrams(expected_tokens))
+    coverage = term_coverage(set(expected_tokens), set(given_tokens))
+    similarity_signal = min(max((similarity - 0.15) / 0.5, 0.0), 1.0)
+    coverage_signal = min(coverage * 1.5, 1.0)
+    estimate = 1 + 4 * (similarity_signal + coverage_signal) / 2
+
+    agreement = 1 - abs(similarity_signal - coverage_signal)
+    margin = 1 - 2 * abs(estimate - round(estimate))
+    extremity = abs(estimate - 3) / 2
+    confidence = agreement * (0.5 + 0.5 * margin) * (0.7 + 0.3 * extremity)
+    return {
+        "score": int(round(estimate)),
+        "confidence": round(confidence, 3),
+        "similarity": round(similarity, 3),
+        "coverage": round(coverage, 3),
+    }
+
+
+def local_evaluation(question: str, answer: str, expected_answer: str, reason: str = "LLM budget reached",
+                     features: Optional[Dict] = None) -> Dict:
+    """Evaluation without an LLM, in the same shape as the LLM's"""
+    features = features or local_score(answer, expected_answer)
+    return {
+        "Question": question,
+        "User_Answer": answer,
+        "Score": features["score"],
+        "Reasoning": (f"Scored locally ({reason}): {features['similarity']:.0%} similar to the ideal answer, "
+                      f"covers {features['coverage']:.0%} of its key terms"),
+        "scored_locally": True,
+        "local_score": features,
+    }
+
+
+# -------------------------------
+# 🔹 First pass + path stats
+# -------------------------------
+class ScoringPaths:
+    """How each answer got its score: "local" (confident first pass), "escalated" (first pass unsure,
+    LLM scored), "llm" (first pass off) or "budget" (LLM budget exhausted, scored locally regardless)"""
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, path: str):
+        with self._lock:
+            self._counts[path] += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counts = dict(self._counts)
+        total = sum(counts.values())
+        return {"total": total, "counts": counts,
+                "llm_share": round((counts.get("escalated", 0) + counts.get("llm", 0)) / total, 3) if total else None}
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+_paths = ScoringPaths()
+
+
+def get_scoring_paths() -> ScoringPaths:
+    return _paths
+
+
+def first_pass(question: str, answer: str, expected_answer: str, budget_exhausted: bool = False):
+    """Local score of an answer, and the evaluation if it can stand without the LLM.
+
+    Returns (features, evaluation); evaluation is None when the LLM should score the answer, in
+    which case the caller attaches `features` to the LLM's evaluation as a shadow score.
+    """
+    features = local_score(answer, expected_answer)
+    if budget_exhausted:
+        _paths.record("budget")
+        return features, local_evaluation(question, answer, expected_answer, features=features)
+    if not LOCAL_SCORING_ENABLED:
+        _paths.record("llm")
+        return features, None
+    if features["confidence"] >= LOCAL_SCORE_CONFIDENCE:
+        _paths.record("local")
+        return features, local_evaluation(question, answer, expected_answer,
+                                          f"confidence {features['confidence']:.2f}", features)
+    _paths.record("escalated")
+    return features, None
+
+
+def agreement(evaluations: Iterable[Dict], thresholds: Iterable[float] = (0.0, 0.5, 0.6, 0.7, 0.75, 0.8, 0.9)) -> List[Dict]:
+    """Shadow local scores against the LLM scores they were recorded with, per confidence threshold.
+
+    For each threshold: share of answers that would be scored locally, and how their local score
+    compares with the LLM's (exact match, within one point, mean absolute error).
+    """
+    pairs = []
+    for evaluation in evaluations:
+        features = evaluation.get("local_score")
+        llm_score = coerce_score(evaluation.get("Score"))
+        # Only main answers the LLM scored (a follow-up re-score covers more than the local score saw)
+        if not features or llm_score is None or evaluation.get("scored_locally") or evaluation.get("has_followup"):
+            continue
+        pairs.append((features["confidence"], features["score"], llm_score))
+
+    rows = []
+    for threshold in thresholds:
+        kept = [(local, llm) for confidence, local, llm in pairs if confidence >= threshold]
+        errors = np.array([abs(local - llm) for local, llm in kept])
+        rows.append({
+            "threshold": threshold,
+            "local_share": round(len(kept) / len(pairs), 3) if pairs else None,
+            "answers": len(kept),
+            "exact": round(float(np.mean(errors < 0.5)), 3) if kept else None,
+            "within_one": round(float(np.mean(errors <= 1)), 3) if kept else None,
+            "mae": round(float(errors.mean()), 3) if kept else None,
+        })
+    return rows
@@ -0,0 +1,139 @@
+# tools/log.py
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+# Level of the app's loggers: DEBUG adds per-turn detail and sampled payload dumps, WARNING keeps
+# only problems (load tests)
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+# "text" (the familiar console lines) or "json" (one object per line, with level, logger and fields)
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text")
+# Share of verbose payload dumps (whole analyses, states) that are actually written at DEBUG
+LOG_PAYLOAD_SAMPLE = float(os.environ.get("LOG_PAYLOAD_SAMPLE", "0.1"))
+# Replace document text (resume, JD, answers, prompts) in payloads and cap long strings and lines
+LOG_REDACT = os.environ.get("LOG_REDACT", "1") == "1"
+
+LOG_MAX_FIELD_CHARS = 200
+LOG_MAX_MESSAGE_CHARS = 2000
+# Records waiting for the writer thread; when full, new records are dropped rather than blocking
+LOG_QUEUE_SIZE = 10000
+
+ROOT_LOGGER = "interview"
+REDACTED_KEYS = {
+    "resume", "job_description", "resume_text", "jd_text", "markdown", "resume_pdf", "jd_pdf", "prompt",
+    "chat_history", "User_Answer", "user_response", "answer", "follow_up_answer",
+}
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {"ts": round(record.created, 3), "level": record.levelname, "logger": record.name,
+                 "msg": record.getMessage()}
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS})
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _RedactFilter(logging.Filter):
+    """Caps over-long lines (a stray document dump) before they are queued"""
+    def filter(self, record: logging.LogRecord) -> bool:
+        message = record.getMessage()
+        if len(message) > LOG_MAX_MESSAGE_CHARS:
+            record.msg, record.args = f"{message[:LOG_MAX_MESSAGE_CHARS]}…(+{len(message) - LOG_MAX_MESSAGE_CHARS} chars)", ()
+        return True
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the writer thread; never blocks the caller (drops when the queue is full)"""
+    dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _DroppingQueueHandler.dropped += 1
+
+
+class _ConsoleHandler(logging.StreamHandler):
+    """Writes to whatever sys.stdout is at the time (so captured / redirected stdout still works)"""
+    def emit(self, record: logging.LogRecord):
+        self.stream = sys.stdout
+        super().emit(record)
+
+
+_queue = None
+_listener = None
+_setup_lock = threading.Lock()
+
+
+def _setup():
+    global _queue, _listener
+    with _setup_lock:
+        if _listener is not None:
+            return
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(LOG_LEVEL)
+        root.propagate = False
+        _queue = queue.Queue(LOG_QUEUE_SIZE)
+        handler = _DroppingQueueHandler(_queue)
+        if LOG_REDACT:
+            handler.addFilter(_RedactFilter())
+        root.addHandler(handler)
+
+        console = _ConsoleHandler(sys.stdout)
+        console.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter("%(message)s"))
+        _listener = logging.handlers.QueueListener(_queue, console)
+        _listener.start()
+        atexit.register(_listener.stop)  # drains the queue
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Per-module logger; records are formatted by the caller only when enabled and written by a
+    background thread, so a disabled call is one level check and an enabled one never waits on stdout"""
+    _setup()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def set_log_level(level):
+    _setup()
+    logging.getLogger(ROOT_LOGGER).setLevel(level)
+
+
+def flush_logs(timeout: float = 5.0):
+    """Wait until queued records have been written (before reading captured output)"""
+    _setup()
+    deadline = time.monotonic() + timeout
+    while _queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def redact(value, depth: int = 0):
+    """Copy of a payload safe to log: document fields replaced by their size, long strings and lists cut"""
+    if depth > 6:
+        return "…"
+    if isinstance(value, dict):
+        return {key: (f"<redacted {len(str(item))} chars>" if LOG_REDACT and key in REDACTED_KEYS
+                      else redact(item, depth + 1))
+                for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        items = [redact(item, depth + 1) for item in value[:20]]
+        return items + [f"… +{len(value) - 20} more"] if len(value) > 20 else items
+    if isinstance(value, (bytes, bytearray)):
+        return f"<{len(value)} bytes>"
+    if LOG_REDACT and isinstance(value, str) and len(value) > LOG_MAX_FIELD_CHARS:
+        return f"{value[:LOG_MAX_FIELD_CHARS]}…(+{len(value) - LOG_MAX_FIELD_CHARS} chars)"
+    return value
+
+
+def log_payload(logger: logging.Logger, label: str, payload, level: int = logging.DEBUG):
+    """Dump a verbose payload, sampled (LOG_PAYLOAD_SAMPLE) and redacted; one level check when off"""
+    if not logger.isEnabledFor(level) or random.random() >= LOG_PAYLOAD_SAMPLE:
+        return
+    logger.log(level, "%s: %s", label, json.dumps(redact(payload), ensure_ascii=False, default=str))
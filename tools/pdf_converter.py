@@ -0,0 +1,176 @@
+# tools/pdf_converter.py
+import atexit
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Union
+
+import pymupdf
+import pymupdf4llm
+
+# Worker processes for page-range conversion (default: one per CPU)
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", "0")) or os.cpu_count() or 1
+# Documents shorter than this are converted in-process; pool overhead would dominate
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get("PDF_PARALLEL_MIN_PAGES", "4"))
+# "auto" = plain text unless the structure check escalates, "text" / "layout" force a tier
+PDF_EXTRACTION_TIER = os.environ.get("PDF_EXTRACTION_TIER", "auto")
+
+# Structure heuristics for escalating to layout-aware markdown
+MIN_TEXT_CHARS_PER_PAGE = 200  # less than this suggests a scanned page that needs OCR
+MIN_COLUMN_BLOCKS = 3  # text blocks needed on each side of the page centre to call it multi-column
+MAX_PLAIN_DRAWINGS = 20  # more vector paths than this usually means ruled tables
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Spawned (not forked) workers: the pool is created inside a threaded process (Streamlit script
+    threads, analysis jobs, the log writer), and a fork can copy a lock another thread holds"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+            atexit.register(_shutdown_pool)
+        return _pool
+
+
+def _shutdown_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def split_page_ranges(page_count: int, chunks: int) -> List[List[int]]:
+    """Split pages 0..page_count-1 into at most `chunks` contiguous, near-equal ranges"""
+    chunks = max(1, min(chunks, page_count))
+    size, extra = divmod(page_count, chunks)
+    ranges, start = [], 0
+    for i in range(chunks):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+
+PdfSource = Union[str, bytes, bytearray, memoryview]
+
+
+def read_pdf_source(source) -> PdfSource:
+    """Normalize a path, raw bytes or a file-like buffer (e.g. a Streamlit upload) without touching disk"""
+    if isinstance(source, (str, bytes)):
+        return source
+    if isinstance(source, (bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    if hasattr(source, "read"):
+        return source.read()
+    return os.fspath(source)
+
+
+def describe_pdf_source(source) -> str:
+    return source if isinstance(source, str) else f"<in-memory PDF, {len(source)} bytes>"
+
+
+def open_pdf(source: PdfSource) -> pymupdf.Document:
+    """Open a PDF from a path or directly from memory via PyMuPDF's stream support"""
+    if isinstance(source, str):
+        return pymupdf.open(source)
+    return pymupdf.open(stream=source, filetype="pdf")
+
+
+def _convert_pages(source: PdfSource, pages: List[int]) -> List[Dict]:
+    """Worker: convert each page of one range, timing every page"""
+    doc = open_pdf(source)
+    try:
+        results = []
+        for page in pages:
+            started = time.perf_counter()
+            markdown = pymupdf4llm.to_markdown(doc, pages=[page])
+            results.append({"page": page, "markdown": markdown, "seconds": time.perf_counter() - started})
+        return results
+    finally:
+        doc.close()
+
+
+def needs_layout(doc: pymupdf.Document) -> Optional[str]:
+    """Why a document needs the layout-aware markdown path, or None if plain text reads correctly"""
+    for page in doc:
+        number = page.number + 1
+        if len(page.get_text().strip()) < MIN_TEXT_CHARS_PER_PAGE:
+            return f"page {number}: little extractable text"
+
+        centre = page.rect.width / 2
+        blocks = [b for b in page.get_text("blocks") if b[6] == 0]
+        right = sum(1 for b in blocks if b[0] >= centre * 0.9)
+        left = sum(1 for b in blocks if b[2] <= centre * 1.1)
+        if right >= MIN_COLUMN_BLOCKS and left >= MIN_COLUMN_BLOCKS and right >= 0.2 * len(blocks):
+            return f"page {number}: multi-column layout"
+
+        if len(page.get_drawings()) > MAX_PLAIN_DRAWINGS:
+            return f"page {number}: ruled tables or graphics"
+    return None
+
+
+def _extract_text_pages(doc: pymupdf.Document) -> List[Dict]:
+    results = []
+    for page in doc:
+        started = time.perf_counter()
+        lines = [line.strip() for line in page.get_text(sort=True).splitlines()]
+        text = re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+        results.append({"page": page.number, "markdown": text + "\n\n", "seconds": time.perf_counter() - started})
+    return results
+
+
+def convert_pdf(source, tier: Optional[str] = None) -> Dict:
+    """Convert a PDF (path, bytes or buffer) to markdown with the cheapest tier that reads it correctly.
+
+    "text" is plain PyMuPDF extraction; "layout" is pymupdf4llm markdown, fanning page ranges out
+    to the process pool for long documents. In "auto" mode a quick structure check (scanned pages,
+    multiple columns, ruled tables) decides whether to escalate from text to layout.
+
+    Returns the markdown plus a report: tier used and why, per-page timings, wall time and workers.
+    Layout pages are processed one at a time, so heading levels are ranked per page rather than
+    across the whole document; the text and its order match a whole-document conversion.
+    """
+    started = time.perf_counter()
+    source = read_pdf_source(source)
+    tier = tier or PDF_EXTRACTION_TIER
+    with open_pdf(source) as doc:
+        page_count = doc.page_count
+        if tier == "layout":
+            reason = "forced"
+        else:
+            reason = needs_layout(doc) if tier == "auto" else None
+            if reason is None:
+                page_results = _extract_text_pages(doc)
+                return _build_report(page_results, "text", "forced" if tier == "text" else "simple structure", started, 1)
+
+    if page_count < PDF_PARALLEL_MIN_PAGES or PDF_WORKERS <= 1:
+        page_results = _convert_pages(source, list(range(page_count)))
+        workers = 1
+    else:
+        ranges = split_page_ranges(page_count, PDF_WORKERS)
+        futures = [_get_pool().submit(_convert_pages, source, pages) for pages in ranges]
+        page_results = [result for future in futures for result in future.result()]
+        workers = len(ranges)
+
+    return _build_report(page_results, "layout", reason, started, workers)
+
+
+def _build_report(page_results: List[Dict], tier: str, reason: str, started: float, workers: int) -> Dict:
+    page_results.sort(key=lambda r: r["page"])
+    return {
+        "markdown": "".join(r["markdown"] for r in page_results),
+        "tier": tier,
+        "tier_reason": reason,
+        "pages": [{"page": r["page"] + 1, "seconds": r["seconds"], "chars": len(r["markdown"])} for r in page_results],
+        "wall_time": time.perf_counter() - started,
+        "workers": workers,
+    }
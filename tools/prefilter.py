@@ -0,0 +1,112 @@
+# tools/prefilter.py
+import json
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from tools.question_bank import jd_hash
+
+# Longest skill phrase (in tokens) indexed as a single term, e.g. "large language models"
+MAX_NGRAM = 3
+SKILL_WEIGHTS = {"required": 1.0, "preferred": 0.5}
+
+# Keeps tech spellings like c++, c#, node.js and scikit-learn in one token
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.\-]*")
+
+
+def tokenize(text: str) -> List[str]:
+    return [token.rstrip(".-") for token in _TOKEN_RE.findall(text.lower())]
+
+
+class JDSkillExtractor:
+    """Required and preferred skills of a JD: one LLM call per JD, memoized by JD hash"""
+    _cache = {}
+    _lock = threading.Lock()
+
+    def __init__(self, llm):
+        self.llm = llm
+
+    def extract(self, jd_text: str) -> Dict[str, List[str]]:
+        key = jd_hash(jd_text)
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+
+        prompt = f"""
+        List the skills this job description asks for. Use short canonical names
+        (e.g. "PyTorch", "Kubernetes", "machine learning"), not sentences.
+
+        Job Description:
+        {jd_text}
+
+        Return only the JSON object.
+
+        {{
+            "required": [],
+            "preferred": []
+        }}
+        """
+        try:
+            response = self.llm.invoke(prompt)
+            cleaned = re.sub(r"^```json|```$", "", response.strip(), flags=re.MULTILINE).strip("` \n")
+            skills = json.loads(cleaned)
+        except json.JSONDecodeError:
+            return {"error": "Failed to parse JD skills response", "raw_output": response}
+
+        skills = {tier: [s for s in skills.get(tier, []) if isinstance(s, str)] for tier in SKILL_WEIGHTS}
+        with self._lock:
+            self._cache[key] = skills
+        return skills
+
+
+class ResumeSkillIndex:
+    """Inverted index from word n-grams to the resumes that contain them"""
+    def __init__(self):
+        self.postings = defaultdict(set)
+        self.doc_ids = []
+
+    def add(self, doc_id: str, text: str):
+        doc = len(self.doc_ids)
+        self.doc_ids.append(doc_id)
+        tokens = tokenize(text)
+        for n in range(1, MAX_NGRAM + 1):
+            for i in range(len(tokens) - n + 1):
+                self.postings[" ".join(tokens[i:i + n])].add(doc)
+
+    def _docs_with(self, skill: str) -> set:
+        tokens = tokenize(skill)
+        if not tokens:
+            return set()
+        if len(tokens) <= MAX_NGRAM:
+            return self.postings.get(" ".join(tokens), set())
+        # Longer phrases: resumes containing every word (approximate phrase match)
+        return set.intersection(*(self.postings.get(token, set()) for token in tokens))
+
+    def score(self, skills: Dict[str, List[str]]) -> List[Dict]:
+        """Weighted share of the JD's skills each resume mentions (0..1), with the matched skills"""
+        matched = [[] for _ in self.doc_ids]
+        weights = [0.0] * len(self.doc_ids)
+        total = 0.0
+        for tier, weight in SKILL_WEIGHTS.items():
+            for skill in skills.get(tier, []):
+                total += weight
+                for doc in self._docs_with(skill):
+                    weights[doc] += weight
+                    matched[doc].append(skill)
+
+        return [
+            {"resume": doc_id, "prefilter_score": round(weights[doc] / total, 3) if total else 0.0, "matched_skills": matched[doc]}
+            for doc, doc_id in enumerate(self.doc_ids)
+        ]
+
+
+def select_candidates(scored: List[Dict], top_n: Optional[int] = None, threshold: Optional[float] = None) -> List[Dict]:
+    """Rank by pre-filter score and mark who goes on to the LLM (top-N and/or above threshold)"""
+    ranked = sorted(scored, key=lambda row: row["prefilter_score"], reverse=True)
+    for rank, row in enumerate(ranked, 1):
+        row["prefilter_rank"] = rank
+        row["passed_prefilter"] = (
+            (top_n is None or rank <= top_n) and (threshold is None or row["prefilter_score"] >= threshold)
+        )
+    return ranked
@@ -0,0 +1,125 @@
+# tools/profiling.py
+import cProfile
+import functools
+import glob
+import itertools
+import json
+import os
+import random
+import threading
+import time
+import tracemalloc
+
+from tools.log import get_logger
+
+logger = get_logger("profiling")
+
+# Comma-separated node names to profile (e.g. "Analyze,Evaluate,pdf_to_markdown"), "all", or empty = off
+PROFILE_TARGETS = {name.strip() for name in os.environ.get("PROFILE_TARGETS", "").split(",") if name.strip()}
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(".cache", "profiles"))
+# Oldest profile files are deleted once the directory grows past this
+PROFILE_MAX_BYTES = int(os.environ.get("PROFILE_MAX_BYTES", str(200 * 1024 * 1024)))
+# Share of profiled invocations that also trace memory allocations (tracemalloc is costly)
+PROFILE_MEMORY_RATE = float(os.environ.get("PROFILE_MEMORY_RATE", "0.1"))
+PROFILE_MEMORY_TOP = 15
+
+_sequence = itertools.count(1)
+# tracemalloc is process-wide: only one invocation traces at a time, others skip memory
+_memory_lock = threading.Lock()
+_files_lock = threading.Lock()
+# cProfile hooks are per thread: a profiled call nested in another (e.g. pdf_to_markdown inside
+# Analyze) only records timings, so it doesn't detach the outer profiler
+_active = threading.local()
+
+
+def profiling_enabled(name: str) -> bool:
+    return "all" in PROFILE_TARGETS or name in PROFILE_TARGETS
+
+
+def _enforce_size_cap():
+    with _files_lock:
+        files = sorted(glob.glob(os.path.join(PROFILE_DIR, "*")), key=os.path.getmtime)
+        sizes = {path: os.path.getsize(path) for path in files}
+        total = sum(sizes.values())
+        for path in files:
+            if total <= PROFILE_MAX_BYTES:
+                break
+            try:
+                os.remove(path)
+                total -= sizes[path]
+            except OSError:
+                pass
+
+
+def _write_profile(name: str, profiler, meta: dict):
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        base = os.path.join(PROFILE_DIR, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_sequence)}")
+        if profiler is not None:
+            profiler.dump_stats(base + ".prof")
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        _enforce_size_cap()
+    except OSError as e:
+        logger.warning("⚠️ Could not write profile for %s: %s", name, e)
+
+
+def profiled(name: str):
+    """Wrap a graph node (or any function) with cProfile and sampled tracemalloc when PROFILE_TARGETS selects it.
+
+    Each invocation writes `<name>-<time>-<pid>-<n>.prof` (pstats format) plus a `.json` with wall
+    and CPU time and, when sampled, the peak traced memory and top allocation sites. Functions
+    that aren't selected are returned unwrapped, so profiling costs nothing when off.
+    """
+    def decorator(fn):
+        if not profiling_enabled(name):
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            profiler = None
+            if not getattr(_active, "profiling", False):
+                profiler = cProfile.Profile()
+                try:
+                    profiler.enable()
+                    _active.profiling = True
+                except ValueError:  # another profiler already active (Python 3.12+ allows only one)
+                    profiler = None
+
+            trace_memory = random.random() < PROFILE_MEMORY_RATE and _memory_lock.acquire(blocking=False)
+            if trace_memory:
+                started_tracing = not tracemalloc.is_tracing()
+                if started_tracing:
+                    tracemalloc.start(10)
+                tracemalloc.reset_peak()
+                before = tracemalloc.take_snapshot()
+
+            wall_started, cpu_started = time.perf_counter(), time.thread_time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                meta = {
+                    "name": name,
+                    "wall_time": time.perf_counter() - wall_started,
+                    "thread_cpu_time": time.thread_time() - cpu_started,
+                    "profiled": profiler is not None,
+                }
+                if profiler is not None:
+                    profiler.disable()
+                    _active.profiling = False
+                if trace_memory:
+                    try:
+                        meta["peak_traced_bytes"] = tracemalloc.get_traced_memory()[1]
+                        diff = tracemalloc.take_snapshot().compare_to(before, "lineno")
+                        meta["top_allocations"] = [
+                            {"site": str(stat.traceback[0]), "size_diff": stat.size_diff, "count_diff": stat.count_diff}
+                            for stat in diff[:PROFILE_MEMORY_TOP]
+                        ]
+                    finally:
+                        if started_tracing:
+                            tracemalloc.stop()
+                        _memory_lock.release()
+                _write_profile(name, profiler, meta)
+
+        return wrapper
+    return decorator
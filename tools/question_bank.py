@@ -0,0 +1,180 @@
+# tools/question_bank.py
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+from typing import Dict, List, Optional
+
+from tools.log import get_logger
+
+logger = get_logger("question_bank")
+
+QUESTION_BANK_DIR = os.environ.get("QUESTION_BANK_DIR", os.path.join(".cache", "question_banks"))
+QUESTION_BANK_ENABLED = os.environ.get("QUESTION_BANK_ENABLED", "1") == "1"
+
+# Skill questions served per interview from the bank; when all of them are banked the technical
+# generation call is skipped
+BANKED_SKILLS_PER_INTERVIEW = int(os.environ.get("BANKED_SKILLS_PER_INTERVIEW", "2"))
+# Estimated Jaccard similarity at or above which two questions on the same skill count as the same question
+NEAR_DUPLICATE_THRESHOLD = 0.85
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def normalize_text(text: str) -> str:
+    return re.sub(r"\s+", " ", re.sub(r"[^a-z0-9 ]", " ", text.lower())).strip()
+
+
+def shingles(text: str, k: int = 5) -> set:
+    """Character k-shingles of the normalized text (robust to small rewordings)"""
+    normalized = normalize_text(text)
+    if len(normalized) <= k:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + k] for i in range(len(normalized) - k + 1)}
+
+
+class MinHasher:
+    """MinHash signatures over shingle sets (universal hashing, fixed seed so signatures persist)"""
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.permutations = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, text: str) -> List[int]:
+        hashes = [
+            int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+            for s in shingles(text)
+        ]
+        if not hashes:
+            return [_MAX_HASH] * len(self.permutations)
+        return [min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes) for a, b in self.permutations]
+
+    @staticmethod
+    def similarity(sig_a: List[int], sig_b: List[int]) -> float:
+        """Estimated Jaccard similarity of the two shingle sets"""
+        if not sig_a or len(sig_a) != len(sig_b):
+            return 0.0
+        return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+_hasher = MinHasher()
+
+
+def jd_hash(job_description: str) -> str:
+    return hashlib.sha256(normalize_text(job_description).encode("utf-8")).hexdigest()
+
+
+class QuestionBank:
+    """Technical questions on the JD's skills (never candidate-specific ones), keyed by skill and
+    persisted as JSON per JD"""
+    def __init__(self, key: str, bank_dir: str = QUESTION_BANK_DIR):
+        self.key = key
+        self.path = os.path.join(bank_dir, f"{key}.json")
+        self._lock = threading.Lock()
+        self.stats = {"reused": 0, "added": 0, "near_duplicates": 0}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f).get("entries", [])
+        except (OSError, json.JSONDecodeError):
+            entries = []
+        # Banks written before questions were scoped to skills may hold candidate-specific entries
+        self.entries = [e for e in entries if e.get("skill") and e.get("type") == "technical"]
+
+    def lookup(self, skill: str) -> Optional[Dict]:
+        """Least-used stored question for this skill, if any"""
+        skill = normalize_text(skill)
+        with self._lock:
+            candidates = [e for e in self.entries if e["skill"] == skill]
+            if not candidates:
+                return None
+            entry = min(candidates, key=lambda e: e["uses"])
+            entry["uses"] += 1
+            self.stats["reused"] += 1
+        self._save()
+        return {"question": entry["question"], "answer": entry["answer"], "bank_id": entry["id"]}
+
+    def find_near_duplicate(self, question: str, skill: str) -> Optional[Dict]:
+        signature = _hasher.signature(question)
+        skill = normalize_text(skill)
+        with self._lock:
+            best, best_score = None, 0.0
+            for entry in self.entries:
+                if entry["skill"] != skill:
+                    continue
+                score = MinHasher.similarity(signature, entry["signature"])
+                if score > best_score:
+                    best, best_score = entry, score
+        return best if best_score >= NEAR_DUPLICATE_THRESHOLD else None
+
+    def add_or_reuse(self, question: Dict, skill: str) -> Dict:
+        """Store a freshly generated question on `skill`, or swap it for its stored near-duplicate
+        on the same skill so every candidate for this JD is scored against the same question and answer"""
+        if not isinstance(question, dict) or not question.get("question") or not normalize_text(skill):
+            return question
+
+        duplicate = self.find_near_duplicate(question["question"], skill)
+        with self._lock:
+            if duplicate is not None:
+                duplicate["uses"] += 1
+                self.stats["near_duplicates"] += 1
+                result = {"question": duplicate["question"], "answer": duplicate["answer"], "bank_id": duplicate["id"]}
+            else:
+                entry = {
+                    "id": f"technical-{len(self.entries) + 1}",
+                    "skill": normalize_text(skill),
+                    "type": "technical",
+                    "question": question["question"],
+                    "answer": question.get("answer", ""),
+                    "signature": _hasher.signature(question["question"]),
+                    "uses": 1,
+                }
+                self.entries.append(entry)
+                self.stats["added"] += 1
+                result = {"question": entry["question"], "answer": entry["answer"], "bank_id": entry["id"]}
+        self._save()
+        return result
+
+    def _save(self):
+        with self._lock:
+            payload = {"jd_hash": self.key, "entries": list(self.entries)}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("⚠️ Could not persist question bank %s: %s", self.key[:12], e)
+
+
+_banks = {}
+_banks_lock = threading.Lock()
+
+
+def get_question_bank(job_description: str) -> QuestionBank:
+    key = jd_hash(job_description)
+    with _banks_lock:
+        if key not in _banks:
+            _banks[key] = QuestionBank(key)
+        return _banks[key]
+
+
+def pick_common_skills(candidate_skills: List, job_description: str,
+                       limit: int = BANKED_SKILLS_PER_INTERVIEW) -> List[str]:
+    """Up to `limit` distinct candidate skills that the JD also mentions (the bankable, non-personal part)"""
+    jd_text = f" {normalize_text(job_description)} "
+    picked = []
+    if limit <= 0:
+        return picked
+    for skill in candidate_skills:
+        normalized = normalize_text(skill) if isinstance(skill, str) else ""
+        if normalized and f" {normalized} " in jd_text and normalized not in map(normalize_text, picked):
+            picked.append(skill)
+            if len(picked) == limit:
+                break
+    return picked
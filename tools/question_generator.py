@@ -1,6 +1,15 @@
 import re
 import json
-from typing import Dict, List
+from typing import Dict, List, Tuple
+
+from tools.difficulty_ladder import QUESTION_LADDER_ENABLED
+from tools.log import get_logger
+from tools.question_bank import (
+    BANKED_SKILLS_PER_INTERVIEW, QUESTION_BANK_ENABLED, get_question_bank, pick_common_skills,
+)
+
+logger = get_logger("question_generator")
+
 
 class QuestionGenerator:
     def __init__(self, llm):
@@ -49,6 +58,34 @@ class QuestionGenerator:
                 "raw_output": response  
             }
 
+    def generate_skill_question(self, skill: str, difficulty_level: str = "intermediate", jd_text: str = "") -> Dict:
+        """Generate a reusable technical question on one skill the job requires (not candidate-specific)"""
+        prompt = f"""
+        You are a technical interviewer for the job description below.
+
+        Generate 1 {difficulty_level} level technical interview question on the skill "{skill}" as this role uses it.
+        Do not reference any particular candidate's projects; the question will be asked to every candidate for this job.
+
+        Job Description:
+        {jd_text}
+
+        Make sure the question is with in 1-2 lines and inculde an ideal answer within a line to verify correctness.
+
+        Return a JSON object with question and answer structured as follows
+        {{
+            "question": "Short technical question here?",
+            "answer": "Ideal correct answer here.",
+        }}
+        """
+        try:
+            response = self.llm.invoke(prompt)
+            cleaned_response = re.sub(r"^```json|```$", "", response.strip(), flags=re.MULTILINE).strip("` \n")
+            return json.loads(cleaned_response)
+        except json.JSONDecodeError:
+            return {
+                "error": "Failed to parse skill question response",
+                "raw_output": response
+            }
 
     def generate_behavioral_questions(self, behavioral_context: dict) -> List[Dict]:
         """Generate behavioral interview questions"""
@@ -123,10 +160,49 @@ class QuestionGenerator:
                 "raw_output": response
             }
 
+    def generate_difficulty_ladder(self, questions: Dict[str, List[Dict]], jd_text: str = "") -> Dict:
+        """One batched call: an easier and a harder variant of every question, each with an ideal answer"""
+        numbered = [{"type": q_type, "index": i, "question": q.get("question"), "answer": q.get("answer")}
+                    for q_type, type_questions in questions.items() for i, q in enumerate(type_questions)]
+        prompt = f"""
+        You are preparing an adaptive interview for the job description below. For EACH question listed,
+        write one EASIER variant (more fundamental, for a struggling candidate) and one HARDER variant
+        (deeper or more senior, for a strong candidate) on the same topic and of the same type.
+
+        Job Description:
+        {jd_text[:1500]}
+
+        Questions:
+        {json.dumps(numbered, ensure_ascii=False, indent=2)}
+
+        Make sure each question is with in 1-2 lines and inculde an ideal answer within a line to verify correctness.
+
+        Return a JSON object structured as follows, with one entry per question above
+        {{
+            "variants": [
+                {{
+                    "type": "technical",
+                    "index": 0,
+                    "easier": {{"question": "Easier question here?", "answer": "Ideal answer here."}},
+                    "harder": {{"question": "Harder question here?", "answer": "Ideal answer here."}}
+                }}
+            ]
+        }}
+        """
+        try:
+            response = self.llm.invoke(prompt)
+            cleaned_response = re.sub(r"^```json|```$", "", response.strip(), flags=re.MULTILINE).strip("` \n")
+            return json.loads(cleaned_response)
+        except json.JSONDecodeError:
+            return {
+                "error": "Failed to parse difficulty ladder response",
+                "raw_output": response
+            }
+
 
 
 def generate_questions_tool(state: dict) -> dict:
-    from llm import GeminiLLM  # lazy import
+    from llm import get_llm  # lazy import
     """
     Tool function to generate interview questions from context_split
     and append them to the state dict.
@@ -137,16 +213,76 @@ def generate_questions_tool(state: dict) -> dict:
     
     jd_text = state["job_description"]
     context = state["context_split"]
-    generator = QuestionGenerator(GeminiLLM())
+    generator = QuestionGenerator(get_llm())
 
-    technical_q = generator.generate_technical_questions(context["technical_context"], "Medium", jd_text)
+    banked_q, full_hit = banked_skill_questions(context, jd_text, generator) if QUESTION_BANK_ENABLED else ([], False)
+    technical_q = [] if full_hit else generator.generate_technical_questions(context["technical_context"], "Medium", jd_text)
     behavioral_q = generator.generate_behavioral_questions(context["behavioral_context"])
     situational_q = generator.generate_situational_questions(context["situational_context"])
 
     state["questions"] = {
-        "technical": [technical_q] if not isinstance(technical_q, list) else technical_q,
+        "technical": banked_q + ([technical_q] if not isinstance(technical_q, list) else technical_q),
         "behavioral": [behavioral_q] if not isinstance(behavioral_q, list) else behavioral_q,
         "situational": [situational_q] if not isinstance(situational_q, list) else situational_q,
     }
 
+    if QUESTION_LADDER_ENABLED:
+        attach_difficulty_ladder(state["questions"], jd_text, generator)
+
     return state
+
+
+def banked_skill_questions(context: dict, jd_text: str, generator: QuestionGenerator) -> Tuple[List[Dict], bool]:
+    """Technical questions on skills both the candidate and the JD mention, shared across candidates.
+
+    Each skill's question is served from the JD's bank, or generated from the skill and JD alone
+    (nothing from the resume) and banked for the next candidate. Candidate-specific questions are
+    never banked. Returns the questions and whether the bank covered all BANKED_SKILLS_PER_INTERVIEW
+    skills, in which case the candidate-specific technical call is skipped.
+    """
+    bank = get_question_bank(jd_text)
+    skills = pick_common_skills(context.get("technical_context", {}).get("skills", []), jd_text,
+                                limit=BANKED_SKILLS_PER_INTERVIEW)
+    # Set back to False below as soon as a skill has to be generated
+    full_hit = bool(skills) and len(skills) == BANKED_SKILLS_PER_INTERVIEW
+    questions = []
+    for skill in skills:
+        skill_q = bank.lookup(skill)
+        if skill_q is None:
+            full_hit = False
+            generated = generator.generate_skill_question(skill, "Medium", jd_text)
+            if "error" in generated:
+                continue
+            skill_q = bank.add_or_reuse(generated, skill)
+        if all(q["question"] != skill_q["question"] for q in questions):
+            questions.append(skill_q)
+    if skills:
+        logger.info("🏦 Question bank %s: %s%s", bank.key[:12], bank.stats,
+                    ", skipping the technical call" if full_hit else "")
+    return questions, full_hit
+
+
+def attach_difficulty_ladder(questions: dict, jd_text: str, generator: QuestionGenerator):
+    """Give every question a "ladder" {"easy": {...}, "hard": {...}} for adaptive selection at interview time.
+
+    Entries are replaced, not mutated (banked questions are shared). Questions the batch
+    didn't cover, or a failed call, simply keep no ladder and are asked as generated.
+    """
+    result = generator.generate_difficulty_ladder(questions, jd_text)
+    if "error" in result:
+        logger.warning("⚠️ Difficulty ladder skipped: %s", result["error"])
+        return
+
+    attached = 0
+    for variant in result.get("variants", []):
+        try:
+            q_type, index = variant["type"], int(variant["index"])
+            entry = questions[q_type][index]
+        except (KeyError, TypeError, ValueError, IndexError):
+            continue
+        ladder = {level: variant.get(key) for level, key in (("easy", "easier"), ("hard", "harder"))
+                  if isinstance(variant.get(key), dict) and variant[key].get("question")}
+        if ladder:
+            questions[q_type][index] = {**entry, "ladder": ladder}
+            attached += 1
+    logger.info("🪜 Difficulty ladder for %d/%d questions", attached, sum(len(qs) for qs in questions.values()))
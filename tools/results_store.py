@@ -0,0 +1,226 @@
+# tools/results_store.py
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, Optional
+
+from tools.cancellation import get_cancellations
+from tools.log import get_logger
+
+logger = get_logger("results_store")
+
+RESULTS_DIR = os.environ.get("RESULTS_DIR", "results")
+# Start a new file once the current one reaches this size
+RESULTS_MAX_BYTES = int(os.environ.get("RESULTS_MAX_BYTES", str(64 * 1024 * 1024)))
+# fsync after this many records or this many seconds, whichever comes first
+RESULTS_FSYNC_EVERY = int(os.environ.get("RESULTS_FSYNC_EVERY", "32"))
+RESULTS_FSYNC_INTERVAL = float(os.environ.get("RESULTS_FSYNC_INTERVAL", "2.0"))
+
+# fsyncs run here, off the interview / request thread that appended the record
+_fsync_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="results-fsync")
+
+
+def _fsync(fd: int):
+    try:
+        os.fsync(fd)
+    except OSError as e:
+        logger.warning("⚠️ Could not fsync the result store: %s", e)
+    finally:
+        os.close(fd)
+
+
+def _fsync_in_background(fd: int):
+    try:
+        _fsync_executor.submit(_fsync, fd)
+    except RuntimeError:  # interpreter shutting down
+        _fsync(fd)
+
+
+def jd_title(job_description: str) -> str:
+    """First non-empty line of the JD, stripped of markdown, as a human-readable label"""
+    for line in job_description.splitlines():
+        line = line.strip().strip("#*_ ").strip()
+        if line:
+            return line[:80]
+    return "Untitled JD"
+
+
+def coerce_score(value) -> Optional[float]:
+    """Numeric score from an LLM value like 4, "4", "4/5" (None when missing or unparseable)"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).split("/")[0])
+    except (ValueError, IndexError):
+        return None
+
+
+class ResultStore:
+    """Append-only, rotating JSONL sink for analyses and per-question evaluations.
+
+    One compact JSON record per line; appends from any thread share one buffered handle and are
+    fsynced in batches on a background thread, never under the lock. Readers stream files line by line, so queries never load the whole store.
+    """
+    def __init__(self, directory: str = RESULTS_DIR, max_bytes: int = RESULTS_MAX_BYTES,
+                 fsync_every: int = RESULTS_FSYNC_EVERY, fsync_interval: float = RESULTS_FSYNC_INTERVAL):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._file = None
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def _segment_paths(self):
+        return sorted(glob.glob(os.path.join(self.directory, "results-*.jsonl")))
+
+    def _open_segment(self):
+        os.makedirs(self.directory, exist_ok=True)
+        segments = self._segment_paths()
+        if segments and os.path.getsize(segments[-1]) < self.max_bytes:
+            path = segments[-1]
+        else:
+            number = int(os.path.basename(segments[-1])[8:13]) + 1 if segments else 1
+            path = os.path.join(self.directory, f"results-{number:05d}.jsonl")
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _start_sync(self) -> int:
+        """Caller holds self._lock. Hands the buffered records to the OS and returns a duplicate of
+        the segment's descriptor to fsync outside the lock (so the handle can rotate or close meanwhile)"""
+        self._file.flush()
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        return os.dup(self._file.fileno())
+
+    def append(self, kind: str, record: Dict):
+        line = json.dumps({"kind": kind, "ts": time.time(), **record}, ensure_ascii=False,
+                          separators=(",", ":"), default=str) + "\n"
+        fd = None
+        with self._lock:
+            if self._file is None:
+                self._open_segment()
+            self._file.write(line)
+            self._pending += 1
+            if self._file.tell() >= self.max_bytes:
+                fd = self._start_sync()
+                self._file.close()
+                self._file = None
+            elif self._pending >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                fd = self._start_sync()
+        if fd is not None:
+            _fsync_in_background(fd)
+
+    def flush(self):
+        """Make appended records visible to readers (the fsync follows in the background)"""
+        fd = None
+        with self._lock:
+            if self._file is not None and self._pending:
+                fd = self._start_sync()
+        if fd is not None:
+            _fsync_in_background(fd)
+
+    def close(self):
+        fd = None
+        with self._lock:
+            if self._file is not None:
+                fd = self._start_sync()
+                self._file.close()
+                self._file = None
+        if fd is not None:
+            _fsync(fd)
+
+    def iter_records(self, kind: Optional[str] = None, **filters) -> Iterator[Dict]:
+        """Stream records (oldest first), optionally filtered by kind and exact field values"""
+        self.flush()
+        for path in self._segment_paths():
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn final line after a crash
+                    if kind is not None and record.get("kind") != kind:
+                        continue
+                    if all(record.get(key) == value for key, value in filters.items()):
+                        yield record
+
+    # -------------------------------
+    # 🔹 Record shapes (bulky payload last, so readers can skip it; see tools/analytics.py)
+    # -------------------------------
+    def append_analysis(self, state: Dict):
+        from tools.analyzer import parse_final_score
+        from tools.question_bank import jd_hash
+
+        analysis = state.get("resume_jd_analysis", {})
+        self.append("analysis", {
+            "session_id": state.get("session_id"),
+            "jd_hash": jd_hash(state.get("job_description", "")),
+            "jd_title": jd_title(state.get("job_description", "")),
+            "fit": analysis.get("overall_assessment", {}).get("fit"),
+            "final_score": parse_final_score(analysis.get("overall_assessment", {}).get("final_score")),
+            "question_counts": {q_type: len(qs) for q_type, qs in state.get("questions", {}).items()},
+            "resume_jd_analysis": analysis,
+        })
+
+    def append_evaluation(self, state: Dict, evaluation: Dict, question_type: str, bank_id: Optional[str] = None):
+        """Skipped for cancelled sessions (reset or abandoned), whose scores may be fallbacks"""
+        from tools.question_bank import jd_hash
+
+        if get_cancellations().is_cancelled(state.get("session_id")):
+            return
+        self.append("evaluation", {
+            "session_id": state.get("session_id"),
+            "jd_hash": jd_hash(state.get("job_description", "")),
+            "question_type": question_type,
+            "bank_id": bank_id,
+            "score": coerce_score(evaluation.get("Score")),
+            "has_followup": bool(evaluation.get("has_followup") or evaluation.get("follow_up_generated")),
+            "evaluation": evaluation,
+        })
+
+    def append_ledger(self, state: Dict, summary: Dict):
+        """End-of-session LLM usage: totals, budget outcome and the per-node breakdown"""
+        from tools.question_bank import jd_hash
+
+        self.append("ledger", {
+            "session_id": summary.get("session_id"),
+            "jd_hash": jd_hash(state.get("job_description", "")),
+            **{key: summary.get(key) for key in ("calls", "errors", "input_tokens", "output_tokens",
+                                                 "reasoning_tokens", "cost_usd", "budget_used", "status")},
+            "by_node": summary.get("by_node", {}),
+        })
+
+    def append_screening(self, job_description: str, row: Dict):
+        """One bulk-screening outcome: pre-filter score next to the LLM fit result (None if filtered out
+        or failed; conversion and analysis failures carry their error)"""
+        from tools.question_bank import jd_hash
+
+        self.append("screening", {
+            "jd_hash": jd_hash(job_description),
+            "jd_title": jd_title(job_description),
+            "resume": row.get("resume"),
+            "prefilter_score": row.get("prefilter_score"),
+            "prefilter_rank": row.get("prefilter_rank"),
+            "passed_prefilter": row.get("passed_prefilter"),
+            "final_score": row.get("final_score"),
+            "error": row.get("error"),
+            "resume_jd_analysis": row.get("analysis") or {},
+        })
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_result_store() -> ResultStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResultStore()
+            atexit.register(_store.close)
+        return _store
@@ -0,0 +1,211 @@
+# tools/resume_extractor.py
+import copy
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from tools.log import get_logger
+
+logger = get_logger("resume_extractor")
+
+# On-disk home of cached resume extractions (one JSON file per resume hash)
+RESUME_CACHE_DIR = os.environ.get("RESUME_CACHE_DIR", os.path.join(".cache", "resume_extractions"))
+# Extractions also kept in memory (least recently used dropped first; the disk copy stays)
+RESUME_CACHE_MAX_ENTRIES = int(os.environ.get("RESUME_CACHE_MAX_ENTRIES", "256"))
+
+
+def resume_hash(resume_text: str) -> str:
+    return hashlib.sha256(resume_text.encode("utf-8")).hexdigest()
+
+
+def _parse_json(response: str) -> dict:
+    cleaned = re.sub(r"^```json|```$", "", response.strip(), flags=re.MULTILINE).strip("` \n")
+    return json.loads(cleaned)
+
+
+class ResumeExtractionStore:
+    """Resume extractions keyed by resume hash, kept in a bounded in-memory LRU and mirrored to disk.
+
+    Callers get their own copy of an extraction, so mutating one can't change what later
+    matches for that resume are built from.
+    """
+    def __init__(self, cache_dir: str = RESUME_CACHE_DIR, max_entries: int = RESUME_CACHE_MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _remember(self, key: str, extraction: dict):
+        """Caller holds self._lock"""
+        self._memory[key] = extraction
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> dict:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats["hits"] += 1
+                return copy.deepcopy(self._memory[key])
+
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                extraction = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+
+        with self._lock:
+            self._remember(key, extraction)
+            self.stats["hits"] += 1
+        return copy.deepcopy(extraction)
+
+    def put(self, key: str, extraction: dict):
+        with self._lock:
+            self._remember(key, copy.deepcopy(extraction))
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(extraction, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.warning("⚠️ Could not persist resume extraction %s: %s", key[:12], e)
+
+
+_store = None
+
+
+def get_extraction_store() -> ResumeExtractionStore:
+    global _store
+    if _store is None:
+        _store = ResumeExtractionStore()
+    return _store
+
+
+class ResumeExtractor:
+    """JD-independent extraction of everything phase 1 needs from a resume"""
+    def __init__(self, llm, store: ResumeExtractionStore = None):
+        self.llm = llm
+        self.store = store or get_extraction_store()
+
+    def extract(self, resume_text: str) -> dict:
+        key = resume_hash(resume_text)
+        cached = self.store.get(key)
+        if cached is not None:
+            logger.info("♻️ Reusing resume extraction %s", key[:12])
+            return cached
+
+        prompt = f"""
+        You are an expert AI hiring assistant.
+
+        Extract the candidate's background from the resume below, independent of any particular job.
+        Keep every technical item; do not filter for relevance.
+
+        Resume:
+        {resume_text}
+
+        Return a JSON object structured as follows:
+
+        {{
+            "technical_context": {{
+                "skills": [],
+                "projects": [],
+                "relevant_experience": []
+            }},
+            "behavioral_context": {{
+                "leadership": [],
+                "teamwork": [],
+                "communication": []
+            }},
+            "situational_context": {{
+                "problem_solving": [],
+                "challenges": [],
+                "decision_making": []
+            }}
+        }}
+        """
+        try:
+            response = self.llm.invoke(prompt)
+            extraction = _parse_json(response)
+        except json.JSONDecodeError:
+            return {
+                "error": "Failed to parse resume extraction response",
+                "raw_output": response
+            }
+
+        self.store.put(key, extraction)
+        return extraction
+
+
+class JDRelevancePass:
+    """Cheap per-JD pass over a cached extraction: filters the technical context and scores fit"""
+    def __init__(self, llm):
+        self.llm = llm
+
+    def run(self, extraction: dict, job_description: str) -> dict:
+        technical = extraction.get("technical_context", {})
+        prompt = f"""
+        You are an expert AI hiring assistant.
+
+        Candidate's technical background (already extracted from the resume):
+        {json.dumps(technical, ensure_ascii=False)}
+
+        Job Description:
+        {job_description}
+
+        1. Keep only the skills, projects and experience that are relevant or slightly relevant to the job description.
+        2. List the matching skills and the job requirements the candidate is missing.
+        3. Give an overall fit assessment.
+
+        Return only the JSON object.
+
+        {{
+            "technical_context": {{
+                "skills": [],
+                "projects": [],
+                "relevant_experience": []
+            }},
+            "matching_skills": [],
+            "missing_elements": [],
+            "overall_assessment": {{
+                "fit": "Excellent | Good | Average | Weak",
+                "final_score": "4.5/5",
+                "recommendation": "Should this candidate be interviewed?"
+            }}
+        }}
+        """
+        try:
+            response = self.llm.invoke(prompt)
+            return _parse_json(response)
+        except json.JSONDecodeError:
+            return {
+                "error": "Failed to parse JD relevance response",
+                "raw_output": response
+            }
+
+
+def split_context_with_extraction(llm, resume_text: str, job_description: str) -> dict:
+    """Context split built from the cached resume extraction plus a JD-relevance pass"""
+    extraction = ResumeExtractor(llm).extract(resume_text)
+    if "error" in extraction:
+        return extraction
+
+    relevance = JDRelevancePass(llm).run(extraction, job_description)
+    if "error" in relevance:
+        return relevance
+
+    return {
+        "technical_context": relevance.get("technical_context", extraction.get("technical_context", {})),
+        "behavioral_context": extraction.get("behavioral_context", {}),
+        "situational_context": extraction.get("situational_context", {}),
+    }
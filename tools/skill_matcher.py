@@ -0,0 +1,259 @@
+# tools/skill_matcher.py
+import json
+import os
+import re
+from collections import deque
+from typing import Dict, List
+
+from tools.log import get_logger
+
+logger = get_logger("skill_matcher")
+
+# "local" = skill lists computed here and left out of the LLM prompt, "llm" = the LLM lists them
+SKILL_MATCH_MODE = os.environ.get("SKILL_MATCH_MODE", "local")
+# Optional JSON file {"Canonical Skill": ["alias", ...]} merged over the built-in dictionary
+SKILL_DICTIONARY = os.environ.get("SKILL_DICTIONARY", "")
+
+# Canonical skill name -> aliases (matched case-insensitively, on word boundaries; the canonical
+# name itself only matches if listed).
+# Deliberately omits ambiguous single words ("go", "r", "c", "swift", "rest", "tf") that read as plain
+# English; the useful ones among them are in CONTEXT_ALIASES instead.
+SKILL_ALIASES = {
+    # Languages
+    "Python": ["python", "python3"],
+    "Java": ["java"],
+    "JavaScript": ["javascript", "js", "ecmascript"],
+    "TypeScript": ["typescript"],
+    "C++": ["c++", "cpp"],
+    "C#": ["c#", "csharp", ".net", "dotnet"],
+    "Go": ["golang"],
+    "Rust": ["rust"],
+    "Kotlin": ["kotlin"],
+    "Scala": ["scala"],
+    "MATLAB": ["matlab"],
+    "SQL": ["sql", "mysql", "postgresql", "postgres", "sqlite"],
+    "Bash": ["bash", "shell scripting"],
+    "HTML": ["html", "html5"],
+    "CSS": ["css", "css3", "tailwind", "tailwind css"],
+    # ML / AI
+    "Machine Learning": ["machine learning", "ml"],
+    "Deep Learning": ["deep learning", "neural networks", "neural network"],
+    "Artificial Intelligence": ["artificial intelligence", "ai"],
+    "Generative AI": ["generative ai", "genai", "gen ai"],
+    "Large Language Models": ["large language models", "large language model", "llm", "llms"],
+    "NLP": ["nlp", "natural language processing"],
+    "Computer Vision": ["computer vision", "image processing", "medical imaging"],
+    "MLOps": ["mlops", "machine learning operations"],
+    "RAG": ["rag", "retrieval augmented generation", "retrieval-augmented generation", "graph rag"],
+    "AI Agents": ["ai agents", "ai agent", "multi-agent", "multi agent", "agentic"],
+    "PyTorch": ["pytorch"],
+    "TensorFlow": ["tensorflow", "keras"],
+    "scikit-learn": ["scikit-learn", "scikit learn", "sklearn"],
+    "Hugging Face": ["hugging face", "huggingface"],
+    "LangChain": ["langchain"],
+    "LangGraph": ["langgraph"],
+    "Pandas": ["pandas"],
+    "NumPy": ["numpy"],
+    "OCR": ["ocr", "optical character recognition"],
+    "Predictive Analytics": ["predictive analytics", "predictive modeling", "predictive modelling"],
+    "Fraud Detection": ["fraud detection"],
+    # Web / app frameworks
+    "React": ["react.js", "reactjs"],
+    "React Native": ["react native"],
+    "Node.js": ["node.js", "nodejs"],
+    "Express.js": ["express.js", "expressjs"],
+    "Angular": ["angular", "angularjs"],
+    "Vue": ["vue", "vue.js", "vuejs"],
+    "Django": ["django"],
+    "Flask": ["flask"],
+    "FastAPI": ["fastapi"],
+    "Spring Boot": ["spring boot", "springboot"],
+    "REST APIs": ["rest api", "rest apis", "restful"],
+    "GraphQL": ["graphql"],
+    "MERN": ["mern", "mern stack"],
+    # Data / infra / tools
+    "MongoDB": ["mongodb", "mongo"],
+    "Redis": ["redis"],
+    "Firebase": ["firebase"],
+    "Spark": ["pyspark", "apache spark"],
+    "Kafka": ["kafka", "apache kafka"],
+    "Docker": ["docker", "containerization"],
+    "Kubernetes": ["kubernetes", "k8s"],
+    "AWS": ["aws", "amazon web services"],
+    "Google Cloud": ["google cloud", "gcp", "google cloud platform"],
+    "Azure": ["azure", "microsoft azure"],
+    "CI/CD": ["ci/cd", "cicd", "ci cd", "continuous integration", "continuous delivery", "github actions", "jenkins"],
+    "DevOps": ["devops"],
+    "Git": ["git", "github", "gitlab"],
+    "Linux": ["linux", "unix"],
+    "Terraform": ["terraform"],
+    "Microservices": ["microservices", "microservice"],
+    "Authentication": ["authentication", "oauth", "jwt", "role-based access control", "rbac"],
+}
+
+# Aliases that are also plain English ("react to feedback", "spark interest", power "transformers"):
+# canonical skill -> (aliases, context words); an alias only counts with one of its context words
+# within CONTEXT_WINDOW characters
+CONTEXT_ALIASES = {
+    "React": (["react"], ["javascript", "typescript", "js", "jsx", "tsx", "redux", "next.js", "nextjs", "frontend",
+                          "front-end", "front end", "node.js", "nodejs", "html", "css", "hooks", "mern"]),
+    "Spark": (["spark"], ["apache", "hadoop", "databricks", "big data", "etl", "hdfs", "hive", "kafka", "scala",
+                          "dataframe", "dataframes", "data pipeline", "data pipelines", "spark sql", "mllib"]),
+    "PyTorch": (["torch"], ["python", "deep learning", "neural", "tensor", "tensors", "cuda", "gpu", "model training",
+                            "torchvision", "lightning"]),
+    "Hugging Face": (["transformers"], ["bert", "gpt", "llm", "llms", "nlp", "language model", "language models",
+                                        "fine-tuning", "fine-tuned", "fine tuning", "pytorch", "tokenizer", "tokenizers",
+                                        "embeddings", "attention"]),
+}
+CONTEXT_WINDOW = 80
+
+
+def load_skill_dictionary(path: str = SKILL_DICTIONARY) -> Dict[str, List[str]]:
+    skills = {canonical: list(aliases) for canonical, aliases in SKILL_ALIASES.items()}
+    if path:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                extra = json.load(f)
+            for canonical, aliases in extra.items():
+                skills.setdefault(canonical, []).extend(aliases)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning("⚠️ Could not load skill dictionary %s: %s", path, e)
+    return skills
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse whitespace, so multi-word aliases match across line breaks"""
+    return re.sub(r"\s+", " ", text.lower())
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: one pass over the text finds every occurrence of every pattern"""
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+    def add(self, pattern: str, value):
+        state = 0
+        for char in pattern:
+            if char not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = len(self._goto) - 1
+            state = self._goto[state][char]
+        self._output[state].append((len(pattern), value))
+
+    def build(self):
+        """Compute failure links breadth-first (call once after all patterns are added)"""
+        queue = deque(self._goto[0].values())  # depth-1 states keep failing to the root
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+        return self
+
+    def iter_matches(self, text: str):
+        """Yield (start, end, value) for every pattern occurrence in text"""
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, value in self._output[state]:
+                yield index - length + 1, index + 1, value
+
+
+def _is_boundary(text: str, start: int, end: int) -> bool:
+    before = text[start - 1] if start > 0 else " "
+    after = text[end] if end < len(text) else " "
+    return not before.isalnum() and not (after.isalnum() or after in "+#")
+
+
+def _context_pattern(words: List[str]):
+    alternatives = "|".join(re.escape(normalize_text(word).strip()) for word in words)
+    return re.compile(rf"(?<![a-z0-9])(?:{alternatives})(?![a-z0-9+#])")
+
+
+class SkillMatcher:
+    """Finds canonical skills in resume / JD markdown with one Aho-Corasick scan per document"""
+    def __init__(self, skills: Dict[str, List[str]] = None, context_aliases: Dict = None):
+        skills = skills or load_skill_dictionary()
+        context_aliases = CONTEXT_ALIASES if context_aliases is None else context_aliases
+        self._automaton = AhoCorasick()
+        self._known = set()  # normalized canonical names and aliases
+        for canonical, aliases in skills.items():
+            self._known.update(normalize_text(name).strip() for name in [canonical, *aliases])
+            for alias in set(aliases):
+                self._automaton.add(normalize_text(alias).strip(), (canonical, None))
+        for canonical, (aliases, context_words) in context_aliases.items():
+            self._known.update(normalize_text(name).strip() for name in [canonical, *aliases])
+            context = _context_pattern(context_words)
+            for alias in set(aliases):
+                self._automaton.add(normalize_text(alias).strip(), (canonical, context))
+        self._automaton.build()
+
+    def find_skills(self, text: str) -> List[str]:
+        """Canonical skills mentioned in the text, in order of first mention"""
+        text = normalize_text(text)
+        found = {}
+        for start, end, (canonical, context) in self._automaton.iter_matches(text):
+            if canonical in found or not _is_boundary(text, start, end):
+                continue
+            if context is not None and not context.search(text, max(start - CONTEXT_WINDOW, 0), end + CONTEXT_WINDOW):
+                continue
+            found[canonical] = start
+        return sorted(found, key=found.get)
+
+    def compare(self, resume_text: str, jd_text: str) -> Dict[str, List[str]]:
+        """JD skills the resume covers and the ones it lacks (both in JD order)"""
+        resume_skills = set(self.find_skills(resume_text))
+        jd_skills = self.find_skills(jd_text)
+        return {
+            "matching_skills": [skill for skill in jd_skills if skill in resume_skills],
+            "missing_elements": [skill for skill in jd_skills if skill not in resume_skills],
+        }
+
+
+    def merge_reported(self, skills: Dict[str, List[str]], analysis: Dict) -> Dict[str, List[str]]:
+        """Local skill lists plus the JD skills the LLM reported outside the dictionary.
+
+        Pops the LLM's "other_matching_skills" / "other_missing_elements" from `analysis`. For a
+        skill the dictionary knows, the local lists stand, so only unknown skills are added.
+        """
+        merged = {key: list(values) for key, values in skills.items()}
+        seen = {normalize_text(skill).strip() for values in merged.values() for skill in values}
+        for key, field in (("matching_skills", "other_matching_skills"), ("missing_elements", "other_missing_elements")):
+            reported = analysis.pop(field, None)
+            for skill in reported if isinstance(reported, list) else []:
+                normalized = normalize_text(skill).strip() if isinstance(skill, str) else ""
+                if not normalized or normalized in seen or normalized in self._known or self.find_skills(skill):
+                    continue
+                seen.add(normalized)
+                merged[key].append(skill.strip())
+        return merged
+
+
+def format_skill_findings(skills: Dict[str, List[str]]) -> str:
+    """Prompt block telling the LLM which skill lists were already computed locally"""
+    return (
+        "Skill comparison (already computed from a skill dictionary, do not repeat it in your output):\n"
+        f"- JD skills found in the resume: {', '.join(skills['matching_skills']) or 'none'}\n"
+        f"- JD skills missing from the resume: {', '.join(skills['missing_elements']) or 'none'}\n"
+        "List only JD skills this comparison doesn't mention in other_matching_skills / other_missing_elements.\n"
+    )
+
+
+_matcher = None
+
+
+def get_skill_matcher() -> SkillMatcher:
+    global _matcher
+    if _matcher is None:
+        _matcher = SkillMatcher()
+    return _matcher
@@ -0,0 +1,133 @@
+# tools/token_ledger.py
+import os
+import threading
+from typing import Dict, Optional
+
+from tools.cancellation import get_cancellations
+
+# USD per million tokens (reasoning tokens are billed as output); override for other models/tiers
+MODEL_PRICES = {
+    "gemini-2.5-flash": {"input": 0.30, "output": 2.50},
+    "gemini-2.5-pro": {"input": 1.25, "output": 10.00},
+    # OpenAI-compatible backend (LLM_BACKENDS=openai): free unless priced, e.g. for a hosted endpoint
+    os.environ.get("OPENAI_MODEL", "local-model"): {
+        "input": float(os.environ.get("OPENAI_PRICE_INPUT", "0")),
+        "output": float(os.environ.get("OPENAI_PRICE_OUTPUT", "0")),
+    },
+}
+DEFAULT_PRICE = {
+    "input": float(os.environ.get("LLM_PRICE_INPUT", "0.30")),
+    "output": float(os.environ.get("LLM_PRICE_OUTPUT", "2.50")),
+}
+
+# Per-session budgets (0 = unlimited); whichever is closer to exhausted counts
+SESSION_TOKEN_BUDGET = int(os.environ.get("SESSION_TOKEN_BUDGET", "0"))
+SESSION_COST_BUDGET = float(os.environ.get("SESSION_COST_BUDGET", "0"))
+# Share of the budget after which optional LLM work (depth analysis, follow-ups) is skipped
+SESSION_BUDGET_DEGRADE_AT = float(os.environ.get("SESSION_BUDGET_DEGRADE_AT", "0.8"))
+
+
+def call_cost(model: Optional[str], input_tokens: int, output_tokens: int) -> float:
+    price = MODEL_PRICES.get(model, DEFAULT_PRICE)
+    return (input_tokens * price["input"] + output_tokens * price["output"]) / 1_000_000
+
+
+class TokenLedger:
+    """Per-session, per-node count of LLM calls, tokens and estimated cost, with budget checks"""
+    def __init__(self, token_budget: int = SESSION_TOKEN_BUDGET, cost_budget: float = SESSION_COST_BUDGET,
+                 degrade_at: float = SESSION_BUDGET_DEGRADE_AT):
+        self.token_budget = token_budget
+        self.cost_budget = cost_budget
+        self.degrade_at = degrade_at
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def record(self, entry: Dict):
+        """Usage listener: account one recorded LLM call to its session and node"""
+        session_id = entry.get("session_id")
+        if session_id is None or get_cancellations().is_cancelled(session_id):
+            return  # a cancelled session's row is forgotten; late in-flight calls mustn't recreate it
+        node = entry.get("node", "untagged")
+        if entry.get("purpose"):
+            node = f"{node}/{entry['purpose']}"
+        cost = call_cost(entry.get("model"), entry["input_tokens"], entry["output_tokens"])
+        with self._lock:
+            nodes = self._sessions.setdefault(session_id, {})
+            row = nodes.setdefault(node, {"calls": 0, "errors": 0, "input_tokens": 0, "output_tokens": 0,
+                                          "reasoning_tokens": 0, "cost_usd": 0.0})
+            row["calls"] += 1
+            row["errors"] += int(entry.get("error", False))
+            row["input_tokens"] += entry["input_tokens"]
+            row["output_tokens"] += entry["output_tokens"]
+            row["reasoning_tokens"] += entry.get("reasoning_tokens", 0)
+            row["cost_usd"] += cost
+
+    def session_summary(self, session_id: str) -> Dict:
+        with self._lock:
+            by_node = {node: dict(row) for node, row in self._sessions.get(session_id, {}).items()}
+        totals = {key: sum(row[key] for row in by_node.values())
+                  for key in ("calls", "errors", "input_tokens", "output_tokens", "reasoning_tokens", "cost_usd")}
+        totals["cost_usd"] = round(totals["cost_usd"], 6)
+        for row in by_node.values():
+            row["cost_usd"] = round(row["cost_usd"], 6)
+        return {
+            "session_id": session_id,
+            **totals,
+            "budget_used": round(self._budget_used(totals), 3),
+            "status": self.budget_status(session_id, totals),
+            "by_node": by_node,
+        }
+
+    def _budget_used(self, totals: Dict) -> float:
+        used = 0.0
+        if self.token_budget:
+            used = max(used, (totals["input_tokens"] + totals["output_tokens"]) / self.token_budget)
+        if self.cost_budget:
+            used = max(used, totals["cost_usd"] / self.cost_budget)
+        return used
+
+    def budget_status(self, session_id: str, totals: Dict = None) -> str:
+        """"ok", "degraded" (skip optional LLM work) or "exhausted" (score locally, no more LLM calls)"""
+        if not (self.token_budget or self.cost_budget) or session_id is None:
+            return "ok"
+        if totals is None:
+            with self._lock:
+                rows = list(self._sessions.get(session_id, {}).values())
+            totals = {key: sum(row[key] for row in rows) for key in ("input_tokens", "output_tokens", "cost_usd")}
+        used = self._budget_used(totals)
+        if used >= 1.0:
+            return "exhausted"
+        if used >= self.degrade_at:
+            return "degraded"
+        return "ok"
+
+    def forget(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger() -> TokenLedger:
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            from llm import add_usage_listener  # lazy import
+            _ledger = TokenLedger()
+            add_usage_listener(_ledger.record)
+        return _ledger
+
+
+def format_ledger(summary: Dict) -> str:
+    """Plain-text ledger table for the end-of-interview summary"""
+    lines = [f"{'node':<22}{'calls':>6}{'input':>9}{'output':>9}{'reason':>8}{'cost $':>10}"]
+    for node, row in sorted(summary["by_node"].items(), key=lambda item: -item[1]["cost_usd"]):
+        lines.append(f"{node:<22}{row['calls']:>6}{row['input_tokens']:>9}{row['output_tokens']:>9}"
+                     f"{row['reasoning_tokens']:>8}{row['cost_usd']:>10.4f}")
+    lines.append(f"{'total':<22}{summary['calls']:>6}{summary['input_tokens']:>9}{summary['output_tokens']:>9}"
+                 f"{summary['reasoning_tokens']:>8}{summary['cost_usd']:>10.4f}")
+    if summary["status"] != "ok" or summary["budget_used"]:
+        lines.append(f"budget used: {summary['budget_used']:.0%} ({summary['status']})")
+    return "\n".join(lines)